@@ -1,10 +1,7 @@
 import sys
 import os
-import json
-import threading
-from flask import Flask, render_template, jsonify
-from pymongo import MongoClient
-from dotenv import load_dotenv
+import importlib.util
+from flask import Flask, Response, render_template, jsonify, request
 
 # Add the project root to sys.path so we can import scraper
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -12,80 +9,174 @@ root_dir = os.path.dirname(current_dir)
 if root_dir not in sys.path:
     sys.path.insert(0, root_dir)
 
-# Import the custom scraper module
-try:
-    from scraper import GitHubBotScraper
-except ImportError:
-    # Fallback if import fails during build/init
-    GitHubBotScraper = None
+# The scraper (and with it the Gemini SDK) is only imported when a sync runs; see load_scraper()
+from db import get_collection, data_version, ListingCache
+from bot_queries import LocalBotIndex, find_page
+from local_store import open_local_index
+from facets import FACETS_COLLECTION, facet_summary
+from bots_api import create_api_blueprint
+from sync_jobs import SyncJobManager, SyncAlreadyRunning
+import metrics
+from search_index import BM25Index
+from listing_snapshot import SNAPSHOT_PATH, load_snapshot
+from page_cache import PageCache
 
 app = Flask(__name__, template_folder=os.path.join(root_dir, 'templates'))
-load_dotenv(os.path.join(root_dir, '.env'))
+# Vercel injects the environment itself; only local runs have a .env to read
+env_path = os.path.join(root_dir, '.env')
+if os.path.exists(env_path):
+    from dotenv import load_dotenv
+    load_dotenv(env_path)
 
 MONGO_URI = os.getenv("mdb")
+SYNC_WORKERS = int(os.getenv("SYNC_WORKERS", "1"))
+SUMMARY_TTL_DAYS = float(os.getenv("SUMMARY_TTL_DAYS", "30"))
+GEMINI_RPM = int(os.getenv("GEMINI_RPM", "30"))
+# Seconds an incremental sync may spend per invocation (Vercel caps execution time)
+SYNC_TIME_BUDGET = float(os.getenv("SYNC_TIME_BUDGET", "8"))
+# Repos a background sync started by the web app walks (0 = the whole search); the CLI has no cap
+SYNC_LIMIT = int(os.getenv("SYNC_LIMIT", "100")) or None
+SYNC_FLUSH_BATCH = int(os.getenv("SYNC_FLUSH_BATCH", "50"))
+SYNC_FLUSH_INTERVAL = float(os.getenv("SYNC_FLUSH_INTERVAL", "10"))
+# "graphql" fetches READMEs and metadata for 50 repos per request (needs GITHUB_TOKEN)
+GITHUB_FETCH_ENGINE = os.getenv("GITHUB_FETCH_ENGINE", "rest")
+# Repos the local classifier is at least this sure about skip Gemini; above 1 always asks Gemini
+CLASSIFIER_THRESHOLD = float(os.getenv("CLASSIFIER_THRESHOLD", "0.9"))
+# Concurrent summary requests packed into one Gemini call (only with SYNC_WORKERS > 1)
+GEMINI_BATCH_SIZE = int(os.getenv("GEMINI_BATCH_SIZE", "8"))
+# Approximate tokens of compacted README text per summary prompt
+README_TOKEN_BUDGET = int(os.getenv("README_TOKEN_BUDGET", "1200"))
+# Seconds the sorted listing is served from memory before it is revalidated
+LISTING_TTL = float(os.getenv("LISTING_TTL", "30"))
+# Bots rendered into the first screen; the page fetches the rest from /api/bots
+FIRST_PAGE_SIZE = int(os.getenv("FIRST_PAGE_SIZE", "30"))
+LOCAL_DATA_PATH = os.path.join(root_dir, "bots_data.ndjson")
+LISTING_SNAPSHOT_PATH = os.getenv("LISTING_SNAPSHOT_PATH", os.path.join(root_dir, SNAPSHOT_PATH))
 
-def get_db_collection():
-    if not MONGO_URI:
-        return None
+def load_scraper():
+    """GitHubBotScraper, imported on first use so cold starts that only serve pages skip it."""
     try:
-        client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
-        db = client.get_database("bot_directory")
-        return db.get_collection("bots")
-    except:
+        from scraper import GitHubBotScraper
+    except ImportError as e:
+        print(f"Scraper import failed: {e}")
         return None
+    return GitHubBotScraper
+
+def get_db_collection():
+    # Indexes are created by the sync, not on a web cold start
+    return get_collection(MONGO_URI, indexes=False)
+
+def load_local_index():
+    try:
+        return open_local_index(LOCAL_DATA_PATH)
+    except Exception as e:
+        print(f"Local file Error: {e}")
+        return LocalBotIndex([])
+
+# Offset index over the local file, reopened when the file changes; pages read from an mmap
+local_index_cache = ListingCache(load_local_index, lambda: data_version(None, LOCAL_DATA_PATH), ttl=LISTING_TTL)
+
+# BM25 index for /search without Mongo; a reload only re-indexes bots whose text changed
+bm25_index = BM25Index()
+
+def load_search_index():
+    bm25_index.sync(local_index_cache.get().iter_bots())
+    return bm25_index
+
+search_index_cache = ListingCache(load_search_index, lambda: data_version(None, LOCAL_DATA_PATH), ttl=LISTING_TTL)
+
+def load_listing():
+    return find_page(get_db_collection(), local_index_cache.get, limit=FIRST_PAGE_SIZE)
+
+# Seeded with the shipped snapshot so a cold start renders without waiting on MongoDB
+listing_cache = ListingCache(load_listing, lambda: data_version(MONGO_URI, LOCAL_DATA_PATH), ttl=LISTING_TTL,
+                             initial=load_snapshot(LISTING_SNAPSHOT_PATH, FIRST_PAGE_SIZE))
+
+def load_facets():
+    return facet_summary(get_collection(MONGO_URI, FACETS_COLLECTION, indexes=False), local_index_cache.get)
+
+# Facet counts are maintained by the sync; a page view only reads them when the data changed
+facets_cache = ListingCache(load_facets, lambda: data_version(MONGO_URI, LOCAL_DATA_PATH), ttl=LISTING_TTL)
+
+app.register_blueprint(create_api_blueprint(get_db_collection, local_index_cache.get, search_index_cache.get,
+                                            facets_cache.get))
+
+def render_index(page):
+    with metrics.timer("template_render"):
+        return render_template("index.html", bots=page["bots"], next_cursor=page["next_cursor"],
+                               page_size=FIRST_PAGE_SIZE)
+
+# Rendered and compressed once per listing version, then served as stored bytes or a 304
+index_page_cache = PageCache(render_index)
 
 @app.route("/")
 def index():
-    collection = get_db_collection()
-    bots = []
-    if collection is not None:
-        try:
-            bots = list(collection.find({}, {'_id': 0}).sort("stars", -1))
-        except Exception as e:
-            print(f"MongoDB Error: {e}")
-            collection = None # Force fallback
-    
-    if collection is None or not bots:
-        # Fallback to local file if DB fails or is empty
-        try:
-            local_data_path = os.path.join(root_dir, "bots_data.json")
-            if os.path.exists(local_data_path):
-                with open(local_data_path, "r", encoding="utf-8") as f:
-                    bots = json.load(f)
-            else:
-                bots = []
-        except Exception as e:
-            print(f"Local file Error: {e}")
-            bots = []
-    return render_template("index.html", bots=bots)
+    page = index_page_cache.get(listing_cache.get())
+    return page.response(request.headers.get("Accept-Encoding"), request.headers.get("If-None-Match"))
+
+@app.route("/metrics")
+def metrics_endpoint():
+    """Prometheus scrape target for stage timings, cache counters and rate-limit headroom."""
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+def run_sync(progress, cancel_event, limit=None, time_budget=None):
+    GitHubBotScraper = load_scraper()
+    scraper = GitHubBotScraper(
+        github_token=os.getenv("GITHUB_TOKEN"),
+        gemini_api_key=os.getenv("GEMINI_API_KEY"),
+        mongo_uri=MONGO_URI,
+        workers=SYNC_WORKERS,
+        summary_ttl_days=SUMMARY_TTL_DAYS,
+        gemini_rpm=GEMINI_RPM,
+        flush_batch_size=SYNC_FLUSH_BATCH,
+        flush_interval=SYNC_FLUSH_INTERVAL,
+        progress=progress,
+        cancel_event=cancel_event,
+        fetch_engine=GITHUB_FETCH_ENGINE,
+        classifier_threshold=CLASSIFIER_THRESHOLD,
+        gemini_batch_size=GEMINI_BATCH_SIZE,
+        readme_token_budget=README_TOKEN_BUDGET
+    )
+    if time_budget:
+        return scraper.run_incremental(time_budget=time_budget)
+    summary = scraper.run(limit=limit)
+    return dict(progress.snapshot(), metrics=summary)
+
+# One sync at a time per process; the Mongo lease extends that across instances
+sync_jobs = SyncJobManager(run_sync, lambda: get_collection(MONGO_URI, "sync_state"))
 
 @app.route("/sync")
 def sync():
     """Route to trigger sync manually (Vercel friendly)"""
-    if GitHubBotScraper is None:
+    if load_scraper() is None:
         return "Scraper module not found", 500
 
-    def run_sync(limit=None):
-        scraper = GitHubBotScraper(
-            github_token=os.getenv("GITHUB_TOKEN"),
-            gemini_api_key=os.getenv("GEMINI_API_KEY"),
-            mongo_uri=MONGO_URI
-        )
-        scraper.run(limit=limit)
-
     # On Vercel, this route will just run the logic directly (blocking)
     if os.environ.get("VERCEL"):
-        # Limit to 3 bots on Vercel to stay within the 10s execution limit
+        # Resume from the stored checkpoint and stop before the execution limit
         try:
-            run_sync(limit=3)
-            return "Sync (limited) Completed on Vercel"
+            result = sync_jobs.run(time_budget=SYNC_TIME_BUDGET)
+            state = "complete" if result["finished"] else "checkpointed"
+            return f"Incremental sync {state} on Vercel: {result['processed']} processed, {result['skipped']} unchanged"
+        except SyncAlreadyRunning as e:
+            return str(e), 409
         except Exception as e:
             return f"Sync failed: {str(e)}", 500
     else:
-        thread = threading.Thread(target=run_sync)
-        thread.start()
+        if not sync_jobs.start(limit=SYNC_LIMIT):
+            return "Sync already running", 409
         return "Sync Started in Background"
 
+@app.route("/sync/status")
+def sync_status():
+    return jsonify(sync_jobs.status())
+
+@app.route("/sync/cancel", methods=["POST"])
+def sync_cancel():
+    if not sync_jobs.cancel():
+        return jsonify({"cancelled": False, "error": "No sync is running"}), 409
+    return jsonify({"cancelled": True})
+
 @app.route("/_debug")
 def debug():
     return {
@@ -93,7 +184,9 @@ def debug():
         "current_dir": current_dir,
         "sys_path": sys.path,
         "env_keys": list(os.environ.keys()),
-        "has_scraper": GitHubBotScraper is not None,
+        # Found on the path, not imported: importing would pull in the Gemini SDK
+        "has_scraper": importlib.util.find_spec("scraper") is not None,
+        "scraper_loaded": "scraper" in sys.modules,
         "templates_exists": os.path.exists(os.path.join(root_dir, 'templates')),
         "templates_content": os.listdir(os.path.join(root_dir, 'templates')) if os.path.exists(os.path.join(root_dir, 'templates')) else []
     }
@@ -0,0 +1,4 @@
+"""Offline benchmarks for the sync pipeline and the web routes.
+
+Run with `python -m bench.run`; see bench/run.py for the options.
+"""
@@ -0,0 +1,131 @@
+"""Cold-start benchmark for the Vercel entry point: import time and the first page.
+
+    python -m bench.cold_start
+    python -m bench.cold_start --runs 10 --max-import-ms 300 --max-first-request-ms 150
+
+Every run is a fresh interpreter, as a serverless cold start is. The entry
+point is imported the way Vercel does (api/ on sys.path, `import index`)
+with no MongoDB configured and a listing snapshot in place, then `/` is
+requested once. The heaviest imports come from `python -X importtime`.
+Exits non-zero when a limit is exceeded or a sync-only dependency
+(scraper, Gemini SDK, pymongo) is imported at startup, so it can run in CI.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import List, Dict, Any
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from bench.corpus import make_bots
+
+# Only /sync needs these; importing one at startup is a regression
+SYNC_ONLY_MODULES = ["scraper", "google.generativeai", "pymongo"]
+
+CHILD = r"""
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {api_dir!r})
+import index
+imported = time.perf_counter()
+loaded = sorted(m for m in {modules!r} if m in sys.modules)
+response = index.app.test_client().get("/")
+done = time.perf_counter()
+print(json.dumps({{"import_ms": 1000 * (imported - started), "first_request_ms": 1000 * (done - imported),
+                  "status": response.status_code, "sync_only_modules": loaded}}))
+"""
+
+_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def child_env(snapshot_path: str) -> Dict[str, str]:
+    return dict(os.environ, mdb="", VERCEL="1", LISTING_SNAPSHOT_PATH=snapshot_path)
+
+
+def write_snapshot(path: str, size: int):
+    from bot_queries import encode_cursor, sort_key
+    bots = sorted(make_bots(size + 1), key=sort_key)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"bots": bots[:size], "next_cursor": encode_cursor(bots[size - 1])}, f)
+
+
+def measure(env: Dict[str, str]) -> Dict[str, Any]:
+    code = CHILD.format(api_dir=os.path.join(ROOT, "api"), modules=SYNC_ONLY_MODULES)
+    result = subprocess.run([sys.executable, "-c", code], env=env, cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Cold start failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def heaviest_imports(env: Dict[str, str], top: int) -> List[Dict[str, Any]]:
+    """The entry point's direct imports by cumulative time, from -X importtime."""
+    code = f"import sys; sys.path.insert(0, {os.path.join(ROOT, 'api')!r}); import index"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], env=env, cwd=ROOT,
+                            capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        # Indent grows by two per level: 1 is the entry point itself, 3 what it imports
+        if match and len(match.group(3)) == 3:
+            rows.append({"module": match.group(4), "cumulative_ms": round(int(match.group(2)) / 1000, 1)})
+    return sorted(rows, key=lambda row: -row["cumulative_ms"])[:top]
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to time")
+    parser.add_argument("--snapshot-size", type=int, default=30, help="bots in the listing snapshot")
+    parser.add_argument("--top", type=int, default=10, help="heaviest imports to list")
+    parser.add_argument("--max-import-ms", type=float, help="fail when the median import time is above this")
+    parser.add_argument("--max-first-request-ms", type=float, help="fail when the median first / is above this")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_path = os.path.join(tmp, "listing_snapshot.json")
+        write_snapshot(snapshot_path, args.snapshot_size)
+        env = child_env(snapshot_path)
+        runs = [measure(env) for _ in range(args.runs)]
+        heaviest = heaviest_imports(env, args.top)
+
+    report = {
+        "import_ms": round(statistics.median(r["import_ms"] for r in runs), 1),
+        "import_ms_max": round(max(r["import_ms"] for r in runs), 1),
+        "first_request_ms": round(statistics.median(r["first_request_ms"] for r in runs), 1),
+        "first_request_ms_max": round(max(r["first_request_ms"] for r in runs), 1),
+        "statuses": sorted({r["status"] for r in runs}),
+        "sync_only_modules": sorted({m for r in runs for m in r["sync_only_modules"]}),
+        "heaviest_imports": heaviest,
+    }
+    print(f"import  median {report['import_ms']} ms, max {report['import_ms_max']} ms")
+    print(f"first / median {report['first_request_ms']} ms, max {report['first_request_ms_max']} ms, "
+          f"status {report['statuses']}")
+    for row in heaviest:
+        print(f"  {row['module']:<28} {row['cumulative_ms']:>8} ms")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    failures = []
+    if report["sync_only_modules"]:
+        failures.append(f"sync-only modules imported at startup: {', '.join(report['sync_only_modules'])}")
+    if report["statuses"] != [200]:
+        failures.append(f"/ returned {report['statuses']}")
+    if args.max_import_ms is not None and report["import_ms"] > args.max_import_ms:
+        failures.append(f"import {report['import_ms']} ms > {args.max_import_ms} ms")
+    if args.max_first_request_ms is not None and report["first_request_ms"] > args.max_first_request_ms:
+        failures.append(f"first request {report['first_request_ms']} ms > {args.max_first_request_ms} ms")
+    for failure in failures:
+        print(f"[!] {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
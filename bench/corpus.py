@@ -0,0 +1,75 @@
+import random
+from datetime import date, timedelta
+from typing import List, Dict, Any
+
+WORDS = ["weather", "music", "download", "youtube", "admin", "group", "moderation", "quiz", "game",
+         "shop", "payment", "crypto", "translate", "reminder", "rss", "feed", "anime", "movie",
+         "news", "notes", "todo", "captcha", "welcome", "stats", "poll", "sticker", "voice", "ai"]
+LANGUAGES = ["Python", "JavaScript", "TypeScript", "Go", "PHP", "Java", "Rust", None]
+LICENSES = ["MIT License", "GNU General Public License v3.0", "Apache License 2.0", None]
+
+
+def make_repos(count: int, seed: int = 1) -> List[Dict[str, Any]]:
+    """Synthetic GitHub search items, star counts roughly power-law like the real corpus."""
+    rng = random.Random(seed)
+    repos = []
+    for i in range(count):
+        words = rng.sample(WORDS, 3)
+        created = date(2015, 1, 1) + timedelta(days=rng.randrange(3500))
+        license_name = rng.choice(LICENSES)
+        repos.append({
+            "name": f"{words[0]}-bot-{i}",
+            "full_name": f"user{i % 97}/{words[0]}-bot-{i}",
+            "owner": {"login": f"user{i % 97}"},
+            "html_url": f"https://github.com/user{i % 97}/{words[0]}-bot-{i}",
+            "description": f"Telegram bot for {words[0]} and {words[1]}",
+            "topics": ["telegram", "bot", words[2]],
+            "language": rng.choice(LANGUAGES),
+            "stargazers_count": int(rng.paretovariate(1.1)) - 1,
+            "forks_count": rng.randrange(50),
+            "open_issues_count": rng.randrange(20),
+            "created_at": f"{created.isoformat()}T00:00:00Z",
+            "updated_at": f"{(created + timedelta(days=300)).isoformat()}T00:00:00Z",
+            "pushed_at": f"{(created + timedelta(days=200)).isoformat()}T00:00:00Z",
+            "license": {"name": license_name} if license_name else None,
+        })
+    return repos
+
+
+def make_readme(repo: Dict[str, Any], size: int = 4000) -> str:
+    """A README of roughly `size` characters with the usual sections."""
+    rng = random.Random(repo["full_name"])
+    body = [f"# {repo['name']}", "", repo["description"] or "", "",
+            "![build](https://img.shields.io/badge/build-passing-green)", "", "## Installation", "",
+            "```bash", "pip install -r requirements.txt", "python bot.py", "```", "", "## Features", ""]
+    while sum(len(line) + 1 for line in body) < size:
+        body.append("- " + " ".join(rng.choice(WORDS) for _ in range(12)))
+    return "\n".join(body)
+
+
+def make_bots(count: int, seed: int = 2) -> List[Dict[str, Any]]:
+    """Processed bot records, as the sync stores them."""
+    bots = []
+    for i, repo in enumerate(make_repos(count, seed)):
+        owner, name = repo["full_name"].split("/")
+        bots.append({
+            "name": name,
+            "author": owner,
+            "full_name": repo["full_name"],
+            "description": repo["description"],
+            "link": repo["html_url"],
+            "category": ", ".join(repo["topics"]),
+            "language": repo["language"],
+            "stars": repo["stargazers_count"],
+            "forks": repo["forks_count"],
+            "open_issues": repo["open_issues_count"],
+            "last_updated": repo["updated_at"],
+            "pushed_at": repo["pushed_at"],
+            "license": repo["license"]["name"] if repo["license"] else "None",
+            "repo_type": "Library/Module" if i % 4 == 0 else "Application/Bot",
+            "what_it_does": f"Runs a {repo['topics'][2]} service for Telegram chats. {repo['description']}.",
+            "how_to_use": "Clone the repository, set BOT_TOKEN and run python bot.py.",
+            "summary_hash": f"bench-{repo['full_name']}",
+            "summarized_at": "2026-01-01T00:00:00+00:00",
+        })
+    return bots
@@ -0,0 +1,228 @@
+import base64
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Optional
+
+from github_graphql import README_VARIANTS
+from github_search import SEARCH_RESULT_CAP, _parse_created
+
+from bench.corpus import make_readme
+
+
+_REPOSITORY_ALIAS = re.compile(r'(r\d+): repository\(owner: "([^"]*)", name: "([^"]*)"\)')
+
+
+def _matches_stars(stars: int, qualifier: str) -> bool:
+    if qualifier.startswith(">="):
+        return stars >= int(qualifier[2:])
+    if ".." in qualifier:
+        low, high = qualifier.split("..")
+        return int(low) <= stars <= int(high)
+    return stars == int(qualifier)
+
+
+class RateWindow:
+    """One X-RateLimit-* resource: `limit` requests per `period` seconds."""
+
+    def __init__(self, limit: int, period: float):
+        self.limit = limit
+        self.period = period
+        self.remaining = limit
+        self.reset_at = time.time() + period
+
+    def take(self) -> bool:
+        now = time.time()
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.period
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+    def headers(self, resource: str) -> Dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(int(self.reset_at)),
+            "X-RateLimit-Resource": resource,
+        }
+
+
+class FakeGitHub:
+    """Local stand-in for the GitHub endpoints the scraper uses.
+
+    Serves search (with stars/created qualifiers and the 1000 result cap),
+    README contents with ETags and the batched GraphQL repository query, adds `latency` (+/- `jitter`) seconds to
+    every response, and enforces per-resource rate-limit windows. Answers
+    304 to matching If-None-Match without spending rate limit, as GitHub does.
+    """
+
+    def __init__(self, repos: List[Dict[str, Any]], latency: float = 0.02, jitter: float = 0.01,
+                 core_limit: int = 5000, search_limit: int = 30, graphql_limit: int = 5000, period: float = 60.0,
+                 readme_size: int = 4000, lowercase_readme_ratio: float = 0.1):
+        self.repos = sorted(repos, key=lambda r: -r["stargazers_count"])
+        self.latency = latency
+        self.jitter = jitter
+        self.readme_size = readme_size
+        rng = random.Random(7)
+        self.lowercase = {r["full_name"] for r in repos if rng.random() < lowercase_readme_ratio}
+        self.by_name = {r["full_name"]: r for r in repos}
+        self.windows = {"core": RateWindow(core_limit, period), "search": RateWindow(search_limit, period),
+                        "graphql": RateWindow(graphql_limit, period)}
+        self.calls = {"core": 0, "search": 0, "graphql": 0}
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def reset_counters(self):
+        with self._lock:
+            self.calls = {"core": 0, "search": 0, "graphql": 0}
+            self.not_modified = 0
+
+    def search(self, params: Dict[str, str]) -> Dict[str, Any]:
+        qualifiers = params.get("q", "").split()
+        items = self.repos
+        for part in qualifiers:
+            if part.startswith("stars:"):
+                items = [r for r in items if _matches_stars(r["stargazers_count"], part[len("stars:"):])]
+            elif part.startswith("created:"):
+                start, end = _parse_created(part)
+                items = [r for r in items if start <= date.fromisoformat(r["created_at"][:10]) <= end]
+        page = int(params.get("page", 1))
+        per_page = int(params.get("per_page", 30))
+        reachable = items[:SEARCH_RESULT_CAP]
+        return {"total_count": len(items), "items": reachable[(page - 1) * per_page:page * per_page]}
+
+    def readme(self, full_name: str, path: str) -> Optional[Dict[str, Any]]:
+        repo = self.by_name.get(full_name)
+        if repo is None:
+            return None
+        expected = "readme.md" if full_name in self.lowercase else "README.md"
+        if path != expected:
+            return None
+        content = make_readme(repo, self.readme_size).encode("utf-8")
+        return {"name": path, "path": path, "encoding": "base64",
+                "content": base64.encodebytes(content).decode("ascii")}
+
+    def graphql(self, query: str) -> Dict[str, Any]:
+        """Answer the batch query built by github_graphql.build_query."""
+        data = {}
+        for alias, owner, name in _REPOSITORY_ALIAS.findall(query):
+            repo = self.by_name.get(f"{owner}/{name}")
+            if repo is None:
+                data[alias] = None
+                continue
+            node = {
+                "nameWithOwner": repo["full_name"], "name": repo["name"], "description": repo["description"],
+                "url": repo["html_url"], "stargazerCount": repo["stargazers_count"],
+                "forkCount": repo["forks_count"], "pushedAt": repo["pushed_at"], "updatedAt": repo["updated_at"],
+                "owner": {"login": repo["owner"]["login"]},
+                "primaryLanguage": {"name": repo["language"]} if repo["language"] else None,
+                "licenseInfo": repo["license"],
+                "issues": {"totalCount": repo["open_issues_count"]},
+                "repositoryTopics": {"nodes": [{"topic": {"name": t}} for t in repo["topics"]]},
+            }
+            present = "readme.md" if repo["full_name"] in self.lowercase else "README.md"
+            for i, variant in enumerate(README_VARIANTS):
+                node[f"readme{i}"] = {"text": make_readme(repo, self.readme_size)} if variant == present else None
+            data[alias] = node
+        window = self.windows["graphql"]
+        data["rateLimit"] = {"cost": 1, "remaining": window.remaining, "limit": window.limit,
+                             "resetAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(window.reset_at))}
+        return {"data": data}
+
+    def handle_post(self, path: str, body: bytes):
+        if urllib.parse.urlsplit(path).path != "/graphql":
+            return 404, {}, b'{"message": "Not Found"}'
+        with self._lock:
+            self.calls["graphql"] += 1
+            window = self.windows["graphql"]
+            if not window.take():
+                return 403, window.headers("graphql"), b'{"message": "API rate limit exceeded"}'
+            headers = window.headers("graphql")
+        payload = self.graphql(json.loads(body.decode("utf-8"))["query"])
+        return 200, headers, json.dumps(payload).encode("utf-8")
+
+    def handle(self, path: str, if_none_match: Optional[str]):
+        """(status, headers, body) for one GET."""
+        parts = urllib.parse.urlsplit(path)
+        params = dict(urllib.parse.parse_qsl(parts.query))
+        resource = "search" if parts.path.startswith("/search/") else "core"
+        if parts.path == "/search/repositories":
+            payload = self.search(params)
+        elif parts.path.startswith("/repos/") and "/contents/" in parts.path:
+            repo_path, _, file_path = parts.path[len("/repos/"):].partition("/contents/")
+            payload = self.readme(repo_path, file_path)
+        else:
+            payload = None
+        body = json.dumps(payload if payload is not None else {"message": "Not Found"}).encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        with self._lock:
+            self.calls[resource] += 1
+            window = self.windows[resource]
+            if payload is not None and if_none_match == etag:
+                self.not_modified += 1
+                return 304, dict(window.headers(resource), ETag=etag), b""
+            if not window.take():
+                headers = dict(window.headers(resource), **{"Retry-After": str(int(window.reset_at - time.time()) + 1)})
+                return 403, headers, b'{"message": "API rate limit exceeded"}'
+            headers = window.headers(resource)
+        if payload is None:
+            return 404, headers, body
+        return 200, dict(headers, ETag=etag), body
+
+    def start(self) -> "FakeGitHub":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                self._delay()
+                self._reply(*fake.handle(self.path, self.headers.get("If-None-Match")))
+
+            def do_POST(self):
+                self._delay()
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                self._reply(*fake.handle_post(self.path, body))
+
+            def _delay(self):
+                delay = fake.latency + random.uniform(-fake.jitter, fake.jitter)
+                if delay > 0:
+                    time.sleep(delay)
+
+            def _reply(self, status: int, headers: Dict[str, str], body: bytes):
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
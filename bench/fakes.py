@@ -0,0 +1,323 @@
+import copy
+import json
+import random
+import re
+import threading
+import time
+from typing import List, Dict, Any, Optional
+
+from pymongo.errors import OperationFailure
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """Stands in for genai.GenerativeModel: fixed overhead plus a per-prompt-character cost.
+
+    Answers JSON as if `response_schema` were honoured, one object per repo
+    for batch prompts; `malformed_ratio` of the objects come back invalid.
+    """
+
+    def __init__(self, base_latency: float = 0.4, per_char: float = 0.00002, jitter: float = 0.1,
+                 malformed_ratio: float = 0.0, seed: int = 3):
+        self.base_latency = base_latency
+        self.per_char = per_char
+        self.jitter = jitter
+        self.malformed_ratio = malformed_ratio
+        self.calls = 0
+        self.prompt_chars = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, generation_config=None, **kwargs) -> FakeResponse:
+        text = prompt if isinstance(prompt, str) else json.dumps(prompt)
+        batch = (generation_config or {}).get("response_schema", {}).get("type") == "ARRAY"
+        full_names = re.findall(r'"full_name": "([^"]+)"', text) if batch else [None]
+        with self._lock:
+            self.calls += 1
+            self.prompt_chars += len(text)
+            jitter = self._rng.uniform(-self.jitter, self.jitter)
+            malformed = [self._rng.random() < self.malformed_ratio for _ in full_names]
+        time.sleep(max(0.0, self.base_latency + jitter + self.per_char * len(text)))
+        summaries = []
+        for full_name, bad in zip(full_names, malformed):
+            summary = {
+                "what_it_does": "A Telegram bot that automates a chat workflow.",
+                "how_to_use": "Install the requirements, set the bot token and run the main script.",
+                "repo_type": "Application/Bot",
+            }
+            if bad:
+                # Schema-constrained output can still drop a field's content
+                summary["how_to_use"] = ""
+            if batch:
+                summaries.append(dict(summary, full_name=full_name))
+            else:
+                summaries.append(summary)
+        return FakeResponse(json.dumps(summaries if batch else summaries[0]))
+
+
+def _matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(_matches(doc, clause) for clause in condition):
+                return False
+            continue
+        if key == "$text":
+            # Scored and filtered by FakeCollection.find against its text index
+            continue
+        value = doc.get(key)
+        if isinstance(condition, dict) and any(op.startswith("$") for op in condition):
+            for op, operand in condition.items():
+                if op == "$in" and value not in operand:
+                    return False
+                if op == "$nin" and value in operand:
+                    return False
+                if op == "$ne" and value == operand:
+                    return False
+                if op == "$lt" and not (value is not None and value < operand):
+                    return False
+                if op == "$gt" and not (value is not None and value > operand):
+                    return False
+                if op == "$gte" and not (value is not None and value >= operand):
+                    return False
+                if op == "$regex" and not (isinstance(value, str) and re.search(operand, value)):
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+
+# Where find() keeps a $text match's score on its copy of the document
+_SCORE = "__text_score"
+
+_WORD = re.compile(r"\w+")
+
+
+def _text_score(doc: Dict[str, Any], terms: set, weights: Dict[str, float]) -> float:
+    """Weighted count of query terms in the indexed fields: any term matches, like MongoDB's $text."""
+    score = 0.0
+    for field, weight in weights.items():
+        words = _WORD.findall(str(doc.get(field) or "").lower())
+        score += weight * sum(1 for word in words if word in terms)
+    return score
+
+
+def _project(doc: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not projection:
+        return {k: v for k, v in doc.items() if k != _SCORE}
+    scores = {k: doc.get(_SCORE, 0.0) for k, v in projection.items() if v == {"$meta": "textScore"}}
+    included = [k for k, v in projection.items() if v == 1]
+    if included:
+        out = {k: doc[k] for k in included if k in doc}
+        if projection.get("_id", 1) and "_id" in doc:
+            out["_id"] = doc["_id"]
+        return dict(out, **scores)
+    out = {k: v for k, v in doc.items() if k != _SCORE and projection.get(k, 1) in (1, True)}
+    return dict(out, **scores)
+
+
+class FakeCursor:
+    def __init__(self, docs: List[Dict[str, Any]], projection: Optional[Dict[str, Any]]):
+        self._docs = docs
+        self._projection = projection
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, keys, direction=None):
+        if isinstance(keys, str):
+            keys = [(keys, direction or 1)]
+        for key, order in reversed(keys):
+            if isinstance(order, dict):
+                # {"$meta": "textScore"}: best match first
+                self._docs.sort(key=lambda d: d.get(_SCORE, 0.0), reverse=True)
+                continue
+            self._docs.sort(key=lambda d: (d.get(key) is not None, d.get(key)), reverse=order < 0)
+        return self
+
+    def skip(self, count: int):
+        self._skip = count
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    def batch_size(self, count: int):
+        return self
+
+    def __iter__(self):
+        docs = self._docs[self._skip:]
+        if self._limit:
+            docs = docs[:self._limit]
+        return (_project(doc, self._projection) for doc in docs)
+
+
+class FakeUpdateResult:
+    def __init__(self, matched: int, modified: int):
+        self.matched_count = matched
+        self.modified_count = modified
+
+
+class FakeCollection:
+    """Just enough of pymongo's Collection for the code paths in this repo, held in a dict by _id."""
+
+    def __init__(self):
+        self.docs: Dict[Any, Dict[str, Any]] = {}
+        self.ops = {"find": 0, "write": 0}
+        self._next_id = 0
+        self._lock = threading.RLock()
+        # Field -> weight once a text index is created; $text fails without one, as in MongoDB
+        self.text_weights: Optional[Dict[str, float]] = None
+
+    def create_index(self, keys, **kwargs):
+        if isinstance(keys, list) and any(kind == "text" for _, kind in keys):
+            weights = kwargs.get("weights") or {}
+            self.text_weights = {field: weights.get(field, 1) for field, kind in keys if kind == "text"}
+        return "index"
+
+    def estimated_document_count(self) -> int:
+        return len(self.docs)
+
+    def _select(self, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if set(query) == {"_id"} and not isinstance(query["_id"], dict):
+            doc = self.docs.get(query["_id"])
+            return [doc] if doc is not None else []
+        return [doc for doc in self.docs.values() if _matches(doc, query)]
+
+    def find(self, query: Dict[str, Any] = None, projection: Dict[str, Any] = None) -> FakeCursor:
+        query = query or {}
+        with self._lock:
+            self.ops["find"] += 1
+            if "$text" not in query:
+                return FakeCursor(self._select(query), projection)
+            if self.text_weights is None:
+                # What MongoDB answers for $text on a collection without a text index
+                raise OperationFailure("text index required for $text query", code=27)
+            terms = set(_WORD.findall(query["$text"]["$search"].lower()))
+            docs = []
+            for doc in self._select(query):
+                score = _text_score(doc, terms, self.text_weights)
+                if score:
+                    docs.append(dict(doc, **{_SCORE: score}))
+            return FakeCursor(docs, projection)
+
+    def find_one(self, query: Dict[str, Any] = None, projection: Dict[str, Any] = None):
+        for doc in self.find(query, projection).limit(1):
+            return copy.deepcopy(doc)
+        return None
+
+    def _apply(self, doc: Dict[str, Any], update: Dict[str, Any]):
+        for key, value in update.get("$set", {}).items():
+            doc[key] = value
+        for key, value in update.get("$inc", {}).items():
+            doc[key] = doc.get(key, 0) + value
+        for key, value in update.get("$setOnInsert", {}).items():
+            doc.setdefault(key, value)
+
+    def _upsert_doc(self, query: Dict[str, Any]) -> Dict[str, Any]:
+        doc = {k: v for k, v in query.items() if not k.startswith("$") and not isinstance(v, dict)}
+        if "_id" not in doc:
+            self._next_id += 1
+            doc["_id"] = self._next_id
+        self.docs[doc["_id"]] = doc
+        return doc
+
+    def update_one(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool = False) -> FakeUpdateResult:
+        with self._lock:
+            self.ops["write"] += 1
+            matched = self._select(query)[:1]
+            if not matched and not upsert:
+                return FakeUpdateResult(0, 0)
+            doc = matched[0] if matched else self._upsert_doc(query)
+            self._apply(doc, update)
+            return FakeUpdateResult(len(matched), 1)
+
+    def update_many(self, query: Dict[str, Any], update: Dict[str, Any]) -> FakeUpdateResult:
+        with self._lock:
+            self.ops["write"] += 1
+            matched = self._select(query)
+            for doc in matched:
+                self._apply(doc, update)
+            return FakeUpdateResult(len(matched), len(matched))
+
+    def count_documents(self, query: Dict[str, Any]) -> int:
+        with self._lock:
+            return len(self._select(query))
+
+    def find_one_and_update(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool = False,
+                            return_document: bool = False, **kwargs):
+        with self._lock:
+            matched = self._select(query)[:1]
+            if not matched and upsert and "_id" in query and query["_id"] in self.docs:
+                raise RuntimeError("E11000 duplicate key error")
+            if not matched and not upsert:
+                return None
+            before = copy.deepcopy(matched[0]) if matched else None
+            doc = matched[0] if matched else self._upsert_doc(query)
+            self._apply(doc, update)
+            self.ops["write"] += 1
+            return copy.deepcopy(doc) if return_document else before
+
+    def replace_one(self, query: Dict[str, Any], replacement: Dict[str, Any], upsert: bool = False):
+        with self._lock:
+            self.ops["write"] += 1
+            matched = self._select(query)[:1]
+            if not matched and not upsert:
+                return FakeUpdateResult(0, 0)
+            doc = matched[0] if matched else self._upsert_doc(query)
+            keep_id = doc["_id"]
+            doc.clear()
+            doc.update(replacement, _id=keep_id)
+            return FakeUpdateResult(len(matched), 1)
+
+    def delete_one(self, query: Dict[str, Any]):
+        with self._lock:
+            self.ops["write"] += 1
+            for doc in self._select(query)[:1]:
+                del self.docs[doc["_id"]]
+
+    def delete_many(self, query: Dict[str, Any]):
+        with self._lock:
+            self.ops["write"] += 1
+            for doc in self._select(query):
+                del self.docs[doc["_id"]]
+
+    def insert_many(self, docs: List[Dict[str, Any]]):
+        with self._lock:
+            self.ops["write"] += 1
+            for doc in docs:
+                self._upsert_doc(dict(doc))
+
+    def bulk_write(self, requests, ordered: bool = True):
+        with self._lock:
+            self.ops["write"] += 1
+            for request in requests:
+                # pymongo.UpdateOne keeps its arguments in these attributes
+                matched = self._select(request._filter)[:1]
+                if not matched and not request._upsert:
+                    continue
+                doc = matched[0] if matched else self._upsert_doc(request._filter)
+                self._apply(doc, request._doc)
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.collections: Dict[str, FakeCollection] = {}
+
+    def get_collection(self, name: str) -> FakeCollection:
+        return self.collections.setdefault(name, FakeCollection())
+
+    __getitem__ = get_collection
+
+
+class FakeMongoClient:
+    def __init__(self):
+        self.databases: Dict[str, FakeDatabase] = {}
+
+    def get_database(self, name: str) -> FakeDatabase:
+        return self.databases.setdefault(name, FakeDatabase())
+
+    __getitem__ = get_database
@@ -0,0 +1,271 @@
+"""Offline benchmark: sync throughput against local stand-ins, and web route latency.
+
+    python -m bench.run                         # defaults below
+    python -m bench.run --sizes 10,1000 --sync-repos 200 --json bench_output.json
+    python -m bench.run --skip-sync --skip-web --queue-workers 1,2,4
+
+Nothing here talks to GitHub, Gemini or MongoDB. The sync runs against a
+local fake GitHub server and a fake GenerativeModel, twice: cold (empty
+caches) and warm (conditional requests and stored summaries). The web
+routes are driven through Flask's test client over synthetic data sets.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from typing import List, Dict, Any
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import db
+from bot_queries import encode_cursor, sort_key
+
+from bench.corpus import make_repos, make_bots
+from bench.fake_github import FakeGitHub
+from bench.fakes import FakeGenerativeModel, FakeMongoClient
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+
+    def pick(p: float) -> float:
+        return round(1000 * ordered[min(len(ordered) - 1, int(p * len(ordered)))], 2)
+
+    return {"p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99), "max_ms": pick(1.0)}
+
+
+@contextlib.contextmanager
+def working_directory(path: str):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def fake_mongo_uri(name: str) -> str:
+    """Register an in-memory client under a URI so db.get_client() hands it out."""
+    uri = f"mongodb://bench/{name}"
+    db._clients[uri] = FakeMongoClient()
+    return uri
+
+
+def bench_sync(repo_count: int, workers: int, github_latency: float, gemini_latency: float,
+               use_mongo: bool, engine: str = "rest", classifier_threshold: float = 0.9,
+               gemini_batch_size: int = 8, malformed_ratio: float = 0.0, verbose: bool = False) -> Dict[str, Any]:
+    from scraper import GitHubBotScraper
+
+    fake = FakeGitHub(make_repos(repo_count), latency=github_latency, jitter=github_latency / 2,
+                      core_limit=1_000_000, search_limit=1_000_000, graphql_limit=1_000_000).start()
+    model = FakeGenerativeModel(base_latency=gemini_latency, jitter=gemini_latency / 4, malformed_ratio=malformed_ratio)
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp, working_directory(tmp):
+            os.environ["HTTP_CACHE_DIR"] = os.path.join(tmp, "http_cache")
+            uri = fake_mongo_uri("sync") if use_mongo else None
+            for label in ("cold", "warm"):
+                fake.reset_counters()
+                model.calls = 0
+                scraper = GitHubBotScraper(github_token="bench", mongo_uri=uri, workers=workers,
+                                           gemini_rpm=1_000_000, fetch_engine=engine,
+                                           classifier_threshold=classifier_threshold,
+                                           gemini_batch_size=gemini_batch_size)
+                scraper.github_base_url = fake.url
+                scraper.model = model
+                started = time.perf_counter()
+                with contextlib.redirect_stdout(sys.stdout if verbose else io.StringIO()):
+                    summary = scraper.run()
+                elapsed = time.perf_counter() - started
+                done = scraper.progress.done or 1
+                github_calls = sum(fake.calls.values())
+                results[label] = {
+                    "repos": scraper.progress.done,
+                    "seconds": round(elapsed, 2),
+                    "repos_per_second": round(scraper.progress.done / elapsed, 2),
+                    "github_calls_per_repo": round(github_calls / done, 2),
+                    "github_304_ratio": round(fake.not_modified / github_calls, 2) if github_calls else 0.0,
+                    "gemini_calls_per_repo": round(model.calls / done, 2),
+                    "stages": summary["stages"],
+                }
+    finally:
+        fake.stop()
+    return results
+
+
+def bench_queue(repo_count: int, worker_counts: List[int], threads: int, github_latency: float,
+                gemini_latency: float, verbose: bool = False) -> Dict[str, Any]:
+    """Drain the MongoDB work queue with 1..N worker instances, each a GitHubBotScraper of its own.
+
+    Workers run as threads of this process against a shared in-memory Mongo,
+    standing in for separate `main.py --worker` processes; the fakes spend
+    their latency sleeping, so this measures how well the queue spreads work.
+    """
+    from scraper import GitHubBotScraper
+
+    fake = FakeGitHub(make_repos(repo_count), latency=github_latency, jitter=github_latency / 2,
+                      core_limit=1_000_000, search_limit=1_000_000, graphql_limit=1_000_000).start()
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp, working_directory(tmp):
+            os.environ["HTTP_CACHE_DIR"] = os.path.join(tmp, "http_cache")
+            for count in worker_counts:
+                uri = fake_mongo_uri(f"queue-{count}")
+                model = FakeGenerativeModel(base_latency=gemini_latency, jitter=gemini_latency / 4)
+
+                def make_scraper():
+                    scraper = GitHubBotScraper(github_token="bench", mongo_uri=uri, workers=threads,
+                                               gemini_rpm=1_000_000)
+                    scraper.github_base_url = fake.url
+                    scraper.model = model
+                    return scraper
+
+                with contextlib.redirect_stdout(sys.stdout if verbose else io.StringIO()):
+                    make_scraper().enqueue()
+                    scrapers = [make_scraper() for _ in range(count)]
+                    started = time.perf_counter()
+                    runners = [threading.Thread(target=scraper.run_worker) for scraper in scrapers]
+                    for runner in runners:
+                        runner.start()
+                    for runner in runners:
+                        runner.join()
+                    elapsed = time.perf_counter() - started
+                processed = sum(scraper.progress.done for scraper in scrapers)
+                queue = db.get_collection(uri, "sync_queue")
+                results[count] = {
+                    "repos": processed,
+                    "done_in_queue": queue.count_documents({"state": "done"}),
+                    "seconds": round(elapsed, 2),
+                    "repos_per_second": round(processed / elapsed, 2),
+                }
+    finally:
+        fake.stop()
+    baseline = results[worker_counts[0]]["repos_per_second"] / worker_counts[0] if worker_counts else 0
+    for count, row in results.items():
+        row["speedup_vs_linear"] = round(row["repos_per_second"] / (baseline * count), 2) if baseline else None
+    return results
+
+
+def bench_web(sizes: List[int], requests: int, use_mongo: bool) -> Dict[str, Any]:
+    # No real MongoDB for the app unless the in-memory stand-in is requested
+    os.environ["mdb"] = ""
+    import app as web
+    client = web.app.test_client()
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            bots = make_bots(size)
+            path = os.path.join(tmp, f"bots_{size}.ndjson")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("".join(json.dumps(bot) + "\n" for bot in bots))
+            web.LOCAL_DATA_PATH = path
+            if use_mongo:
+                web.MONGO_URI = fake_mongo_uri(f"web-{size}")
+                db.get_collection(web.MONGO_URI).insert_many(bots)
+            # New data version, so every cache reloads on its next read
+            db.bump_data_version(None)
+
+            middle = sorted(bots, key=sort_key)[size // 2]
+            routes = {
+                "/": "/",
+                "/api/bots": "/api/bots",
+                "/api/bots (deep page)": f"/api/bots?cursor={encode_cursor(middle)}",
+                "/api/bots (filtered)": "/api/bots?language=Go&fields=name,link,stars",
+                "/search": "/search?q=weather+reminder",
+                "/api/facets": "/api/facets",
+            }
+            started = time.perf_counter()
+            client.get("/")
+            row = {"cold_index_ms": round(1000 * (time.perf_counter() - started), 2)}
+            for label, url in routes.items():
+                client.get(url)
+                samples = []
+                for _ in range(requests):
+                    started = time.perf_counter()
+                    response = client.get(url)
+                    samples.append(time.perf_counter() - started)
+                    if response.status_code != 200:
+                        raise RuntimeError(f"{url} returned {response.status_code}")
+                row[label] = percentiles(samples)
+            results[size] = row
+    return results
+
+
+def print_report(report: Dict[str, Any]):
+    sync = report.get("sync")
+    if sync:
+        print("\n== Sync ==")
+        for label, row in sync.items():
+            print(f"{label:>5}: {row['repos']} repos in {row['seconds']}s = {row['repos_per_second']} repos/s, "
+                  f"{row['github_calls_per_repo']} GitHub calls/repo ({row['github_304_ratio']:.0%} 304), "
+                  f"{row['gemini_calls_per_repo']} Gemini calls/repo")
+            for stage, stats in sorted(row["stages"].items()):
+                print(f"       {stage:<15} {stats['count']:>6} x {stats['mean_ms']:>8} ms")
+    queue = report.get("queue")
+    if queue:
+        print("\n== Work queue ==")
+        for count, row in queue.items():
+            print(f"{count:>3} workers: {row['repos']} repos in {row['seconds']}s = {row['repos_per_second']} repos/s "
+                  f"({row['speedup_vs_linear']:.0%} of linear), {row['done_in_queue']} done in queue")
+    web = report.get("web")
+    if web:
+        print("\n== Web ==")
+        for size, row in web.items():
+            print(f"{size} bots (cold / {row['cold_index_ms']} ms)")
+            for label, stats in row.items():
+                if label == "cold_index_ms":
+                    continue
+                print(f"  {label:<24} p50 {stats['p50_ms']:>8}  p95 {stats['p95_ms']:>8}  "
+                      f"p99 {stats['p99_ms']:>8}  max {stats['max_ms']:>8} ms")
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,1000,50000", help="bot counts for the web benchmark")
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per route and size")
+    parser.add_argument("--sync-repos", type=int, default=300, help="synthetic repos served by the fake GitHub")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--github-latency", type=float, default=0.03, help="seconds per fake GitHub response")
+    parser.add_argument("--gemini-latency", type=float, default=0.5, help="seconds per fake Gemini call")
+    parser.add_argument("--engine", choices=["rest", "graphql"], default="rest", help="how READMEs are fetched")
+    parser.add_argument("--classifier-threshold", type=float, default=0.9,
+                        help="local classifier confidence that skips Gemini; above 1 sends every repo to Gemini")
+    parser.add_argument("--gemini-batch-size", type=int, default=8, help="repos per Gemini request (1 disables)")
+    parser.add_argument("--malformed-ratio", type=float, default=0.0,
+                        help="share of fake Gemini summaries that come back invalid")
+    parser.add_argument("--mongo", action="store_true", help="use the in-memory Mongo stand-in instead of local files")
+    parser.add_argument("--verbose", action="store_true", help="show the scraper's own output")
+    parser.add_argument("--queue-workers", help="worker counts for the distributed queue benchmark, e.g. 1,2,4")
+    parser.add_argument("--queue-threads", type=int, default=4, help="threads per queue worker")
+    parser.add_argument("--skip-sync", action="store_true")
+    parser.add_argument("--skip-web", action="store_true")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    report = {}
+    if not args.skip_sync:
+        report["sync"] = bench_sync(args.sync_repos, args.workers, args.github_latency, args.gemini_latency, args.mongo,
+                                    args.engine, args.classifier_threshold, args.gemini_batch_size, args.malformed_ratio,
+                                    args.verbose)
+    if args.queue_workers:
+        counts = [int(count) for count in args.queue_workers.split(",") if count]
+        report["queue"] = bench_queue(args.sync_repos, counts, args.queue_threads, args.github_latency,
+                                      args.gemini_latency, args.verbose)
+    if not args.skip_web:
+        sizes = [int(size) for size in args.sizes.split(",") if size]
+        report["web"] = bench_web(sizes, args.requests, args.mongo)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import base64
+import json
+import itertools
+import re
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Callable, List, Dict, Any, Optional, Tuple, Iterable, Iterator
+
+from persistence import BOT_FIELDS, FILTER_FIELDS, INDEXED_FIELDS
+
+DEFAULT_PAGE_SIZE = 30
+MAX_PAGE_SIZE = 100
+
+# Filters one of a bot's topics, which process_bot joins into `category`
+TOPIC_FILTER = "topic"
+QUERY_FILTERS = FILTER_FIELDS + (TOPIC_FILTER,)
+
+_CATEGORY = INDEXED_FIELDS.index("category")
+
+
+def topics(category: Optional[str]) -> List[str]:
+    """The repo topics process_bot joined into `category`."""
+    return list(dict.fromkeys(t.strip() for t in (category or "").split(",") if t.strip()))
+
+
+def sort_key(bot: Dict[str, Any]) -> Tuple[int, str]:
+    """Listing order: stars descending, then full_name as a tie-breaker."""
+    return -(bot.get("stars") or 0), bot.get("full_name") or ""
+
+
+def encode_cursor(bot: Dict[str, Any]) -> str:
+    raw = json.dumps([bot.get("stars") or 0, bot.get("full_name") or ""]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[int, str]]:
+    if not cursor:
+        return None
+    try:
+        stars, full_name = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return int(stars), str(full_name)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Requested projection, limited to known fields; stars/full_name are always kept for the cursor."""
+    if not fields:
+        return None
+    selected = [f for f in fields.split(",") if f in BOT_FIELDS]
+    return list(dict.fromkeys(selected + ["stars", "full_name"]))
+
+
+def mongo_cursor(collection, filters: Dict[str, str], cursor: Optional[Tuple[int, str]] = None,
+                 fields: Optional[List[str]] = None):
+    """Matching bots in listing order, after `cursor`, as an unconsumed pymongo cursor."""
+    query: Dict[str, Any] = {field: value for field, value in filters.items() if field != TOPIC_FILTER}
+    if filters.get(TOPIC_FILTER):
+        # No index of its own: checked per row while walking the listing order, stopping at a full page
+        query["category"] = {"$regex": f"(^|,)\\s*{re.escape(filters[TOPIC_FILTER])}\\s*(,|$)"}
+    if cursor:
+        stars, full_name = cursor
+        query["$or"] = [{"stars": {"$lt": stars}}, {"stars": stars, "full_name": {"$gt": full_name}}]
+    projection = {"_id": 0}
+    if fields:
+        projection.update({f: 1 for f in fields})
+    return collection.find(query, projection).sort([("stars", -1), ("full_name", 1)])
+
+
+def query_mongo(collection, filters: Dict[str, str], cursor: Optional[Tuple[int, str]], limit: int,
+                fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    return list(mongo_cursor(collection, filters, cursor, fields).limit(limit))
+
+
+class LocalBotIndex:
+    """In-memory equivalent of the Mongo indexes for the local-file fallback.
+
+    Bots are kept in keyset order with a sorted list of positions per filter
+    value, so a page is a bisect plus a walk over the smallest posting list.
+    """
+
+    def __init__(self, bots: Iterable[Dict[str, Any]]):
+        self.bots = sorted(bots, key=sort_key)
+        self._build([sort_key(bot) for bot in self.bots],
+                    [tuple(bot.get(field) for field in INDEXED_FIELDS) for bot in self.bots])
+
+    def _build(self, keys: List[Tuple[int, str]], values: List[Tuple[Any, ...]]):
+        """Index positions by listing key, by each FILTER_FIELDS value and by topic; `values` follow INDEXED_FIELDS."""
+        self.keys = keys
+        self.values = values
+        self.postings: Dict[str, Dict[Any, List[int]]] = {field: defaultdict(list) for field in QUERY_FILTERS}
+        for position, row in enumerate(values):
+            for field, value in zip(FILTER_FIELDS, row):
+                self.postings[field][value].append(position)
+            for topic in topics(row[_CATEGORY]):
+                self.postings[TOPIC_FILTER][topic].append(position)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def record(self, position: int) -> Dict[str, Any]:
+        return self.bots[position]
+
+    def iter_bots(self) -> Iterator[Dict[str, Any]]:
+        """Every bot in listing order."""
+        return (self.record(position) for position in range(len(self)))
+
+    def query(self, filters: Dict[str, str], cursor: Optional[Tuple[int, str]], limit: int,
+              fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        start = bisect_right(self.keys, (-cursor[0], cursor[1])) if cursor else 0
+        if filters:
+            lists = [self.postings[field].get(value, []) for field, value in filters.items()]
+            postings = min(lists, key=len)
+            candidates = itertools.islice(postings, bisect_left(postings, start), None)
+        else:
+            candidates = range(start, len(self))
+        checks = [(FILTER_FIELDS.index(field), value) for field, value in filters.items() if field != TOPIC_FILTER]
+        topic = filters.get(TOPIC_FILTER)
+        page = []
+        for position in candidates:
+            row = self.values[position]
+            if all(row[i] == value for i, value in checks) and (not topic or topic in topics(row[_CATEGORY])):
+                bot = self.record(position)
+                page.append({f: bot.get(f) for f in fields} if fields else bot)
+                if len(page) >= limit:
+                    break
+        return page
+
+
+def page_response(items: List[Dict[str, Any]], limit: int) -> Dict[str, Any]:
+    """Trim the limit+1 lookahead row and derive the next cursor."""
+    has_more = len(items) > limit
+    items = items[:limit]
+    return {
+        "bots": items,
+        "count": len(items),
+        "next_cursor": encode_cursor(items[-1]) if has_more and items else None,
+    }
+
+
+def find_page(collection, local_index: Callable[[], LocalBotIndex], filters: Dict[str, str] = None,
+              cursor: Optional[Tuple[int, str]] = None, limit: int = DEFAULT_PAGE_SIZE,
+              fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """One keyset page from MongoDB, or from the local index if Mongo is unavailable or empty."""
+    filters = filters or {}
+    items = None
+    if collection is not None:
+        try:
+            items = query_mongo(collection, filters, cursor, limit + 1, fields)
+        except Exception as e:
+            print(f"MongoDB Error: {e}")
+    if items is None or (not items and not filters and cursor is None):
+        items = local_index().query(filters, cursor, limit + 1, fields)
+    return page_response(items, limit)
@@ -0,0 +1,59 @@
+from typing import Callable, Dict, Any
+
+from flask import Blueprint, Response, jsonify, request
+
+from bot_queries import (DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, QUERY_FILTERS, LocalBotIndex,
+                         decode_cursor, parse_fields, find_page)
+from search_index import BM25Index, search_page
+from exporter import EXPORT_FORMATS, export_fields, iter_bots, encode_export
+
+MAX_QUERY_LENGTH = 200
+
+# Counts only move when a sync writes; a short shared cache keeps CDNs from asking on every view
+FACETS_CACHE_CONTROL = "public, max-age=60"
+
+
+def create_api_blueprint(get_collection: Callable, local_index: Callable[[], LocalBotIndex],
+                         search_index: Callable[[], BM25Index], facets: Callable[[], Dict[str, Any]]) -> Blueprint:
+    """JSON read API shared by the local app and the Vercel entry point."""
+    api = Blueprint("bots_api", __name__)
+
+    @api.route("/api/bots")
+    def list_bots():
+        """Keyset-paginated listing: ?cursor=&limit=&repo_type=&language=&license=&topic=&fields=a,b"""
+        try:
+            cursor = decode_cursor(request.args.get("cursor"))
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+        limit = min(max(request.args.get("limit", DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+        filters = {field: request.args[field] for field in QUERY_FILTERS if request.args.get(field)}
+        fields = parse_fields(request.args.get("fields"))
+        return jsonify(find_page(get_collection(), local_index, filters, cursor, limit, fields))
+
+    @api.route("/search")
+    def search():
+        """Ranked full-text search over names and summaries: ?q=&page=&limit="""
+        query = (request.args.get("q") or "").strip()[:MAX_QUERY_LENGTH]
+        if not query:
+            return jsonify({"error": "Missing query parameter 'q'"}), 400
+        page = max(request.args.get("page", 1, type=int), 1)
+        limit = min(max(request.args.get("limit", DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+        return jsonify(search_page(get_collection(), search_index, query, page, limit))
+
+    @api.route("/api/facets")
+    def list_facets():
+        """Bot counts per repo_type, language, license and topic, plus a star histogram."""
+        response = jsonify(facets())
+        response.headers["Cache-Control"] = FACETS_CACHE_CONTROL
+        return response
+
+    @api.route("/api/export.<any(csv, ndjson, json):fmt>")
+    def export(fmt):
+        """Streamed full dump in listing order: ?repo_type=&language=&license=&topic=&fields=a,b"""
+        filters = {field: request.args[field] for field in QUERY_FILTERS if request.args.get(field)}
+        fields = export_fields(request.args.get("fields"))
+        bots = iter_bots(get_collection(), local_index, filters, fields)
+        return Response(encode_export(fmt, bots, fields), mimetype=EXPORT_FORMATS[fmt],
+                        headers={"Content-Disposition": f'attachment; filename="bots.{fmt}"'})
+
+    return api
@@ -0,0 +1,151 @@
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Optional, Any
+
+if TYPE_CHECKING:
+    from pymongo import MongoClient
+
+from persistence import ensure_indexes
+
+DB_NAME = "bot_directory"
+
+_clients = {}
+_clients_lock = threading.Lock()
+_indexed = set()
+
+# Bumped in-process on every write so same-process caches see it immediately
+_local_version = 0
+
+
+def get_client(uri: str) -> Optional["MongoClient"]:
+    """Process-wide MongoClient per URI, created on first use.
+
+    pymongo itself is only imported here, so web cold starts that never reach
+    MongoDB (or reach it later) do not pay for the import.
+    """
+    if not uri:
+        return None
+    client = _clients.get(uri)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(uri)
+            if client is None:
+                from pymongo import MongoClient
+                client = MongoClient(uri, serverSelectionTimeoutMS=5000, maxPoolSize=50)
+                _clients[uri] = client
+    return client
+
+
+def get_db(uri: str):
+    client = get_client(uri)
+    return client.get_database(DB_NAME) if client is not None else None
+
+
+def get_collection(uri: str, name: str = "bots", indexes: bool = True):
+    try:
+        db = get_db(uri)
+    except Exception as e:
+        print(f"[!] MongoDB connection error: {e}")
+        return None
+    if db is None:
+        return None
+    collection = db.get_collection(name)
+    # Read-only callers skip this so a cold web start is not spent on createIndex round trips
+    if name == "bots" and indexes and uri not in _indexed:
+        _indexed.add(uri)
+        ensure_indexes(collection)
+    return collection
+
+
+def bump_data_version(db):
+    """Record that the bot data changed, for every web instance's caches."""
+    global _local_version
+    _local_version += 1
+    if db is None:
+        return
+    try:
+        db.get_collection("meta").update_one(
+            {"_id": "data_version"},
+            {"$inc": {"version": 1}, "$set": {"updated_at": time.time()}},
+            upsert=True
+        )
+    except Exception as e:
+        print(f"[!] Could not bump data version: {e}")
+
+
+def data_version(uri: str = None, local_path: str = None) -> Any:
+    """Current data version: the Mongo marker, else the local file's mtime."""
+    if uri:
+        try:
+            doc = get_db(uri).get_collection("meta").find_one({"_id": "data_version"})
+            return (_local_version, doc.get("version") if doc else 0)
+        except Exception as e:
+            print(f"[!] Could not read data version: {e}")
+    try:
+        return (_local_version, os.path.getmtime(local_path)) if local_path else (_local_version,)
+    except OSError:
+        return (_local_version, None)
+
+
+class ListingCache:
+    """In-process cache of a value (the sorted bot listing) with TTL and stale-while-revalidate.
+
+    Within `ttl` seconds the cached value is returned without touching the
+    database. Until `stale_ttl` the stale value is still served while one
+    background thread revalidates it. Revalidation first compares the cheap
+    data version marker and only reloads when a sync has written since.
+    """
+
+    def __init__(self, loader: Callable[[], Any], version: Callable[[], Any],
+                 ttl: float = 30.0, stale_ttl: float = 600.0, initial: Any = None):
+        self.loader = loader
+        self.version = version
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._value = None
+        self._version = None
+        self._loaded_at = 0.0
+        self._local_version = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+        if initial is not None:
+            # A precomputed value (the listing snapshot) counts as already stale: the
+            # first get() serves it and revalidates in the background
+            self._value = initial
+            self._loaded_at = time.monotonic() - ttl
+            self._local_version = _local_version
+
+    def _refresh(self):
+        try:
+            version = self.version()
+            if self._value is None or version != self._version:
+                value = self.loader()
+                with self._lock:
+                    self._value, self._version = value, version
+            with self._lock:
+                self._loaded_at = time.monotonic()
+                self._local_version = _local_version
+        finally:
+            self._refreshing = False
+
+    def get(self) -> Any:
+        age = time.monotonic() - self._loaded_at
+        if self._value is not None and self._local_version == _local_version:
+            if age < self.ttl:
+                return self._value
+            if age < self.stale_ttl:
+                with self._lock:
+                    start = not self._refreshing
+                    self._refreshing = True
+                if start:
+                    threading.Thread(target=self._refresh, daemon=True).start()
+                return self._value
+        self._refreshing = True
+        self._refresh()
+        return self._value
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = 0.0
+            self._version = None
@@ -0,0 +1,136 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from typing import Callable, List, Dict, Any, Iterable, Iterator, Optional
+
+from bot_queries import LocalBotIndex, mongo_cursor
+from persistence import BOT_FIELDS
+
+# Format -> Content-Type; also the file extensions the CLI recognises
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson", "json": "application/json"}
+
+# Bots per MongoDB round trip or local page: the most an export holds at once
+EXPORT_BATCH_SIZE = 500
+
+# Encoded output is handed on in pieces of about this many characters
+CHUNK_CHARS = 64 * 1024
+
+# Export files are for sharing, so they get the usual file mode rather than mkstemp's 0600
+EXPORT_FILE_MODE = 0o644
+
+
+def export_fields(fields: Optional[str]) -> List[str]:
+    """Requested known fields in the order given, or every field when none are."""
+    selected = [f for f in (fields or "").split(",") if f in BOT_FIELDS]
+    return list(dict.fromkeys(selected)) or list(BOT_FIELDS)
+
+
+def iter_bots(collection, local_index: Callable[[], LocalBotIndex], filters: Dict[str, str],
+              fields: List[str]) -> Iterator[Dict[str, Any]]:
+    """Every matching bot in listing order, streamed from MongoDB or else the local store.
+
+    Follows find_page: the local store is used when MongoDB is unavailable,
+    or empty and unfiltered. A MongoDB error part-way through is raised, since
+    carrying on from another source could skip or repeat bots.
+    """
+    # stars/full_name carry the keyset cursor between local pages
+    fetch = list(dict.fromkeys(fields + ["stars", "full_name"]))
+    if collection is not None:
+        streamed = False
+        try:
+            for bot in mongo_cursor(collection, filters, fields=fetch).batch_size(EXPORT_BATCH_SIZE):
+                streamed = True
+                yield bot
+        except Exception as e:
+            if streamed:
+                raise
+            print(f"MongoDB Error: {e}")
+        else:
+            if streamed or filters:
+                return
+    index = local_index()
+    cursor = None
+    while True:
+        page = index.query(filters, cursor, EXPORT_BATCH_SIZE, fetch)
+        yield from page
+        if len(page) < EXPORT_BATCH_SIZE:
+            return
+        cursor = (page[-1].get("stars") or 0, page[-1].get("full_name") or "")
+
+
+def _chunked(pieces: Iterable[str]) -> Iterator[str]:
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= CHUNK_CHARS:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def _csv(bots: Iterable[Dict[str, Any]], fields: List[str]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+    writer.writeheader()
+    for bot in bots:
+        writer.writerow(bot)
+        if buffer.tell() >= CHUNK_CHARS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ndjson(bots: Iterable[Dict[str, Any]], fields: List[str]) -> Iterator[str]:
+    for bot in bots:
+        yield json.dumps({f: bot.get(f) for f in fields}, ensure_ascii=False) + "\n"
+
+
+def _json(bots: Iterable[Dict[str, Any]], fields: List[str]) -> Iterator[str]:
+    separator = "["
+    for bot in bots:
+        yield separator + json.dumps({f: bot.get(f) for f in fields}, ensure_ascii=False)
+        separator = ","
+    # An empty export is still a valid (empty) array
+    yield "]" if separator == "," else "[]"
+
+
+def encode_export(fmt: str, bots: Iterable[Dict[str, Any]], fields: List[str]) -> Iterator[str]:
+    """`bots` encoded as `fmt`, lazily, in chunks of about CHUNK_CHARS characters."""
+    if fmt == "csv":
+        return _csv(bots, fields)
+    encode = {"ndjson": _ndjson, "json": _json}[fmt]
+    return _chunked(encode(bots, fields))
+
+
+def _current_umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+def write_export(path: str, fmt: str, bots: Iterable[Dict[str, Any]], fields: List[str]) -> int:
+    """Atomically write an export file; returns how many bots it holds."""
+    count = 0
+
+    def counted() -> Iterator[Dict[str, Any]]:
+        nonlocal count
+        for bot in bots:
+            count += 1
+            yield bot
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+            for chunk in encode_export(fmt, counted(), fields):
+                f.write(chunk)
+        os.chmod(tmp_path, EXPORT_FILE_MODE & ~_current_umask())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return count
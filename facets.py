@@ -0,0 +1,149 @@
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from typing import Callable, List, Dict, Any, Optional, Tuple
+
+from bot_queries import LocalBotIndex, topics
+from persistence import FILTER_FIELDS, INDEXED_FIELDS
+from summary_cache import utc_now_iso
+
+FACETS_COLLECTION = "facets"
+
+# Lower bounds of the star histogram's buckets
+STAR_BUCKETS = (0, 10, 50, 100, 500, 1000, 5000, 10000)
+
+# Most frequent values returned per facet
+MAX_FACET_VALUES = 50
+
+# What a replaced bot must be read back with to take its old contribution out
+FACET_PROJECTION = {"_id": 0, "full_name": 1, "stars": 1, "category": 1, **{field: 1 for field in FILTER_FIELDS}}
+
+# Present once the counts have been built from the whole bots collection
+BUILT_ID = "_built"
+
+
+def star_bucket(stars: Optional[int]) -> str:
+    i = max(bisect_right(STAR_BUCKETS, stars or 0) - 1, 0)
+    if i + 1 < len(STAR_BUCKETS):
+        return f"{STAR_BUCKETS[i]}-{STAR_BUCKETS[i + 1] - 1}"
+    return f"{STAR_BUCKETS[i]}+"
+
+
+def contributions(bot: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """The (facet, value) pairs one bot is counted under."""
+    pairs = [("total", "")]
+    pairs += [(field, bot[field]) for field in FILTER_FIELDS if bot.get(field) not in (None, "", "None")]
+    pairs += [("topic", topic) for topic in topics(bot.get("category"))]
+    pairs.append(("stars", star_bucket(bot.get("stars"))))
+    return pairs
+
+
+class FacetCounts:
+    """Bot counts per (facet, value); adding a bot with sign -1 takes it back out."""
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+
+    def add(self, bot: Dict[str, Any], sign: int = 1):
+        for pair in contributions(bot):
+            self.counts[pair] += sign
+
+    def summary(self, limit: int = MAX_FACET_VALUES) -> Dict[str, Any]:
+        values = defaultdict(list)
+        for (facet, value), count in self.counts.items():
+            if count > 0 and facet not in ("total", "stars"):
+                values[facet].append({"value": value, "count": count})
+        return {
+            "total": self.counts.get(("total", ""), 0),
+            "facets": {facet: sorted(values[facet], key=lambda v: (-v["count"], v["value"]))[:limit]
+                       for facet in FILTER_FIELDS + ("topic",)},
+            "stars": [{"bucket": star_bucket(low), "min": low, "count": self.counts.get(("stars", star_bucket(low)), 0)}
+                      for low in STAR_BUCKETS],
+        }
+
+
+def index_facets(index: LocalBotIndex) -> FacetCounts:
+    """Counts from a local index's in-memory rows, without decoding any record."""
+    counts = FacetCounts()
+    for (negative_stars, _), values in zip(index.keys, index.values):
+        counts.add(dict(zip(INDEXED_FIELDS, values), stars=-negative_stars))
+    return counts
+
+
+class FacetStore:
+    """Materialized facet counts in MongoDB, one document per (facet, value).
+
+    BotWriter hands every upserted batch to record() together with the
+    versions it replaced, so the counts move by $inc deltas as the sync
+    writes; rebuild() recounts from the bots collection in one pass.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def previous(self, bots_collection, full_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """The stored versions of these bots, read before they are overwritten."""
+        return {doc["full_name"]: doc
+                for doc in bots_collection.find({"full_name": {"$in": full_names}}, FACET_PROJECTION)}
+
+    def record(self, batch: List[Dict[str, Any]], previous: Dict[str, Dict[str, Any]]):
+        delta = FacetCounts()
+        # A repo written twice in one batch replaced its stored version only once
+        for full_name, bot in {bot["full_name"]: bot for bot in batch}.items():
+            if full_name in previous:
+                delta.add(previous[full_name], -1)
+            delta.add(bot)
+        self._write(delta.counts, increment=True)
+
+    def _write(self, counts: Dict[Tuple[str, str], int], increment: bool):
+        from pymongo import UpdateOne
+        ops = []
+        for (facet, value), count in counts.items():
+            if increment and not count:
+                continue
+            update = {"$set": {"facet": facet, "value": value}}
+            if increment:
+                update["$inc"] = {"count": count}
+            else:
+                update["$set"]["count"] = count
+            ops.append(UpdateOne({"_id": f"{facet}:{value}"}, update, upsert=True))
+        if ops:
+            self.collection.bulk_write(ops, ordered=False)
+
+    def built(self) -> bool:
+        """Whether the counts were built and no writer has since flagged them for a rebuild."""
+        return self.collection.find_one({"_id": BUILT_ID, "stale": {"$ne": True}}) is not None
+
+    def mark_stale(self):
+        """Flag the counts for a rebuild: the next writer to open, or the next full sync, recounts them."""
+        self.collection.update_one({"_id": BUILT_ID}, {"$set": {"stale": True}})
+
+    def rebuild(self, bots_collection):
+        """Recount from scratch, streaming the bots; also corrects any drift from racing writers."""
+        counts = FacetCounts()
+        for bot in bots_collection.find({}, FACET_PROJECTION).batch_size(1000):
+            counts.add(bot)
+        self._write(counts.counts, increment=False)
+        keep = [f"{facet}:{value}" for facet, value in counts.counts] + [BUILT_ID]
+        self.collection.delete_many({"_id": {"$nin": keep}})
+        self.collection.update_one({"_id": BUILT_ID}, {"$set": {"built_at": utc_now_iso(), "stale": False}}, upsert=True)
+
+    def load(self) -> Optional[FacetCounts]:
+        """The stored counts, or None before the first build; stale ones are still served until rebuilt."""
+        if self.collection.find_one({"_id": BUILT_ID}) is None:
+            return None
+        counts = FacetCounts()
+        for doc in self.collection.find({"facet": {"$ne": None}}):
+            counts.counts[(doc["facet"], doc["value"])] = doc.get("count", 0)
+        return counts
+
+
+def facet_summary(collection, local_index: Callable[[], LocalBotIndex]) -> Dict[str, Any]:
+    """Facets from MongoDB's materialized counts, or counted from the local index without them."""
+    if collection is not None:
+        try:
+            counts = FacetStore(collection).load()
+            if counts is not None:
+                return counts.summary()
+        except Exception as e:
+            print(f"MongoDB Error: {e}")
+    return index_facets(local_index()).summary()
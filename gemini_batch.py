@@ -0,0 +1,144 @@
+import json
+import re
+import threading
+from concurrent.futures import Future
+from typing import Callable, List, Dict, Any, Optional, Tuple
+
+from repo_classifier import LABELS
+
+# Repos packed into one generate_content call, and how long the first one waits for company
+DEFAULT_BATCH_SIZE = 8
+DEFAULT_MAX_WAIT = 0.25
+
+SUMMARY_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "what_it_does": {"type": "STRING"},
+        "how_to_use": {"type": "STRING"},
+        "repo_type": {"type": "STRING", "enum": list(LABELS)},
+    },
+    "required": ["what_it_does", "how_to_use", "repo_type"],
+}
+
+BATCH_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": dict(full_name={"type": "STRING"}, **SUMMARY_SCHEMA["properties"]),
+        "required": ["full_name"] + SUMMARY_SCHEMA["required"],
+    },
+}
+
+SUMMARY_CONFIG = {"response_mime_type": "application/json", "response_schema": SUMMARY_SCHEMA}
+BATCH_CONFIG = {"response_mime_type": "application/json", "response_schema": BATCH_SCHEMA}
+
+
+def build_batch_prompt(items: List[Tuple[str, str, str]]) -> str:
+    """One prompt for several (full_name, readme, description) items; READMEs arrive compacted."""
+    repos = [{"full_name": full_name, "description": description, "readme_snippet": readme or ""}
+             for full_name, readme, description in items]
+    return (
+        "Analyze each of these GitHub repositories and return one summary object per repository.\n"
+        "Copy each repository's 'full_name' into its summary unchanged.\n"
+        "'repo_type' must be exactly either 'Library/Module' or 'Application/Bot'.\n"
+        "Keep the values concise but informative.\n\n"
+        f"Repositories (JSON):\n{json.dumps(repos, ensure_ascii=False)}"
+    )
+
+
+def validate_summary(value: Any) -> Optional[Dict[str, str]]:
+    """The three summary fields if `value` carries all of them, non-empty and well-typed."""
+    if not isinstance(value, dict):
+        return None
+    summary = {}
+    for field in SUMMARY_SCHEMA["required"]:
+        text = value.get(field)
+        if not isinstance(text, str) or not text.strip():
+            return None
+        summary[field] = text.strip()
+    if summary["repo_type"] not in LABELS:
+        return None
+    return summary
+
+
+def _load_json(raw_text: str) -> Any:
+    raw_text = raw_text.strip()
+    try:
+        return json.loads(raw_text)
+    except ValueError:
+        pass
+    # Older models, or a schema the backend ignored: pull the JSON out of fences or prose
+    match = re.search(r"[\[{].*[\]}]", raw_text, re.DOTALL)
+    if match:
+        try:
+            return json.loads(match.group(0))
+        except ValueError:
+            pass
+    return None
+
+
+def parse_summary(raw_text: str) -> Optional[Dict[str, str]]:
+    return validate_summary(_load_json(raw_text))
+
+
+def parse_batch(raw_text: str, full_names: List[str]) -> Dict[str, Dict[str, str]]:
+    """full_name -> validated summary, for the requested repos the reply covered correctly."""
+    data = _load_json(raw_text)
+    if isinstance(data, dict):
+        # Some replies wrap the array, e.g. {"summaries": [...]}
+        data = next((v for v in data.values() if isinstance(v, list)), None)
+    if not isinstance(data, list):
+        return {}
+    wanted = set(full_names)
+    found = {}
+    for item in data:
+        summary = validate_summary(item)
+        full_name = item.get("full_name") if isinstance(item, dict) else None
+        if summary and full_name in wanted and full_name not in found:
+            found[full_name] = summary
+    return found
+
+
+class MicroBatcher:
+    """Groups concurrent submit() calls into one `handle_batch(items)` call.
+
+    The first caller of a batch leads it: it waits up to `max_wait` seconds
+    for others (or until `max_size` items are in), runs the batch in its own
+    thread and resolves everyone's future. `handle_batch` returns one result
+    per item, in order; if it raises, every future in the batch gets the error.
+    """
+
+    def __init__(self, handle_batch: Callable[[List[Any]], List[Any]], max_size: int = DEFAULT_BATCH_SIZE,
+                 max_wait: float = DEFAULT_MAX_WAIT):
+        self.handle_batch = handle_batch
+        self.max_size = max(1, max_size)
+        self.max_wait = max_wait
+        self._open: List[Tuple[Any, Future]] = []
+        self._cond = threading.Condition()
+
+    def submit(self, item: Any) -> Future:
+        future = Future()
+        with self._cond:
+            batch = self._open
+            batch.append((item, future))
+            leader = len(batch) == 1
+            if len(batch) >= self.max_size:
+                self._open = []
+                self._cond.notify_all()
+        if leader:
+            self._lead(batch)
+        return future
+
+    def _lead(self, batch: List[Tuple[Any, Future]]):
+        with self._cond:
+            self._cond.wait_for(lambda: self._open is not batch, timeout=self.max_wait)
+            if self._open is batch:
+                self._open = []
+        try:
+            results = self.handle_batch([item for item, _ in batch])
+        except BaseException as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
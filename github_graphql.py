@@ -0,0 +1,106 @@
+import itertools
+import json
+from typing import Callable, List, Dict, Any, Iterable, Iterator, Optional
+
+# Tried in order; the first one that exists is the README
+README_VARIANTS = ["README.md", "readme.md", "Readme.md", "README.MD", "README.rst", "README.txt", "README"]
+
+# Repositories per query. GitHub charges roughly one point per 100 nodes, so
+# 50 repos with a handful of blob lookups each still costs a single point.
+DEFAULT_BATCH_SIZE = 50
+
+REPO_FIELDS = """
+    nameWithOwner name description url stargazerCount forkCount pushedAt updatedAt
+    owner { login }
+    primaryLanguage { name }
+    licenseInfo { name }
+    issues(states: OPEN) { totalCount }
+    repositoryTopics(first: 20) { nodes { topic { name } } }
+"""
+
+
+def chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    items = iter(items)
+    while True:
+        batch = list(itertools.islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+def build_query(repos: List[Dict[str, Any]]) -> str:
+    """One query with an aliased `repository` lookup per repo plus the rate-limit cost."""
+    blobs = "\n".join(
+        f"    readme{i}: object(expression: {json.dumps('HEAD:' + path)}) {{ ... on Blob {{ text }} }}"
+        for i, path in enumerate(README_VARIANTS)
+    )
+    parts = []
+    for i, repo in enumerate(repos):
+        owner, name = repo["full_name"].split("/", 1)
+        parts.append(f"  r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) {{"
+                     f"{REPO_FIELDS}{blobs}\n  }}")
+    return "query {\n" + "\n".join(parts) + "\n  rateLimit { cost remaining limit resetAt }\n}"
+
+
+def to_rest_shape(node: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a GraphQL repository node onto the REST search item keys process_bot reads."""
+    return {
+        "name": node.get("name"),
+        "full_name": node.get("nameWithOwner"),
+        "owner": {"login": (node.get("owner") or {}).get("login")},
+        "description": node.get("description"),
+        "html_url": node.get("url"),
+        "stargazers_count": node.get("stargazerCount"),
+        "forks_count": node.get("forkCount"),
+        "open_issues_count": (node.get("issues") or {}).get("totalCount"),
+        "pushed_at": node.get("pushedAt"),
+        "updated_at": node.get("updatedAt"),
+        "language": (node.get("primaryLanguage") or {}).get("name"),
+        "license": {"name": node["licenseInfo"]["name"]} if node.get("licenseInfo") else None,
+        "topics": [t["topic"]["name"] for t in (node.get("repositoryTopics") or {}).get("nodes", [])],
+    }
+
+
+def readme_text(node: Dict[str, Any]) -> str:
+    for i in range(len(README_VARIANTS)):
+        blob = node.get(f"readme{i}")
+        # `text` is null for binary blobs
+        if blob and blob.get("text"):
+            return blob["text"]
+    return ""
+
+
+class GraphQLBatchFetcher:
+    """Fetches metadata and README text for many repositories per GraphQL round trip.
+
+    `post(query)` sends one query and returns the decoded response body.
+    Repos missing from a response (not found, or the whole batch failed) are
+    left out of the result so the caller can fall back to REST for them.
+    """
+
+    def __init__(self, post: Callable[[str], Dict[str, Any]], batch_size: int = DEFAULT_BATCH_SIZE):
+        self.post = post
+        self.batch_size = batch_size
+        self.queries = 0
+        self.total_cost = 0
+        self.rate_limit: Optional[Dict[str, Any]] = None
+
+    def fetch(self, repos: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """full_name -> {"metadata": REST-shaped fields, "readme": text} for up to `batch_size` repos."""
+        if not repos:
+            return {}
+        response = self.post(build_query(repos))
+        self.queries += 1
+        data = response.get("data") or {}
+        if data.get("rateLimit"):
+            self.rate_limit = data["rateLimit"]
+            self.total_cost += self.rate_limit.get("cost") or 0
+        for error in response.get("errors") or []:
+            if error.get("type") != "NOT_FOUND":
+                print(f"[!] GitHub GraphQL error: {error.get('message')}")
+        found = {}
+        for i, repo in enumerate(repos):
+            node = data.get(f"r{i}")
+            if node:
+                found[repo["full_name"]] = {"metadata": to_rest_shape(node), "readme": readme_text(node)}
+        return found
@@ -0,0 +1,130 @@
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
+
+# GitHub search never returns more than 1000 results for a single query
+SEARCH_RESULT_CAP = 1000
+PER_PAGE = 100
+
+# Most popular first; each band is split further by creation date when it
+# holds more results than one query can return.
+STAR_BANDS = ["stars:>=1000", "stars:200..999", "stars:50..199", "stars:10..49",
+              "stars:3..9", "stars:1..2", "stars:0"]
+
+FIRST_REPO_DATE = date(2008, 1, 1)
+
+# Attempts per search page before the walk gives up, and the pause between them
+SEARCH_ATTEMPTS = 3
+SEARCH_RETRY_DELAY = 2.0
+
+
+class SearchError(Exception):
+    """A search page could not be fetched; the walk stops rather than skip the shard."""
+
+
+def _created(start: date, end: date) -> str:
+    return f"created:{start.isoformat()}..{end.isoformat()}"
+
+
+def _parse_created(qualifier: str) -> Optional[Tuple[date, date]]:
+    for part in qualifier.split():
+        if part.startswith("created:"):
+            start, end = part[len("created:"):].split("..")
+            return date.fromisoformat(start), date.fromisoformat(end)
+    return None
+
+
+class ShardedSearch:
+    """Streams every repository matching a query, past the 1000-result cap.
+
+    The query is split into shards (star bands, then halving `created:`
+    ranges) until each shard fits under the cap. Shards are planned lazily
+    while pages are consumed, so only the current page is held in memory.
+    """
+
+    def __init__(self, request: Callable[[Dict[str, Any]], Dict[str, Any]], query: str = "telegram bot",
+                 start: date = FIRST_REPO_DATE, end: date = None, retry_delay: float = SEARCH_RETRY_DELAY):
+        self.request = request
+        self.query = query
+        self.start = start
+        self.end = end or date.today()
+        self.retry_delay = retry_delay
+
+    def _fetch(self, shard: str, page: int) -> Dict[str, Any]:
+        """One page of results; raises SearchError when every attempt fails.
+
+        A real answer always carries total_count, even with no results; the
+        request helper returns {} for network errors and non-200 responses,
+        which must not be mistaken for an empty shard.
+        """
+        params = {"q": f"{self.query} {shard}", "sort": "stars", "order": "desc",
+                  "per_page": PER_PAGE, "page": page}
+        for attempt in range(SEARCH_ATTEMPTS):
+            if attempt:
+                time.sleep(self.retry_delay * attempt)
+            data = self.request(params)
+            if "total_count" in data:
+                return data
+            print(f"[!] Search page {page} of '{shard}' failed (attempt {attempt + 1}/{SEARCH_ATTEMPTS})")
+        raise SearchError(f"Search page {page} of '{shard}' failed {SEARCH_ATTEMPTS} times")
+
+    def _split(self, shard: str) -> List[str]:
+        band, _, _ = shard.partition(" ")
+        created = _parse_created(shard)
+        start, end = created or (self.start, self.end)
+        if start >= end:
+            return []
+        mid = start + timedelta(days=(end - start).days // 2)
+        return [f"{band} {_created(start, mid)}", f"{band} {_created(mid + timedelta(days=1), end)}"]
+
+    def pages(self, cursor: Dict[str, Any] = None) -> Iterator[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """Yield (cursor, items) for every page of every shard, in order.
+
+        The cursor yielded with a page points just past it (the shards still
+        to walk and the next page of the first one), so passing it back in
+        resumes the walk without re-planning the shards already done. A page
+        that cannot be fetched raises SearchError before any cursor past it
+        is yielded.
+        """
+        if cursor:
+            stack = list(reversed(cursor["shards"]))
+            page = cursor.get("page", 1)
+        else:
+            stack = list(reversed(STAR_BANDS))
+            page = 1
+        while stack:
+            shard = stack.pop()
+            data = self._fetch(shard, page)
+            total = data.get("total_count", 0)
+            if total > SEARCH_RESULT_CAP:
+                children = self._split(shard)
+                if children:
+                    stack.extend(reversed(children))
+                    page = 1
+                    continue
+                print(f"[!] Search shard '{shard}' still has {total} results; only the first {SEARCH_RESULT_CAP} are reachable")
+            last_page = -(-min(total, SEARCH_RESULT_CAP) // PER_PAGE)
+            while True:
+                items = data.get("items", [])
+                done = page >= last_page or len(items) < PER_PAGE
+                if done:
+                    next_cursor = {"shards": list(reversed(stack)), "page": 1}
+                else:
+                    next_cursor = {"shards": [shard] + list(reversed(stack)), "page": page + 1}
+                if items:
+                    yield next_cursor, items
+                if done:
+                    break
+                page += 1
+                data = self._fetch(shard, page)
+            page = 1
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        seen = set()
+        for _, items in self.pages():
+            for repo in items:
+                # Star bands can overlap while stars change mid-walk
+                if repo["full_name"] in seen:
+                    continue
+                seen.add(repo["full_name"])
+                yield repo
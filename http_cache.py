@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+
+
+# Cached responses are dropped this long after they were fetched in full
+DEFAULT_TTL_DAYS = 30
+
+# Most files the on-disk cache keeps; the oldest go first
+DEFAULT_MAX_FILES = 50000
+
+
+class FileResponseCache:
+    """On-disk store of GitHub responses keyed by URL, with their validators.
+
+    Mirrors MongoResponseCache's TTL index: files older than `ttl_days` are
+    ignored on read and removed by prune(), which also keeps at most
+    `max_files` of the newest. A cache is pruned once when it is opened.
+    """
+
+    def __init__(self, directory: str = ".http_cache", ttl_days: float = DEFAULT_TTL_DAYS,
+                 max_files: int = DEFAULT_MAX_FILES):
+        self.directory = directory
+        self.ttl = ttl_days * 86400
+        self.max_files = max_files
+        self.writable = True
+        self.prune()
+
+    def prune(self) -> int:
+        """Delete expired files and the oldest beyond max_files; returns how many were removed."""
+        try:
+            entries = []
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(".json"):
+                        entries.append((entry.stat().st_mtime, entry.path))
+        except OSError:
+            return 0
+        entries.sort(reverse=True)
+        cutoff = time.time() - self.ttl
+        removed = 0
+        for i, (mtime, path) in enumerate(entries):
+            if mtime < cutoff or i >= self.max_files:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - (entry.get("stored_at") or 0) > self.ttl:
+            return None
+        return entry
+
+    def set(self, url: str, entry: Dict[str, Any]):
+        if not self.writable:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(url))
+        except OSError as e:
+            self.writable = False
+            print(f"[*] HTTP cache disabled (read-only filesystem): {e}")
+
+
+class MongoResponseCache:
+    """Same interface as FileResponseCache, backed by a MongoDB collection.
+
+    A TTL index removes entries `ttl_days` after they were stored, so README
+    bodies of repos that are no longer fetched do not pile up; an expired
+    entry just costs one full (non-304) fetch.
+    """
+
+    def __init__(self, collection, ttl_days: float = DEFAULT_TTL_DAYS):
+        self.collection = collection
+        self.ttl_days = ttl_days
+        self.ensure_indexes()
+
+    def ensure_indexes(self):
+        try:
+            self.collection.create_index("stored_at", expireAfterSeconds=int(self.ttl_days * 86400))
+        except Exception as e:
+            print(f"[!] Could not create HTTP cache TTL index: {e}")
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            return self.collection.find_one({"_id": url}, {"_id": 0})
+        except Exception as e:
+            print(f"[!] HTTP cache read error: {e}")
+            return None
+
+    def set(self, url: str, entry: Dict[str, Any]):
+        try:
+            # TTL indexes only expire BSON dates, not the epoch seconds the file cache keeps
+            stored_at = datetime.fromtimestamp(entry.get("stored_at") or time.time(), timezone.utc)
+            self.collection.replace_one({"_id": url}, dict(entry, stored_at=stored_at), upsert=True)
+        except Exception as e:
+            print(f"[!] HTTP cache write error: {e}")
+
+
+def make_cache_entry(headers: Dict[str, str], body: bytes) -> Optional[Dict[str, Any]]:
+    """Build a cache entry from a 200 response, or None if it carries no validators."""
+    etag = headers.get("etag")
+    last_modified = headers.get("last-modified")
+    if not etag and not last_modified:
+        return None
+    return {
+        "etag": etag,
+        "last_modified": last_modified,
+        "body": body.decode("utf-8", errors="replace"),
+        "stored_at": time.time(),
+    }
+
+
+def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
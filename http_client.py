@@ -0,0 +1,140 @@
+import gzip
+import http.client
+import json
+import queue
+import threading
+import urllib.parse
+from typing import Dict, Any
+
+from http_cache import conditional_headers, make_cache_entry
+
+
+class HttpResponse:
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.from_cache = False
+
+    def json(self) -> Any:
+        if not self.body:
+            return {}
+        return json.loads(self.body.decode("utf-8"))
+
+
+class HttpSession:
+    """Pool of keep-alive HTTP(S) connections shared by all worker threads.
+
+    When a response cache is attached, GET requests are sent with
+    If-None-Match / If-Modified-Since and a 304 is answered from the cache.
+    """
+
+    def __init__(self, headers: Dict[str, str] = None, timeout: float = 30.0, pool_size: int = 10,
+                 cache=None):
+        self.headers = dict(headers or {})
+        self.headers.setdefault("Accept-Encoding", "gzip")
+        self.headers.setdefault("Connection", "keep-alive")
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.cache = cache
+        self._pools: Dict[tuple, queue.LifoQueue] = {}
+        self._lock = threading.Lock()
+
+    def _pool_for(self, key: tuple) -> queue.LifoQueue:
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools[key] = queue.LifoQueue(maxsize=self.pool_size)
+            return pool
+
+    def _new_connection(self, scheme: str, host: str) -> http.client.HTTPConnection:
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, timeout=self.timeout)
+        return http.client.HTTPConnection(host, timeout=self.timeout)
+
+    def _acquire(self, key: tuple) -> http.client.HTTPConnection:
+        try:
+            return self._pool_for(key).get_nowait()
+        except queue.Empty:
+            return self._new_connection(*key)
+
+    def _discard_idle(self, key: tuple):
+        """Close every pooled connection to a host; they went idle together, so one stale means all are."""
+        pool = self._pool_for(key)
+        while True:
+            try:
+                pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def _release(self, key: tuple, conn: http.client.HTTPConnection):
+        try:
+            self._pool_for(key).put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def request(self, method: str, url: str, params: Dict[str, Any] = None,
+                headers: Dict[str, str] = None, body: bytes = None) -> HttpResponse:
+        if params:
+            url = f"{url}?{urllib.parse.urlencode(params)}"
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        request_headers = dict(self.headers)
+        if headers:
+            request_headers.update(headers)
+
+        # A pooled connection may have been closed by the server while idle,
+        # so retry once on a newly opened connection before giving up.
+        for attempt in range(2):
+            conn = self._acquire(key) if not attempt else self._new_connection(*key)
+            try:
+                conn.request(method, path, body=body, headers=request_headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, ConnectionError, OSError):
+                conn.close()
+                if attempt:
+                    raise
+                self._discard_idle(key)
+                continue
+            response_headers = {k.lower(): v for k, v in response.getheaders()}
+            if response_headers.get("content-encoding") == "gzip":
+                data = gzip.decompress(data)
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+            return HttpResponse(response.status, response_headers, data)
+
+    def get(self, url: str, params: Dict[str, Any] = None, headers: Dict[str, str] = None) -> HttpResponse:
+        if self.cache is None:
+            return self.request("GET", url, params=params, headers=headers)
+        if params:
+            url = f"{url}?{urllib.parse.urlencode(params)}"
+        entry = self.cache.get(url)
+        request_headers = conditional_headers(entry)
+        if headers:
+            request_headers.update(headers)
+        response = self.request("GET", url, headers=request_headers)
+        if response.status == 304 and entry:
+            response = HttpResponse(200, response.headers, entry["body"].encode("utf-8"))
+            response.from_cache = True
+        elif response.status == 200:
+            new_entry = make_cache_entry(response.headers, response.body)
+            if new_entry:
+                self.cache.set(url, new_entry)
+        return response
+
+    def close(self):
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools = {}
+        for pool in pools:
+            while True:
+                try:
+                    pool.get_nowait().close()
+                except queue.Empty:
+                    break
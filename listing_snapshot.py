@@ -0,0 +1,44 @@
+import json
+import os
+import tempfile
+from typing import Dict, Any, Optional
+
+from bot_queries import MAX_PAGE_SIZE, encode_cursor
+from summary_cache import utc_now_iso
+
+# Written after each sync and shipped with the deployment; the home page serves it
+# on a cold start while the first real listing load happens in the background
+SNAPSHOT_PATH = "listing_snapshot.json"
+
+# Enough bots for any first page size the listing allows
+SNAPSHOT_SIZE = MAX_PAGE_SIZE
+
+
+def save_snapshot(page: Dict[str, Any], path: str = SNAPSHOT_PATH):
+    """Atomically write a listing page (find_page's result) as the cold-start snapshot."""
+    payload = {"bots": page["bots"], "next_cursor": page["next_cursor"], "generated_at": utc_now_iso()}
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        # Read-only deployments (Vercel) keep the snapshot they were built with
+        print(f"[!] Could not write listing snapshot: {e}")
+
+
+def load_snapshot(path: str = SNAPSHOT_PATH, limit: int = SNAPSHOT_SIZE) -> Optional[Dict[str, Any]]:
+    """The first `limit` bots of the snapshot as a listing page, or None if there is no usable one."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        bots = snapshot["bots"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if len(bots) > limit:
+        return {"bots": bots[:limit], "count": limit, "next_cursor": encode_cursor(bots[limit - 1])}
+    if len(bots) < limit and snapshot.get("next_cursor"):
+        # Taken with a smaller page size than asked for; a short first page would look like the end
+        return None
+    return {"bots": bots, "count": len(bots), "next_cursor": snapshot.get("next_cursor")}
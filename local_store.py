@@ -0,0 +1,112 @@
+import json
+import mmap
+import os
+import tempfile
+from typing import List, Dict, Any, Optional, Tuple
+
+from bot_queries import LocalBotIndex
+from persistence import INDEXED_FIELDS, load_local_bots
+
+# Bumped whenever the sidecar's row layout changes; older sidecars are rebuilt
+INDEX_FORMAT = 2
+
+# (-stars, full_name, offset, length, *INDEXED_FIELDS values) per repo
+Row = Tuple[Any, ...]
+
+
+def index_path(path: str) -> str:
+    return f"{path}.idx"
+
+
+def _file_id(stat: os.stat_result) -> List[int]:
+    # Compaction replaces the data file, so a new inode means a new file
+    return [stat.st_dev, stat.st_ino]
+
+
+def load_index(path: str, stat: os.stat_result) -> Optional[Dict[str, Any]]:
+    """The sidecar for the data file with `stat`, or None if it is missing or belongs to another file."""
+    try:
+        with open(index_path(path), "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (not isinstance(index, dict) or index.get("format") != INDEX_FORMAT
+            or index.get("file_id") != _file_id(stat) or not 0 <= index.get("data_size", -1) <= stat.st_size):
+        return None
+    return index
+
+
+def save_index(path: str, stat: os.stat_result, data_size: int, rows: List[Row]):
+    """Atomically write the sidecar covering the first `data_size` bytes of the data file."""
+    payload = {"format": INDEX_FORMAT, "file_id": _file_id(stat), "data_size": data_size, "rows": rows}
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, index_path(path))
+    except OSError as e:
+        # Read-only deployments rebuild the rows in memory on each load instead
+        print(f"[!] Could not write local index: {e}")
+
+
+class LocalBotStore(LocalBotIndex):
+    """LocalBotIndex over the NDJSON output that keeps no bots in memory.
+
+    Only each repo's listing key, byte range and INDEXED_FIELDS values are
+    held; a page decodes just its own lines from a read-only mmap of the
+    file. The rows come from the sidecar index plus a scan of whatever was
+    appended after it was written, and the sidecar is rewritten after such a
+    scan so the next load starts from there.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._map: Optional[mmap.mmap] = None
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_size:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        index = load_index(path, stat)
+        if index and index["data_size"] and self._map[index["data_size"] - 1:index["data_size"]] != b"\n":
+            # Not a line boundary: the file was rewritten in place, not appended to
+            index = None
+        rows: Dict[str, Row] = {row[1]: tuple(row) for row in index["rows"]} if index else {}
+        start = index["data_size"] if index else 0
+        end = self._scan(start, rows)
+        ordered = sorted(rows.values())
+        self._ranges = [(row[2], row[3]) for row in ordered]
+        self._build([(row[0], row[1]) for row in ordered], [row[4:] for row in ordered])
+        if index is None or end > start:
+            save_index(path, stat, end, ordered)
+
+    def _scan(self, start: int, rows: Dict[str, Row]) -> int:
+        """Index complete lines from `start`, latest record per repo; returns where the last one ends."""
+        if self._map is None:
+            return 0
+        position = start
+        while True:
+            newline = self._map.find(b"\n", position)
+            if newline < 0:
+                # A torn final line stays unindexed until a later append completes the file
+                return position
+            try:
+                bot = json.loads(self._map[position:newline])
+                full_name = bot["full_name"]
+                rows[full_name] = (-(bot.get("stars") or 0), full_name, position, newline - position,
+                                   *(bot.get(field) for field in INDEXED_FIELDS))
+            except (ValueError, KeyError, TypeError):
+                # Blank or torn lines from interrupted writes
+                pass
+            position = newline + 1
+
+    def record(self, position: int) -> Dict[str, Any]:
+        offset, length = self._ranges[position]
+        return json.loads(self._map[offset:offset + length])
+
+
+def open_local_index(path: str) -> LocalBotIndex:
+    """The store over the NDJSON output, or an in-memory index of the legacy bots_data.json before one exists."""
+    if os.path.exists(path):
+        return LocalBotStore(path)
+    return LocalBotIndex(load_local_bots(path))
@@ -4,17 +4,66 @@ import urllib.error
 import json
 import os
 import time
+import argparse
 import base64
-import re
-import csv
-from typing import List, Dict, Any
-from pymongo import MongoClient
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, List, Dict, Any, Iterable, Iterator, Optional, Tuple
 
 import google.generativeai as genai
 
+from http_client import HttpSession
+from http_cache import FileResponseCache, MongoResponseCache
+from github_search import ShardedSearch, SearchError
+from github_graphql import GraphQLBatchFetcher, chunks
+from db import DB_NAME, get_client, get_collection, bump_data_version
+from persistence import BotWriter, load_local_bots
+from bot_queries import QUERY_FILTERS, find_page
+from local_store import open_local_index
+from exporter import EXPORT_FORMATS, export_fields, iter_bots, write_export
+from listing_snapshot import SNAPSHOT_PATH, SNAPSHOT_SIZE, save_snapshot
+from sync_state import CheckpointStore, is_unchanged
+from rate_limit import RateLimiter, RateLimitExceeded, is_rate_limited, is_quota_error
+from summary_cache import SummaryCache, summary_hash, utc_now_iso, SUMMARY_FIELDS
+from repo_classifier import RepoClassifier, LABELS, extractive_summary
+from readme_compact import ReadmeCompactor
+from gemini_batch import (MicroBatcher, SUMMARY_CONFIG, BATCH_CONFIG, build_batch_prompt, parse_summary,
+                          parse_batch)
+from sync_jobs import SyncProgress, instance_id
+from facets import FacetStore, FACETS_COLLECTION
+from work_queue import WorkQueue, QUEUE_COLLECTION, DEFAULT_CLAIM_BATCH, DEFAULT_VISIBILITY_TIMEOUT
+import metrics
+
+# Bump whenever the summary prompt changes so stored summaries are regenerated
+PROMPT_VERSION = "2"
+
+# Stored Gemini labels per repo type that time-budgeted syncs and queue workers train on
+CLASSIFIER_SAMPLE_PER_LABEL = 500
+
 class GitHubBotScraper:
-    def __init__(self, github_token: str = None, gemini_api_key: str = None, mongo_uri: str = None):
+    def __init__(self, github_token: str = None, gemini_api_key: str = None, mongo_uri: str = None,
+                 workers: int = 1, summary_ttl_days: float = 30, gemini_rpm: int = 30,
+                 flush_batch_size: int = 50, flush_interval: float = 10.0,
+                 progress: SyncProgress = None, cancel_event: threading.Event = None,
+                 fetch_engine: str = "rest", classifier_threshold: float = 0.9,
+                 gemini_batch_size: int = 8, readme_token_budget: int = 1200):
         self.github_base_url = "https://api.github.com"
+        self.workers = max(1, workers)
+        self.flush_batch_size = flush_batch_size
+        self.flush_interval = flush_interval
+        self.progress = progress or SyncProgress()
+        self.cancel_event = cancel_event or threading.Event()
+        # Longest a single repo has taken (README, Gemini and all); budgeted runs keep this much in hand
+        self.slowest_repo = 0.0
+        self.summary_cache = SummaryCache(ttl_days=summary_ttl_days)
+        # Repos classified at least this confidently are summarized without Gemini
+        self.classifier = RepoClassifier()
+        self.classifier_threshold = classifier_threshold
+        # Prompts carry the relevant README sections within this many tokens, not a raw slice
+        self.readme_compactor = ReadmeCompactor(readme_token_budget)
+        # Shared token buckets for GitHub REST, GitHub search and Gemini quotas
+        self.rate_limiter = RateLimiter.for_github_and_gemini(bool(github_token), gemini_rpm)
         
         if gemini_api_key:
             genai.configure(api_key=gemini_api_key)
@@ -22,12 +71,24 @@ class GitHubBotScraper:
         else:
             self.model = None
 
+        # Concurrent workers' summary requests share one Gemini call; pointless with a single worker
+        self.summary_batcher = None
+        if gemini_batch_size > 1 and self.workers > 1:
+            self.summary_batcher = MicroBatcher(self._generate_summaries, min(gemini_batch_size, self.workers))
+
         self.github_headers = {
             "Accept": "application/vnd.github.v3+json",
             "User-Agent": "GitHub-Bot-Summary-App-v3"
         }
         if github_token:
             self.github_headers["Authorization"] = f"token {github_token}"
+
+        # One pool of keep-alive connections shared by all worker threads
+        self.session = HttpSession(self.github_headers, pool_size=self.workers * 2)
+        # GraphQL needs a token; without one READMEs keep coming over REST
+        self.graphql = None
+        if fetch_engine == "graphql" and github_token:
+            self.graphql = GraphQLBatchFetcher(self._make_graphql_request)
             
         self.gemini_api_key = gemini_api_key
         
@@ -37,77 +98,197 @@ class GitHubBotScraper:
         self.collection = None
         if mongo_uri:
             try:
-                self.mongo_client = MongoClient(mongo_uri)
+                self.mongo_client = get_client(mongo_uri)
                 # Using 'bot_directory' as DB name and 'bots' as collection
-                self.db = self.mongo_client.get_database("bot_directory")
-                self.collection = self.db.get_collection("bots")
+                self.db = self.mongo_client.get_database(DB_NAME)
+                self.collection = get_collection(mongo_uri)
                 print("[+] Connected to MongoDB successfully.")
             except Exception as e:
                 print(f"[!] MongoDB connection error: {e}")
 
-    def _make_github_request(self, url: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Helper to make GET requests to GitHub using urllib."""
-        if params:
-            url = f"{url}?{urllib.parse.urlencode(params)}"
-        
-        req = urllib.request.Request(url, headers=self.github_headers)
-        try:
-            with urllib.request.urlopen(req) as response:
-                if response.status == 200:
-                    return json.loads(response.read().decode('utf-8'))
-        except Exception as e:
-            if not str(e).endswith("404: Not Found"):
+        # Conditional-request cache: a 304 is served from here and costs no rate limit
+        if self.collection is not None:
+            self.session.cache = MongoResponseCache(self.db.get_collection("http_cache"))
+        else:
+            self.session.cache = FileResponseCache(os.getenv("HTTP_CACHE_DIR", ".http_cache"))
+
+        # Facet counts for /api/facets, kept up to date by every batch the writers upsert
+        self.facets = FacetStore(self.db.get_collection(FACETS_COLLECTION)) if self.collection is not None else None
+
+        # Where the last incremental sync stopped
+        self.checkpoints = CheckpointStore(self.db.get_collection("sync_state") if self.collection is not None else None)
+
+    def _make_github_request(self, url: str, params: Dict[str, Any] = None, bucket: str = "core",
+                             body: bytes = None) -> Dict[str, Any]:
+        """Helper to make GET requests to GitHub over the pooled session, within the rate limit."""
+        for attempt in range(3):
+            self.rate_limiter.acquire(bucket)
+            try:
+                if body is None:
+                    response = self.session.get(url, params)
+                else:
+                    response = self.session.request("POST", url, headers={"Content-Type": "application/json"},
+                                                    body=body)
+            except Exception as e:
                 print(f"[!] GitHub API error for {url}: {e}")
-        return {}
+                metrics.GITHUB_REQUESTS.inc(bucket=bucket, status="error")
+                return {}
+            if response.from_cache:
+                # GitHub does not count a 304 against the quota; refund before syncing with its headers
+                self.rate_limiter.refund(bucket)
+            self.rate_limiter.update_from_headers(bucket, response.headers)
+            metrics.GITHUB_REQUESTS.inc(bucket=bucket, status="304" if response.from_cache else response.status)
+            metrics.record_rate_limits(self.rate_limiter)
+            if response.status == 200:
+                return response.json()
+            if not is_rate_limited(response.status, response.headers, response.body):
+                if response.status != 404:
+                    print(f"[!] GitHub API error for {url}: HTTP {response.status}")
+                return {}
+            wait = self.rate_limiter.backoff(bucket, response.headers, attempt)
+            print(f"[*] GitHub {bucket} rate limit hit, backing off {wait:.0f}s")
+        raise RateLimitExceeded(f"GitHub {bucket} quota still exhausted after retries")
+
+    def _make_graphql_request(self, query: str) -> Dict[str, Any]:
+        """POST one GraphQL query; charged to the graphql bucket."""
+        body = json.dumps({"query": query}).encode("utf-8")
+        return self._make_github_request(f"{self.github_base_url}/graphql", bucket="graphql", body=body)
 
     def get_gemini_summary(self, readme: str, description: str) -> Dict[str, str]:
         """Use Gemini API to get a summary and usage instructions."""
         if not self.model:
             return {"what_it_does": description, "how_to_use": "API Key missing.", "repo_type": "Unknown"}
+        return self._generate_summary(readme, description) or self._fallback_summary(description)
+
+    def _fallback_summary(self, description: str) -> Dict[str, str]:
+        return {
+            "what_it_does": description or "No description available", 
+            "how_to_use": "Refer to the GitHub repository for installation and usage instructions.", 
+            "repo_type": "Application/Bot"
+        }
 
+    def _generate_summary(self, readme: str, description: str) -> Dict[str, str]:
+        """Ask Gemini for a summary; returns None if the call or the JSON parse fails."""
         prompt = (
             "Analyze this GitHub repository and provide a summary in STRICT JSON format.\n"
             "Required keys: 'what_it_does', 'how_to_use', 'repo_type'.\n"
             "'repo_type' must be exactly either 'Library/Module' or 'Application/Bot'.\n"
             "Keep the values concise but informative.\n\n"
             f"Description: {description}\n\n"
-            f"README Snippet:\n{readme[:5000]}"
+            f"README Snippet:\n{self._compact_readme(readme)}"
         )
 
         try:
-            # Sleep to avoid rate limits
-            time.sleep(2.0) 
-            response = self.model.generate_content(prompt)
-            raw_text = response.text.strip()
-            
-            # Remove markdown code blocks if present
-            if raw_text.startswith("```"):
-                raw_text = re.sub(r'^```(?:json)?\n', '', raw_text)
-                raw_text = re.sub(r'\n```$', '', raw_text)
-            
-            # Attempt to find JSON object if there's surrounding text
-            match = re.search(r'\{.*\}', raw_text, re.DOTALL)
-            if match:
-                json_str = match.group(0)
-                # Basic cleanup for common AI JSON mistakes
-                json_str = json_str.replace("'", '"')
-                return json.loads(json_str)
-                
+            response = self._call_gemini(prompt, SUMMARY_CONFIG)
+            raw_text = response.text
+        except RateLimitExceeded:
+            raise
         except Exception as e:
             print(f"    [!] Gemini AI Error: {e}")
-            
-        return {
-            "what_it_does": description or "No description available", 
-            "how_to_use": "Refer to the GitHub repository for installation and usage instructions.", 
-            "repo_type": "Application/Bot"
-        }
+            return None
+
+        with metrics.timer("json_parse"):
+            summary = parse_summary(raw_text)
+        if summary is None:
+            print("    [!] Gemini AI Error: reply did not match the summary schema")
+            metrics.PARSE_FAILURES.inc()
+        return summary
+
+    def _generate_summaries(self, items: List[Tuple[str, str, str]]) -> List[Dict[str, str]]:
+        """Summarize several (full_name, readme, description) items with one Gemini call."""
+        if len(items) == 1:
+            return [self._generate_summary(items[0][1], items[0][2])]
+        found = {}
+        try:
+            prompt = build_batch_prompt([(full_name, self._compact_readme(readme), description)
+                                         for full_name, readme, description in items])
+            response = self._call_gemini(prompt, BATCH_CONFIG)
+            with metrics.timer("json_parse"):
+                found = parse_batch(response.text, [full_name for full_name, _, _ in items])
+        except RateLimitExceeded:
+            raise
+        except Exception as e:
+            print(f"    [!] Gemini AI batch error: {e}")
+        results = []
+        for full_name, readme, description in items:
+            if full_name not in found:
+                # Only the repos the batch reply got wrong are asked for again, one at a time
+                metrics.SUMMARY_RETRIES.inc()
+                found[full_name] = self._generate_summary(readme, description)
+            results.append(found[full_name])
+        return results
+
+    def _compact_readme(self, readme: str) -> str:
+        """Relevant README sections within the token budget, cached by README hash."""
+        with metrics.timer("readme_compact"):
+            return self.readme_compactor.compact(readme)
+
+    def _summarize(self, full_name: str, readme: str, description: str) -> Dict[str, str]:
+        """Summary from Gemini, batched with other workers' requests when batching is on."""
+        if self.summary_batcher is None:
+            return self._generate_summary(readme, description)
+        return self.summary_batcher.submit((full_name, readme, description)).result()
+
+    def _call_gemini(self, prompt: str, generation_config: Dict[str, Any] = None):
+        """Call Gemini within its quota, backing off and retrying on 429s."""
+        for attempt in range(3):
+            self.rate_limiter.acquire("gemini")
+            try:
+                with metrics.timer("gemini_call"):
+                    return self.model.generate_content(prompt, generation_config=generation_config)
+            except Exception as e:
+                if not is_quota_error(e):
+                    raise
+                wait = self.rate_limiter.backoff("gemini", attempt=attempt)
+                print(f"    [*] Gemini quota hit, backing off {wait:.0f}s")
+        raise RateLimitExceeded("Gemini quota still exhausted after retries")
+
+    def get_cached_summary(self, full_name: str, readme: str, description: str,
+                           guess: Tuple[str, float] = None) -> Dict[str, str]:
+        """Reuse the stored summary while README, description and prompt are unchanged."""
+        key = summary_hash(readme, description, PROMPT_VERSION)
+        cached = self.summary_cache.get(full_name, key)
+        metrics.SUMMARY_CACHE.inc(result="hit" if cached else "miss")
+        if cached:
+            return cached
+        # The cue patterns alone are confident about nearly everything, so only a trained model may skip Gemini.
+        # A repo Gemini already summarized is refreshed by Gemini, never swapped for extractive text.
+        previous = self.summary_cache.stored(full_name)
+        if (guess and self.classifier.trained and guess[1] >= self.classifier_threshold
+                and (previous is None or previous.get("summary_source") == "local")):
+            metrics.CLASSIFICATIONS.inc(result="local")
+            summary = dict(extractive_summary(readme, description), repo_type=guess[0], summary_source="local",
+                           summary_hash=key, summarized_at=utc_now_iso())
+            self.summary_cache.put(full_name, summary)
+            return summary
+        metrics.CLASSIFICATIONS.inc(result="escalated")
+        if not self.model:
+            metrics.SUMMARY_FALLBACKS.inc(reason="no_model")
+            return self.get_gemini_summary(readme, description)
+        summary = self._summarize(full_name, readme, description)
+        if not summary:
+            # Fallbacks are not cached, so the next sync asks the model again
+            metrics.SUMMARY_FALLBACKS.inc(reason="error")
+            return self._fallback_summary(description)
+        summary = dict(summary, summary_source="gemini", summary_hash=key, summarized_at=utc_now_iso())
+        self.summary_cache.put(full_name, summary)
+        return summary
+
+    def _search_request(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """One search page, timed as the github_search stage."""
+        with metrics.timer("github_search"):
+            return self._make_github_request(f"{self.github_base_url}/search/repositories", params, bucket="search")
 
-    def search_telegram_bots(self, query: str = "telegram bot", per_page: int = 10) -> List[Dict[str, Any]]:
-        """Search for repositories matching the query."""
-        url = f"{self.github_base_url}/search/repositories"
-        params = {"q": query, "sort": "stars", "order": "desc", "per_page": per_page}
-        data = self._make_github_request(url, params)
-        return data.get("items", [])
+    def iter_telegram_bots(self, query: str = "telegram bot") -> Iterator[Dict[str, Any]]:
+        """Stream every matching repository, paginated and sharded past the 1000-result cap."""
+        return iter(ShardedSearch(self._search_request, query))
+
+    def _until_search_error(self, repos: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """End the stream at a search page that cannot be fetched; repos already in flight still finish."""
+        try:
+            yield from repos
+        except SearchError as e:
+            print(f"[!] Stopping discovery early, GitHub search failed: {e}")
 
     def get_file_content(self, owner: str, repo: str, path: str) -> str:
         """Fetch content of a file from a repository."""
@@ -121,22 +302,6 @@ class GitHubBotScraper:
                 pass
         return ""
 
-    def get_repo_type_heuristic(self, readme: str, name: str, description: str, language: str) -> str:
-        """Fallback heuristic to identify repo type if AI fails."""
-        text = f"{name} {description} {readme}".lower()
-        
-        lib_keywords = ["wrapper", "library", "api-client", "sdk", "framework", "for developers", "binding", "client for", "toolkit"]
-        app_keywords = ["bot for", "ready to use", "run with", "deployment", "docker-compose", "self-hosted", "personal bot"]
-        
-        if any(k in text for k in lib_keywords): return "Library/Module"
-        if any(k in text for k in app_keywords): return "Application/Bot"
-            
-        if language == "Python":
-            if "setup.py" in readme or "pyproject.toml" in readme:
-                return "Library/Module"
-        
-        return "Application/Bot"
-
     def process_bot(self, repo: Dict[str, Any]) -> Dict[str, Any]:
         """Process a single repository to extract and summarize info."""
         owner = repo["owner"]["login"]
@@ -144,15 +309,22 @@ class GitHubBotScraper:
         
         print(f"[*] Processing {owner}/{name}...")
         
-        readme = self.get_file_content(owner, name, "README.md")
-        if not readme:
-            readme = self.get_file_content(owner, name, "readme.md")
-            
-        ai_summary = self.get_gemini_summary(readme, repo.get("description") or "")
+        if "readme" in repo:
+            # Prefetched with the GraphQL batch
+            readme = repo["readme"]
+        else:
+            with metrics.timer("readme_fetch"):
+                readme = self.get_file_content(owner, name, "README.md")
+                if not readme:
+                    readme = self.get_file_content(owner, name, "readme.md")
+
+        # Confident local classifications skip Gemini; uncertain ones are escalated
+        guess = self.classifier.predict(repo, readme)
+        ai_summary = self.get_cached_summary(f"{owner}/{name}", readme, repo.get("description") or "", guess)
         
         repo_type = ai_summary.get("repo_type")
-        if not repo_type or repo_type == "Unknown":
-            repo_type = self.get_repo_type_heuristic(readme, name, repo.get("description") or "", repo.get("language") or "")
+        if repo_type not in LABELS:
+            repo_type = guess[0]
 
         return {
             "name": name,
@@ -166,58 +338,408 @@ class GitHubBotScraper:
             "forks": repo.get("forks_count"),
             "open_issues": repo.get("open_issues_count"),
             "last_updated": repo.get("updated_at"),
+            "pushed_at": repo.get("pushed_at"),
             "license": repo.get("license", {}).get("name") if repo.get("license") else "None",
             "repo_type": repo_type,
             "what_it_does": ai_summary.get("what_it_does") or repo.get("description"),
-            "how_to_use": ai_summary.get("how_to_use") or "Refer to GitHub for setup instructions."
+            "how_to_use": ai_summary.get("how_to_use") or "Refer to GitHub for setup instructions.",
+            "summary_hash": ai_summary.get("summary_hash"),
+            "summarized_at": ai_summary.get("summarized_at"),
+            "summary_source": ai_summary.get("summary_source")
         }
 
-    def save_to_csv(self, data: List[Dict[str, Any]], filename: str):
-        if not data: return
-        keys = data[0].keys()
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            dict_writer = csv.DictWriter(f, fieldnames=keys)
-            dict_writer.writeheader()
-            dict_writer.writerows(data)
+    def load_existing_summaries(self, local_path: str = "bots_data.ndjson"):
+        """Seed the summary cache from MongoDB, or from the local output."""
+        if self.collection is not None:
+            try:
+                projection = {"_id": 0, "full_name": 1, "name": 1, "description": 1, "category": 1, "language": 1,
+                              **{field: 1 for field in SUMMARY_FIELDS}}
+                bots = list(self.collection.find({"summary_hash": {"$ne": None}}, projection))
+                self.summary_cache.load(bots)
+                self._train_classifier(bots)
+                return
+            except Exception as e:
+                print(f"[!] Could not load stored summaries from MongoDB: {e}")
+        bots = load_local_bots(local_path)
+        self.summary_cache.load(bots)
+        self._train_classifier(bots)
+
+    def train_classifier_sample(self, local_bots: Dict[str, Dict[str, Any]] = None):
+        """Train on at most CLASSIFIER_SAMPLE_PER_LABEL Gemini labels per type, for runs that never load the corpus."""
+        if self.collection is not None:
+            try:
+                projection = {"_id": 0, "name": 1, "description": 1, "category": 1, "language": 1,
+                              "repo_type": 1, "summary_hash": 1, "summary_source": 1}
+                bots = []
+                for label in LABELS:
+                    query = {"repo_type": label, "summary_hash": {"$ne": None}, "summary_source": {"$ne": "local"}}
+                    bots += self.collection.find(query, projection).limit(CLASSIFIER_SAMPLE_PER_LABEL)
+                self._train_classifier(bots)
+                return
+            except Exception as e:
+                print(f"[!] Could not load classifier labels from MongoDB: {e}")
+        self._train_classifier(list((local_bots or {}).values()))
+
+    def _train_classifier(self, bots: List[Dict[str, Any]]):
+        """Fit the local repo_type classifier on the labels Gemini has already produced."""
+        used = self.classifier.fit(bots)
+        if used:
+            print(f"[*] Repo type classifier trained on {used} stored labels")
+
+    def write_listing_snapshot(self, local_path: str = "bots_data.ndjson", path: str = SNAPSHOT_PATH):
+        """Save the top of the listing for web cold starts to serve before touching the database."""
+        try:
+            page = find_page(self.collection, lambda: open_local_index(local_path), limit=SNAPSHOT_SIZE)
+        except Exception as e:
+            print(f"[!] Could not build listing snapshot: {e}")
+            return
+        save_snapshot(page, path)
 
     def save_to_mongodb(self, data: List[Dict[str, Any]]):
         if self.collection is None:
             return
-        try:
-            # We use name and author as a unique identifier to avoid duplicates
+        # One bulk upsert keyed by full_name, the unique identifier of a repo
+        with BotWriter(self.collection, local_path=None, batch_size=len(data) or 1,
+                       on_flush=lambda: bump_data_version(self.db), facets=self._facet_store()) as writer:
             for bot in data:
-                self.collection.update_one(
-                    {"full_name": bot["full_name"]},
-                    {"$set": bot},
-                    upsert=True
-                )
-            print("[+] Data synced to MongoDB.")
+                writer.add(bot)
+
+    def open_writer(self, output_base: str = "bots_data", build_facets: bool = True) -> BotWriter:
+        """Write-behind writer: batched MongoDB upserts plus append-only NDJSON/CSV output."""
+        return BotWriter(self.collection, f"{output_base}.ndjson", f"{output_base}.csv",
+                         batch_size=self.flush_batch_size, flush_interval=self.flush_interval,
+                         on_flush=lambda: bump_data_version(self.db), facets=self._facet_store(build_facets))
+
+    def _facet_store(self, build: bool = True) -> Optional[FacetStore]:
+        """The facet counts for writers to update, built from the bots collection when missing or stale.
+
+        With `build` False (a time-budgeted run) counts that are missing or
+        flagged stale are left for the next full sync to rebuild, and the
+        writer updates none.
+        """
+        if self.facets is None:
+            return None
+        try:
+            built = self.facets.built()
         except Exception as e:
-            print(f"[!] Error saving to MongoDB: {e}")
+            print(f"[!] Could not read facet counts: {e}")
+            return None
+        if not built and not build:
+            print("[*] Facet counts need a rebuild; leaving it to the next full sync")
+            return None
+        if not built:
+            print("[*] Building facet counts from the bots collection")
+            if not self.rebuild_facets():
+                return None
+        return self.facets
 
-    def run(self, output_base: str = "bots_data"):
+    def rebuild_facets(self) -> bool:
+        """Recount the facets from the bots collection in one pass."""
+        if self.facets is None:
+            return False
+        try:
+            self.facets.rebuild(self.collection)
+            return True
+        except Exception as e:
+            print(f"[!] Could not build facet counts: {e}")
+            return False
+
+    def _with_readmes(self, repos: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Attach README text and fresh metadata in GraphQL batches, so process_bot skips REST."""
+        for batch in chunks(repos, self.graphql.batch_size):
+            cost_before = self.graphql.total_cost
+            with metrics.timer("graphql_batch"):
+                found = self.graphql.fetch(batch)
+            metrics.GRAPHQL_COST.inc(self.graphql.total_cost - cost_before)
+            for repo in batch:
+                extra = found.get(repo["full_name"])
+                # Repos the batch could not resolve fall back to the REST fetch
+                yield dict(repo, **extra["metadata"], readme=extra["readme"]) if extra else repo
+
+    def _discovered(self, repos: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for repo in repos:
+            if self.cancelled():
+                return
+            self.progress.discover()
+            yield repo
+
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        """Ask a running sync to stop at the next repo boundary."""
+        self.cancel_event.set()
+
+    def _process_timed(self, repo: Dict[str, Any]) -> Dict[str, Any]:
+        """process_bot, remembering the slowest repo so a time budget can keep room for one more."""
+        started = time.monotonic()
+        try:
+            return self.process_bot(repo)
+        finally:
+            self.slowest_repo = max(self.slowest_repo, time.monotonic() - started)
+
+    def process_bots(self, repos: Iterable[Dict[str, Any]], workers: int = None,
+                     stop: Callable[[], bool] = None) -> Iterator[Dict[str, Any]]:
+        """Process repositories, overlapping README fetches and summaries across a worker pool."""
+        workers = workers or self.workers
+        if self.graphql is not None:
+            repos = self._with_readmes(repos)
+        # Stop taking new repos once cancelled (or `stop` says so); the ones in flight still finish
+        repos = itertools.takewhile(lambda _: not (self.cancelled() or (stop and stop())), repos)
+        if workers <= 1:
+            for repo in repos:
+                try:
+                    data = self._process_timed(repo)
+                except RateLimitExceeded:
+                    raise
+                except Exception as e:
+                    self.progress.record(ok=False)
+                    print(f"[!] Failed to process {repo.get('full_name')}: {e}")
+                    continue
+                self.progress.record()
+                yield data
+            return
+        # Keep only a few repos in flight so the search stream is consumed lazily
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = {}
+            while True:
+                for repo in itertools.islice(repos, workers * 2 - len(pending)):
+                    pending[pool.submit(self._process_timed, repo)] = repo
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    repo = pending.pop(future)
+                    try:
+                        data = future.result()
+                    except RateLimitExceeded:
+                        pool.shutdown(cancel_futures=True)
+                        raise
+                    except Exception as e:
+                        self.progress.record(ok=False)
+                        print(f"[!] Failed to process {repo.get('full_name')}: {e}")
+                        continue
+                    self.progress.record()
+                    yield data
+
+    def run(self, output_base: str = "bots_data", workers: int = None, limit: int = None):
         print("=== GitHub Bot Summary (AI & MongoDB Enhanced) ===")
-        bots = self.search_telegram_bots()
-        
-        results = []
-        for bot in bots:
-            data = self.process_bot(bot)
-            results.append(data)
-            
-            # Save progress locally (wrapped for read-only systems like Vercel)
+        started = metrics.snapshot()
+        workers = workers or self.workers
+        self.load_existing_summaries(f"{output_base}.ndjson")
+        # Buffered writes, flushed in batches and once more on exit
+        with self.open_writer(output_base) as writer:
             try:
-                with open(f"{output_base}.json", "w", encoding="utf-8") as f:
-                    json.dump(results, f, indent=4, ensure_ascii=False)
-                self.save_to_csv(results, f"{output_base}.csv")
-            except Exception as e:
-                print(f"[*] Local file saving skipped (read-only filesystem): {e}")
-            
-            # Save to MongoDB
-            self.save_to_mongodb(results)
-            
-            time.sleep(5.0) 
+                repos = self._until_search_error(self.iter_telegram_bots())
+                bots = self._discovered(itertools.islice(repos, limit or None))
+                for data in self.process_bots(bots, workers):
+                    writer.add(data)
+                if self.cancelled():
+                    print("[*] Sync cancelled; buffered results are flushed before stopping")
+            except RateLimitExceeded as e:
+                # Stop instead of writing empty records for the rest of the run
+                print(f"[!] Stopping early, rate limit budget exhausted: {e}")
         
+        self.session.close()
+        # The writer kept the counts current; only ones it flagged stale are recounted
+        self._facet_store()
+        self.write_listing_snapshot(f"{output_base}.ndjson")
         print(f"\n[OK] Final results synced to MongoDB.")
+        print(f"[*] Summary cache hits: {self.summary_cache.hits}, misses: {self.summary_cache.misses}")
+        return self._report_metrics(started)
+
+    def _report_metrics(self, started: Dict[str, Any]) -> Dict[str, Any]:
+        """Print and return what this sync spent its time and API calls on."""
+        summary = metrics.summary_since(started)
+        print(f"[*] Sync metrics: {json.dumps(summary, sort_keys=True)}")
+        return summary
+
+    def _stored_versions(self, full_names: List[str], local_bots: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """pushed_at / updated_at and summaries of already stored bots, to skip unchanged repos."""
+        if self.collection is None:
+            return {name: local_bots[name] for name in full_names if name in local_bots}
+        try:
+            projection = {"_id": 0, "full_name": 1, "pushed_at": 1, "last_updated": 1,
+                          **{field: 1 for field in SUMMARY_FIELDS}}
+            return {bot["full_name"]: bot for bot in self.collection.find({"full_name": {"$in": full_names}}, projection)}
+        except Exception as e:
+            print(f"[!] Could not read stored repo versions: {e}")
+            return {}
+
+    def run_incremental(self, time_budget: float = None, workers: int = None, output_base: str = "bots_data"):
+        """Resume the search walk from the stored checkpoint and sync changed repos until the budget runs out."""
+        print("=== GitHub Bot Summary (Incremental) ===")
+        local_path = f"{output_base}.ndjson"
+        started = time.monotonic()
+        started_metrics = metrics.snapshot()
+        workers = workers or self.workers
+
+        def expired() -> bool:
+            if self.cancelled():
+                return True
+            # A repo started now must also finish in time, Gemini call included
+            return time_budget is not None and time.monotonic() - started + self.slowest_repo >= time_budget
+
+        local_bots = {}
+        if self.collection is None:
+            local_bots = {bot["full_name"]: bot for bot in load_local_bots(local_path)}
+        self.train_classifier_sample(local_bots)
+
+        checkpoint = self.checkpoints.load()
+        cursor = checkpoint.get("cursor")
+        done = set(checkpoint.get("done") or [])
+        search = ShardedSearch(self._search_request)
+        processed = skipped = 0
+        finished = False
+        writer = self.open_writer(output_base, build_facets=time_budget is None)
+        try:
+            for next_cursor, items in search.pages(cursor):
+                stored = self._stored_versions([repo["full_name"] for repo in items], local_bots)
+                # Summaries are looked up a page at a time; a time slice never reads the whole corpus
+                self.summary_cache.load(stored.values())
+                todo = []
+                for repo in items:
+                    if repo["full_name"] in done or is_unchanged(repo, stored.get(repo["full_name"])):
+                        skipped += 1
+                    else:
+                        todo.append(repo)
+                self.progress.discover(len(items))
+                self.progress.skip(len(items) - len(todo))
+                page_done = 0
+                for data in self.process_bots(todo, workers, stop=expired):
+                    writer.add(data)
+                    done.add(data["full_name"])
+                    page_done += 1
+                processed += page_done
+                # Never let the checkpoint run ahead of what is persisted
+                writer.flush()
+                if page_done < len(todo) and expired():
+                    # Stopped mid-page: resume this page next time, minus what is done
+                    self.checkpoints.save({"cursor": cursor, "done": sorted(done)})
+                    break
+                cursor, done = next_cursor, set()
+                self.checkpoints.save({"cursor": cursor, "done": []})
+                if expired():
+                    break
+            else:
+                finished = True
+                self.checkpoints.clear()
+        except (RateLimitExceeded, SearchError) as e:
+            # The checkpoint stays at the page that could not be fetched, so the next run retries it
+            print(f"[!] Stopping sync early: {e}")
+            writer.flush()
+            self.checkpoints.save({"cursor": cursor, "done": sorted(done)})
+        finally:
+            writer.close()
+        self.session.close()
+        self.write_listing_snapshot(local_path)
+        state = "complete" if finished else "cancelled" if self.cancelled() else "checkpointed"
+        print(f"[OK] Incremental sync {state}: {processed} processed, {skipped} unchanged, "
+              f"{time.monotonic() - started:.1f}s")
+        return {"processed": processed, "skipped": skipped, "finished": finished, "cancelled": self.cancelled(),
+                "metrics": self._report_metrics(started_metrics)}
+
+    def _work_queue(self, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT) -> Optional[WorkQueue]:
+        if self.collection is None:
+            print("[!] The distributed work queue needs MongoDB (set mdb)")
+            return None
+        return WorkQueue(self.db.get_collection(QUEUE_COLLECTION), instance_id(), visibility_timeout)
+
+    def enqueue(self, limit: int = None) -> Dict[str, Any]:
+        """Walk the search and queue every new or changed repo for `run_worker` processes."""
+        print("=== Queueing Repositories ===")
+        queue = self._work_queue()
+        if queue is None:
+            return {"queued": 0, "skipped": 0}
+        queue.ensure_indexes()
+        queued = skipped = 0
+        try:
+            repos = self._discovered(itertools.islice(self.iter_telegram_bots(), limit or None))
+            for page in chunks(repos, 100):
+                stored = self._stored_versions([repo["full_name"] for repo in page], {})
+                todo = [repo for repo in page if not is_unchanged(repo, stored.get(repo["full_name"]))]
+                queued += queue.enqueue(todo)
+                skipped += len(page) - len(todo)
+                self.progress.skip(len(page) - len(todo))
+        except (RateLimitExceeded, SearchError) as e:
+            print(f"[!] Stopping discovery early: {e}")
+        self.session.close()
+        print(f"[OK] Queued {queued} repos, {skipped} unchanged. Queue: {json.dumps(queue.counts())}")
+        return {"queued": queued, "skipped": skipped}
+
+    def run_worker(self, claim_batch: int = DEFAULT_CLAIM_BATCH, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT,
+                   wait_for_work: bool = False, poll_interval: float = 5.0) -> Dict[str, Any]:
+        """Claim and process queued repos until the queue is drained, or forever with `wait_for_work`.
+
+        Any number of these can run, on one machine or many. Results are
+        upserted by full_name before their queue entries are marked done, so
+        a repo redone after a lost lease is simply written again.
+        """
+        print("=== Queue Worker ===")
+        started = metrics.snapshot()
+        queue = self._work_queue(visibility_timeout)
+        if queue is None:
+            return {"processed": 0, "failed": 0}
+        self.train_classifier_sample()
+        held: Dict[str, Dict[str, Any]] = {}
+        stop = threading.Event()
+
+        def heartbeat():
+            while not stop.wait(visibility_timeout / 3):
+                try:
+                    queue.extend(list(held))
+                except Exception as e:
+                    print(f"[!] Could not extend queue leases: {e}")
+
+        threading.Thread(target=heartbeat, daemon=True).start()
+        # MongoDB is the store here; workers sharing a local file would race on compaction
+        writer = BotWriter(self.collection, None, batch_size=self.flush_batch_size,
+                           flush_interval=self.flush_interval, on_flush=lambda: bump_data_version(self.db),
+                           facets=self._facet_store())
+        processed = failed = 0
+        finished: List[str] = []
+        try:
+            while not self.cancelled():
+                docs = queue.claim(claim_batch)
+                if not docs:
+                    if not wait_for_work or self.cancel_event.wait(poll_interval):
+                        break
+                    continue
+                held, finished = {doc["_id"]: doc for doc in docs}, []
+                # Stored summaries for just this claim, instead of the whole corpus per worker
+                self.summary_cache.load(self._stored_versions(list(held), {}).values())
+                self.progress.discover(len(docs))
+                for data in self.process_bots([doc["repo"] for doc in docs]):
+                    writer.add(data)
+                    finished.append(data["full_name"])
+                # Repos a cancel kept from starting go back without using up an attempt
+                failed += self._settle_claims(queue, writer, held, finished,
+                                              None if self.cancelled() else "processing failed")
+                processed += len(finished)
+                held = {}
+        except RateLimitExceeded as e:
+            print(f"[!] Stopping worker, rate limit budget exhausted: {e}")
+            self._settle_claims(queue, writer, held, finished, None)
+            processed += len(finished)
+        finally:
+            stop.set()
+            writer.close()
+        self.session.close()
+        print(f"[OK] Worker finished: {processed} processed, {failed} failed. Queue: {json.dumps(queue.counts())}")
+        return {"processed": processed, "failed": failed, "metrics": self._report_metrics(started)}
+
+    def _settle_claims(self, queue: WorkQueue, writer: BotWriter, held: Dict[str, Dict[str, Any]],
+                       finished: List[str], error: Optional[str]) -> int:
+        """Acknowledge the finished repos of a claim and hand back the rest; returns how many failed."""
+        # Persist before acknowledging, so a crash in between only means a repeat
+        writer.flush()
+        queue.complete(finished)
+        done = set(finished)
+        rest = [doc for full_name, doc in held.items() if full_name not in done]
+        for doc in rest:
+            queue.release(doc, error)
+        return len(rest) if error else 0
+
 
 def load_env():
     """Simple helper to load .env file manually."""
@@ -231,11 +753,55 @@ def load_env():
                     env_vars[key.strip()] = value.strip()
     return env_vars
 
+def export_bots(path: str, fmt: str, filters: Dict[str, str], fields: List[str], mongo_uri: str = None,
+                local_path: str = "bots_data.ndjson") -> int:
+    """Stream the stored bots into an export file without loading them all; returns the count."""
+    collection = get_collection(mongo_uri, indexes=False) if mongo_uri else None
+    bots = iter_bots(collection, lambda: open_local_index(local_path), filters, fields)
+    return write_export(path, fmt, bots, fields)
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find Telegram bots on GitHub and summarize them with Gemini.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--export", metavar="FILE", help="write the stored bots to FILE instead of syncing")
+    mode.add_argument("--enqueue", action="store_true", help="search GitHub and queue new or changed repos in MongoDB")
+    mode.add_argument("--worker", action="store_true", help="process queued repos; run as many of these as you like")
+    parser.add_argument("--wait", action="store_true", help="with --worker, keep polling once the queue is empty")
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), help="export format (default: FILE's extension)")
+    parser.add_argument("--fields", help="comma-separated fields to export (default: all)")
+    for field in QUERY_FILTERS:
+        parser.add_argument(f"--{field.replace('_', '-')}", dest=field, help=f"only export bots with this {field}")
+    args = parser.parse_args()
     env = load_env()
-    scraper = GitHubBotScraper(
-        github_token=env.get("GITHUB_TOKEN"),
-        gemini_api_key=env.get("GEMINI_API_KEY"),
-        mongo_uri=env.get("mdb") # Using the 'mdb' key from .env
-    )
-    scraper.run()
\ No newline at end of file
+    if args.export:
+        fmt = args.format or os.path.splitext(args.export)[1].lstrip(".").lower()
+        if fmt not in EXPORT_FORMATS:
+            parser.error(f"cannot tell the export format from {args.export!r}; pass --format")
+        filters = {field: getattr(args, field) for field in QUERY_FILTERS if getattr(args, field)}
+        count = export_bots(args.export, fmt, filters, export_fields(args.fields), env.get("mdb"))
+        print(f"[+] Exported {count} bots to {args.export}")
+    else:
+        scraper = GitHubBotScraper(
+            github_token=env.get("GITHUB_TOKEN"),
+            gemini_api_key=env.get("GEMINI_API_KEY"),
+            mongo_uri=env.get("mdb"), # Using the 'mdb' key from .env
+            workers=int(env.get("SYNC_WORKERS", "1")),
+            summary_ttl_days=float(env.get("SUMMARY_TTL_DAYS", "30")),
+            gemini_rpm=int(env.get("GEMINI_RPM", "30")),
+            flush_batch_size=int(env.get("SYNC_FLUSH_BATCH", "50")),
+            flush_interval=float(env.get("SYNC_FLUSH_INTERVAL", "10")),
+            fetch_engine=env.get("GITHUB_FETCH_ENGINE", "rest"),
+            classifier_threshold=float(env.get("CLASSIFIER_THRESHOLD", "0.9")),
+            gemini_batch_size=int(env.get("GEMINI_BATCH_SIZE", "8")),
+            readme_token_budget=int(env.get("README_TOKEN_BUDGET", "1200"))
+        )
+        if args.enqueue:
+            scraper.enqueue()
+        elif args.worker:
+            scraper.run_worker(claim_batch=int(env.get("QUEUE_CLAIM_BATCH", "16")),
+                               visibility_timeout=float(env.get("QUEUE_VISIBILITY_TIMEOUT", "300")),
+                               wait_for_work=args.wait)
+        elif env.get("SYNC_INCREMENTAL"):
+            scraper.run_incremental(time_budget=float(env["SYNC_TIME_BUDGET"]) if env.get("SYNC_TIME_BUDGET") else None)
+        else:
+            scraper.run()
\ No newline at end of file
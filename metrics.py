@@ -0,0 +1,152 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Tuple, Iterator
+
+# Seconds; wide enough for a cached README fetch up to a backed-off Gemini call
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Dict[str, str] = None) -> str:
+    pairs = list(key) + sorted((extra or {}).items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self.type = "counter"
+        self.values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> Iterator[Tuple[str, float]]:
+        with self._lock:
+            items = list(self.values.items())
+        for key, value in items:
+            yield self.name + _format_labels(key), value
+
+
+class Gauge(Counter):
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text)
+        self.type = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self.values[_label_key(labels)] = value
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.type = "histogram"
+        self.buckets = buckets
+        # label key -> [bucket counts..., sum, count]
+        self.values: Dict[LabelKey, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            row = self.values.get(key)
+            if row is None:
+                row = self.values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def samples(self) -> Iterator[Tuple[str, float]]:
+        with self._lock:
+            items = [(key, list(row)) for key, row in self.values.items()]
+        for key, row in items:
+            for bound, count in zip(self.buckets, row):
+                yield self.name + "_bucket" + _format_labels(key, {"le": repr(bound)}), count
+            yield self.name + "_bucket" + _format_labels(key, {"le": "+Inf"}), row[-1]
+            yield self.name + "_sum" + _format_labels(key), row[-2]
+            yield self.name + "_count" + _format_labels(key), row[-1]
+
+
+STAGE_SECONDS = Histogram("botfinder_stage_seconds", "Time spent per sync and web stage")
+GITHUB_REQUESTS = Counter("botfinder_github_requests_total", "GitHub API requests by bucket and outcome")
+SUMMARY_CACHE = Counter("botfinder_summary_cache_total", "Summary cache lookups by result")
+SUMMARY_FALLBACKS = Counter("botfinder_summary_fallbacks_total", "Bots stored with a placeholder summary")
+PARSE_FAILURES = Counter("botfinder_summary_parse_failures_total", "Gemini responses that were not valid JSON")
+SUMMARY_RETRIES = Counter("botfinder_summary_batch_retries_total", "Batched summaries retried one repo at a time")
+CLASSIFICATIONS = Counter("botfinder_classifications_total", "Summary misses decided locally or escalated to Gemini")
+GRAPHQL_COST = Counter("botfinder_graphql_cost_total", "GitHub GraphQL rate-limit points spent")
+BOTS_WRITTEN = Counter("botfinder_bots_written_total", "Bots persisted by the write-behind writer")
+PAGE_RESPONSES = Counter("botfinder_page_responses_total", "Home page responses by status and encoding")
+RATE_LIMIT_REMAINING = Gauge("botfinder_rate_limit_remaining", "Requests left in the current rate-limit window")
+RATE_LIMIT_CAPACITY = Gauge("botfinder_rate_limit_capacity", "Size of the rate-limit window")
+
+REGISTRY = [STAGE_SECONDS, GITHUB_REQUESTS, SUMMARY_CACHE, SUMMARY_FALLBACKS, PARSE_FAILURES, SUMMARY_RETRIES,
+            CLASSIFICATIONS, GRAPHQL_COST, BOTS_WRITTEN, PAGE_RESPONSES, RATE_LIMIT_REMAINING, RATE_LIMIT_CAPACITY]
+
+
+@contextmanager
+def timer(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage=stage)
+
+
+def record_rate_limits(rate_limiter):
+    for name, bucket in rate_limiter.buckets.items():
+        RATE_LIMIT_REMAINING.set(int(bucket.tokens), bucket=name)
+        RATE_LIMIT_CAPACITY.set(bucket.capacity, bucket=name)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        lines.extend(f"{name} {value}" for name, value in metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+def snapshot() -> Dict[str, Any]:
+    """Counter values and per-stage totals, to diff into a per-sync summary."""
+    values = {}
+    for metric in (GITHUB_REQUESTS, SUMMARY_CACHE, SUMMARY_FALLBACKS, PARSE_FAILURES, SUMMARY_RETRIES, CLASSIFICATIONS,
+                   GRAPHQL_COST, BOTS_WRITTEN):
+        for name, value in metric.samples():
+            values[name] = value
+    with STAGE_SECONDS._lock:
+        stages = {dict(key)["stage"]: (row[-1], row[-2]) for key, row in STAGE_SECONDS.values.items()}
+    return {"counters": values, "stages": stages}
+
+
+def summary_since(start: Dict[str, Any]) -> Dict[str, Any]:
+    """What happened since `start` (a snapshot()): counter deltas and per-stage count/total/mean."""
+    end = snapshot()
+    counters = {name: value - start["counters"].get(name, 0)
+                for name, value in end["counters"].items() if value - start["counters"].get(name, 0)}
+    stages = {}
+    for stage, (count, total) in end["stages"].items():
+        start_count, start_total = start["stages"].get(stage, (0, 0.0))
+        count, total = count - start_count, total - start_total
+        if count:
+            stages[stage] = {"count": count, "total_seconds": round(total, 3),
+                             "mean_ms": round(1000 * total / count, 1)}
+    return {"counters": counters, "stages": stages}
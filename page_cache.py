@@ -0,0 +1,108 @@
+import gzip
+import hashlib
+import threading
+from typing import Callable, Dict, Any, Optional, Tuple
+
+from flask import Response
+
+import metrics
+
+try:
+    import brotli
+except ImportError:
+    # In requirements.txt; an install without it only offers gzip and identity
+    brotli = None
+
+# Preference order when a client accepts several equally
+ENCODINGS = ("br", "gzip", "identity") if brotli is not None else ("gzip", "identity")
+
+# Clients and CDNs may keep the page but must revalidate; a 304 costs next to nothing
+CACHE_CONTROL = "public, no-cache"
+
+
+def accepted_encodings(header: Optional[str]) -> Dict[str, float]:
+    """Accept-Encoding as {coding: q}; identity is acceptable unless excluded."""
+    accepted = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    accepted.setdefault("identity", accepted.get("*", 1.0))
+    return accepted
+
+
+def choose_encoding(header: Optional[str]) -> str:
+    accepted = accepted_encodings(header)
+
+    def quality(coding: str) -> float:
+        return accepted.get(coding, accepted.get("*", 0.0))
+
+    best = max(ENCODINGS, key=lambda coding: (quality(coding), -ENCODINGS.index(coding)))
+    return best if quality(best) > 0 else "identity"
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    # If-None-Match uses the weak comparison, so a W/ prefix still matches
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class RenderedPage:
+    """One rendered HTML page with its compressed variants and per-variant strong ETags."""
+
+    def __init__(self, html: str):
+        body = html.encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.variants: Dict[str, Tuple[bytes, str]] = {"identity": (body, f'"{digest}"')}
+        # mtime=0 keeps the gzip bytes, and so every instance's ETag, deterministic
+        self.variants["gzip"] = (gzip.compress(body, compresslevel=6, mtime=0), f'"{digest}-gzip"')
+        if brotli is not None:
+            self.variants["br"] = (brotli.compress(body, quality=9), f'"{digest}-br"')
+
+    def response(self, accept_encoding: Optional[str], if_none_match: Optional[str]) -> Response:
+        coding = choose_encoding(accept_encoding)
+        body, etag = self.variants[coding]
+        headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": CACHE_CONTROL}
+        if etag_matches(if_none_match, etag):
+            metrics.PAGE_RESPONSES.inc(status="304", encoding=coding)
+            return Response(status=304, headers=headers)
+        if coding != "identity":
+            headers["Content-Encoding"] = coding
+        metrics.PAGE_RESPONSES.inc(status="200", encoding=coding)
+        return Response(body, status=200, mimetype="text/html", headers=headers)
+
+
+class PageCache:
+    """Renders a page once per listing value and serves the stored bytes until it changes.
+
+    ListingCache hands out the same listing object until the data version
+    marker moves (a sync wrote), so the listing object itself is the version
+    stamp: a new object means render again, the same one means reuse.
+    """
+
+    def __init__(self, render: Callable[[Any], str]):
+        self.render = render
+        self._source: Any = None
+        self._page: Optional[RenderedPage] = None
+        self._lock = threading.Lock()
+
+    def get(self, source: Any) -> RenderedPage:
+        with self._lock:
+            if self._page is not None and self._source is source:
+                return self._page
+        page = RenderedPage(self.render(source))
+        with self._lock:
+            self._source, self._page = source, page
+        return page
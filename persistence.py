@@ -0,0 +1,249 @@
+import csv
+import json
+import os
+import threading
+import time
+from typing import Callable, List, Dict, Any, Optional
+
+import metrics
+from search_index import SEARCH_FIELDS
+
+# Column order for the CSV output; records are written with these keys first
+BOT_FIELDS = [
+    "name", "author", "full_name", "description", "link", "category", "language",
+    "stars", "forks", "open_issues", "last_updated", "pushed_at", "license",
+    "repo_type", "what_it_does", "how_to_use", "summary_hash", "summarized_at", "summary_source",
+]
+
+# Fields the bot listing can be filtered on
+FILTER_FIELDS = ("repo_type", "language", "license")
+
+# Held per bot by the local indexes: the filter fields, then the topics the facet counts need
+INDEXED_FIELDS = FILTER_FIELDS + ("category",)
+
+
+def ensure_indexes(collection):
+    """Unique index on full_name so upserts stay an index lookup as the collection grows,
+    plus compound indexes matching the (stars desc, full_name) listing order, alone and
+    behind each filter field. The one text index a collection may have backs /search."""
+    try:
+        collection.create_index("full_name", unique=True)
+        collection.create_index([("stars", -1), ("full_name", 1)])
+        for field in FILTER_FIELDS:
+            collection.create_index([(field, 1), ("stars", -1), ("full_name", 1)])
+        collection.create_index([(field, "text") for field in SEARCH_FIELDS],
+                                weights=SEARCH_FIELDS, name="bot_text_search")
+    except Exception as e:
+        print(f"[!] Could not create indexes: {e}")
+
+
+def load_local_bots(path: str = "bots_data.ndjson") -> List[Dict[str, Any]]:
+    """Read the append-only local output, latest record per repo, sorted by stars.
+
+    Falls back to the legacy bots_data.json array when no NDJSON file exists.
+    """
+    bots: Dict[str, Dict[str, Any]] = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    bot = json.loads(line)
+                except ValueError:
+                    # A torn final line from an interrupted write
+                    continue
+                bots[bot["full_name"]] = bot
+    except FileNotFoundError:
+        legacy_path = os.path.splitext(path)[0] + ".json"
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                bots = {bot["full_name"]: bot for bot in json.load(f)}
+        except (OSError, ValueError):
+            return []
+    return sorted(bots.values(), key=lambda b: b.get("stars") or 0, reverse=True)
+
+
+def append_records(path: str, bots: List[Dict[str, Any]]):
+    """Append bots as NDJSON lines with a single O_APPEND write per batch.
+
+    Readers only index complete lines, so a batch still being written never
+    shows up half-parsed.
+    """
+    data = "".join(json.dumps(bot, ensure_ascii=False) + "\n" for bot in bots).encode("utf-8")
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+class BotWriter:
+    """Write-behind persistence for processed bots.
+
+    Bots are buffered and flushed every `batch_size` records or
+    `flush_interval` seconds, whichever comes first; a timer thread flushes
+    a partly filled buffer even when no more bots arrive. A flush is one
+    unordered bulk_write of upserts to MongoDB and an append to the local
+    NDJSON (and optional CSV) output, done outside the buffer lock so
+    workers calling add() never wait on I/O; flushes themselves run one at
+    a time, in order. With a `facets` store, each MongoDB batch also moves
+    the materialized facet counts; a batch whose delta cannot be applied
+    flags them for a rebuild instead, and is written all the same. Closing
+    the writer flushes whatever is left and compacts the local file once it
+    has accumulated too many superseded records.
+    """
+
+    def __init__(self, collection=None, local_path: Optional[str] = "bots_data.ndjson",
+                 csv_path: Optional[str] = None, batch_size: int = 50, flush_interval: float = 10.0,
+                 on_flush: Callable[[], None] = None, facets=None):
+        self.collection = collection
+        self.facets = facets
+        self.local_path = local_path
+        self.csv_path = csv_path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self.written = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._last_flush = time.monotonic()
+        # _lock guards the buffer only; _write_lock keeps batches reaching storage in the order taken
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._local_ok = local_path is not None
+        self._closed = threading.Event()
+        if flush_interval and flush_interval > 0:
+            threading.Thread(target=self._flush_periodically, daemon=True).start()
+
+    def add(self, bot: Dict[str, Any]):
+        with self._lock:
+            self._buffer.append(bot)
+            due = (len(self._buffer) >= self.batch_size
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._write_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+                self._last_flush = time.monotonic()
+            if not batch:
+                return
+            self._write_mongo(batch)
+            self._write_local(batch)
+            self.written += len(batch)
+            metrics.BOTS_WRITTEN.inc(len(batch))
+        if self.on_flush:
+            self.on_flush()
+
+    def _flush_periodically(self):
+        """Flush whatever has waited flush_interval, so the write-behind delay holds when bots stop arriving."""
+        while True:
+            with self._lock:
+                delay = self._last_flush + self.flush_interval - time.monotonic()
+            if delay <= 0:
+                self.flush()
+                delay = self.flush_interval
+            if self._closed.wait(delay):
+                return
+
+    def _write_mongo(self, batch: List[Dict[str, Any]]):
+        if self.collection is None:
+            return
+        from pymongo import UpdateOne
+        previous = None
+        if self.facets is not None:
+            try:
+                # The replaced versions are needed to take their old facet counts out
+                previous = self.facets.previous(self.collection, [bot["full_name"] for bot in batch])
+            except Exception as e:
+                print(f"[!] Could not read replaced bots for facet counts: {e}")
+        try:
+            ops = [UpdateOne({"full_name": bot["full_name"]}, {"$set": bot}, upsert=True) for bot in batch]
+            with metrics.timer("mongo_write"):
+                self.collection.bulk_write(ops, ordered=False)
+            print(f"[+] {len(batch)} bots synced to MongoDB.")
+        except Exception as e:
+            print(f"[!] Error saving to MongoDB: {e}")
+            # Part of an unordered batch may have been written, so no delta is known to be right
+            self._facets_stale()
+            return
+        if self.facets is None:
+            return
+        if previous is None:
+            self._facets_stale()
+            return
+        try:
+            self.facets.record(batch, previous)
+        except Exception as e:
+            print(f"[!] Could not update facet counts: {e}")
+            self._facets_stale()
+
+    def _facets_stale(self):
+        if self.facets is None:
+            return
+        try:
+            self.facets.mark_stale()
+            print("[*] Facet counts skipped this batch; flagged for a rebuild")
+        except Exception as e:
+            print(f"[!] Could not flag facet counts for a rebuild: {e}")
+
+    def _write_local(self, batch: List[Dict[str, Any]]):
+        if not self._local_ok:
+            return
+        try:
+            if not os.path.exists(self.local_path):
+                # Carry records over from the legacy bots_data.json on first write
+                batch = load_local_bots(self.local_path) + batch
+            with metrics.timer("local_write"):
+                append_records(self.local_path, batch)
+            if self.csv_path:
+                new_file = not os.path.exists(self.csv_path)
+                with open(self.csv_path, "a", newline="", encoding="utf-8") as f:
+                    writer = csv.DictWriter(f, fieldnames=BOT_FIELDS, extrasaction="ignore")
+                    if new_file:
+                        writer.writeheader()
+                    writer.writerows(batch)
+        except OSError as e:
+            # Read-only filesystems (e.g. Vercel): keep going with MongoDB only
+            self._local_ok = False
+            print(f"[*] Local file saving skipped (read-only filesystem): {e}")
+
+    def compact(self):
+        """Rewrite the local output with only the latest record per repo."""
+        if not self._local_ok or not os.path.exists(self.local_path):
+            return
+        bots = load_local_bots(self.local_path)
+        with open(self.local_path, "r", encoding="utf-8") as f:
+            lines = sum(1 for _ in f)
+        if lines <= 2 * len(bots):
+            return
+        try:
+            tmp_path = f"{self.local_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write("".join(json.dumps(bot, ensure_ascii=False) + "\n" for bot in bots))
+            os.replace(tmp_path, self.local_path)
+            if self.csv_path:
+                tmp_path = f"{self.csv_path}.tmp"
+                with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+                    writer = csv.DictWriter(f, fieldnames=BOT_FIELDS, extrasaction="ignore")
+                    writer.writeheader()
+                    writer.writerows(bots)
+                os.replace(tmp_path, self.csv_path)
+        except OSError as e:
+            print(f"[*] Local file compaction skipped: {e}")
+
+    def close(self):
+        self._closed.set()
+        self.flush()
+        self.compact()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
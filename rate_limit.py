@@ -0,0 +1,161 @@
+import threading
+import time
+from typing import Dict, Optional
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a quota cannot be satisfied within the allowed wait."""
+
+
+class TokenBucket:
+    """Token bucket that refills continuously until the server reports its real window.
+
+    Once `observe()` has seen the provider's remaining/reset numbers the
+    bucket follows them instead: tokens come back all at once when the
+    window resets, and when fewer than `low_water` of the budget is left the
+    remaining calls are spread evenly over what is left of the window.
+    """
+
+    def __init__(self, name: str, capacity: float, period: float, low_water: float = 0.1,
+                 max_wait: float = 120.0):
+        self.name = name
+        self.capacity = capacity
+        self.period = period
+        self.low_water = low_water
+        self.max_wait = max_wait
+        self.tokens = capacity
+        self.window_reset: Optional[float] = None
+        self.blocked_until = 0.0
+        self.next_allowed = 0.0
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float):
+        if self.window_reset is not None:
+            if time.time() >= self.window_reset:
+                self.tokens = self.capacity
+                self.window_reset = None
+        else:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.capacity / self.period)
+        self._updated = now
+
+    def _delay(self, now: float) -> float:
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens < 1:
+            if self.window_reset is not None:
+                return max(self.window_reset - time.time(), 0.05)
+            return (1 - self.tokens) * self.period / self.capacity
+        if now < self.next_allowed:
+            return self.next_allowed - now
+        return 0.0
+
+    def acquire(self):
+        deadline = time.monotonic() + self.max_wait
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                delay = self._delay(now)
+                if delay <= 0:
+                    break
+                if now + delay > deadline:
+                    raise RateLimitExceeded(f"{self.name} quota exhausted; next slot in {delay:.0f}s")
+                self._cond.wait(delay)
+            self.tokens -= 1
+            if self.window_reset is not None and self.tokens < self.capacity * self.low_water:
+                # Budget is running low: pace the remaining calls over the rest of the window
+                spacing = max(self.window_reset - time.time(), 0) / max(self.tokens, 1)
+                self.next_allowed = now + spacing
+
+    def refund(self):
+        """Give back a token for a call the provider did not count."""
+        with self._cond:
+            self.tokens = min(self.capacity, self.tokens + 1)
+            self._cond.notify_all()
+
+    def observe(self, remaining: int, limit: int = None, reset_at: float = None):
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            if limit:
+                self.capacity = limit
+            if reset_at and reset_at != self.window_reset:
+                # A new window started: the server's count is authoritative
+                self.tokens = remaining
+                self.window_reset = reset_at
+            else:
+                self.tokens = min(self.tokens, remaining)
+            self._cond.notify_all()
+
+    def block(self, seconds: float):
+        with self._cond:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """Shared scheduler with one token bucket per API quota."""
+
+    def __init__(self, buckets: Dict[str, TokenBucket]):
+        self.buckets = buckets
+
+    @classmethod
+    def for_github_and_gemini(cls, authenticated: bool, gemini_rpm: int = 30, max_wait: float = 120.0):
+        return cls({
+            "core": TokenBucket("GitHub REST", 5000 if authenticated else 60, 3600, max_wait=max_wait),
+            "search": TokenBucket("GitHub search", 30 if authenticated else 10, 60, max_wait=max_wait),
+            "graphql": TokenBucket("GitHub GraphQL", 5000, 3600, max_wait=max_wait),
+            "gemini": TokenBucket("Gemini", gemini_rpm, 60, low_water=0, max_wait=max_wait),
+        })
+
+    def acquire(self, bucket: str):
+        self.buckets[bucket].acquire()
+
+    def refund(self, bucket: str):
+        self.buckets[bucket].refund()
+
+    def update_from_headers(self, bucket: str, headers: Dict[str, str]):
+        """Sync a bucket with GitHub's X-RateLimit-* headers (keys lower-cased)."""
+        bucket = headers.get("x-ratelimit-resource", bucket)
+        if bucket not in self.buckets or "x-ratelimit-remaining" not in headers:
+            return
+        try:
+            remaining = int(headers["x-ratelimit-remaining"])
+            limit = int(headers.get("x-ratelimit-limit") or 0) or None
+            reset_at = float(headers.get("x-ratelimit-reset") or 0) or None
+        except ValueError:
+            return
+        self.buckets[bucket].observe(remaining, limit, reset_at)
+
+    def backoff(self, bucket: str, headers: Dict[str, str] = None, attempt: int = 0) -> float:
+        """Block a bucket after a 403/429 and return how long callers will wait."""
+        headers = headers or {}
+        wait = None
+        if headers.get("retry-after"):
+            try:
+                wait = float(headers["retry-after"])
+            except ValueError:
+                pass
+        if wait is None and headers.get("x-ratelimit-remaining") == "0" and headers.get("x-ratelimit-reset"):
+            wait = float(headers["x-ratelimit-reset"]) - time.time() + 1
+        if wait is None:
+            wait = min(2 ** attempt * 5, 60)
+        wait = max(wait, 1.0)
+        self.buckets[bucket].block(wait)
+        return wait
+
+
+def is_rate_limited(status: int, headers: Dict[str, str], body: bytes = b"") -> bool:
+    """True for GitHub's primary (403/429 with no budget left) and secondary rate limits."""
+    if status == 429:
+        return True
+    if status != 403:
+        return False
+    return (headers.get("x-ratelimit-remaining") == "0" or "retry-after" in headers
+            or b"rate limit" in (body or b"").lower())
+
+
+def is_quota_error(error: Exception) -> bool:
+    """True for Gemini quota errors (google.api_core ResourceExhausted / HTTP 429)."""
+    return (type(error).__name__ == "ResourceExhausted" or getattr(error, "code", None) == 429
+            or "429" in str(error))
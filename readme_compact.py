@@ -0,0 +1,146 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Tuple
+
+# Rough size of a Gemini token in English prose and markdown
+CHARS_PER_TOKEN = 4
+DEFAULT_TOKEN_BUDGET = 1200
+
+# Code blocks longer than this keep only their first lines
+MAX_CODE_LINES = 6
+
+# Relevance of a section by its heading; the first match wins, 0 drops the section
+SECTION_SCORES = [
+    (re.compile(r"licen[cs]e|contribut|credit|acknowledg|changelog|change log|sponsor|donat|support|"
+                r"star history|stargazers|authors?|contact|thanks|faq|screenshots?|roadmap|todo", re.I), 0),
+    (re.compile(r"feature|about|overview|description|what|introduction", re.I), 3),
+    (re.compile(r"usage|how to use|commands?|getting started|quick ?start|example", re.I), 3),
+    (re.compile(r"install|setup|set up|deploy|configur|run|docker|environment|\.env", re.I), 2.5),
+    (re.compile(r"requirement|prerequisite|dependenc", re.I), 1),
+]
+INTRO_SCORE = 4
+DEFAULT_SCORE = 1.5
+
+# A section is only cut to fit if at least this many characters of it would remain
+MIN_PARTIAL_CHARS = 200
+
+_COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+_BADGE = re.compile(r"\[!\[[^\]]*\]\([^)]*\)\]\([^)]*\)")
+_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_BLOCK_TAGS = re.compile(r"<(img|br|hr|source|video|picture)\b[^>]*>|<(svg|style|script)\b.*?</\2>", re.I | re.DOTALL)
+_TAG = re.compile(r"</?[a-zA-Z][^>]*>")
+_LINK = re.compile(r"\[([^\]]+)\]\([^)]*\)")
+_LINK_DEFINITION = re.compile(r"^\s*\[[^\]]+\]:\s*\S+.*$", re.MULTILINE)
+_HEADING = re.compile(r"^#{1,6}\s+(.*?)\s*#*\s*$")
+_BLANK_RUNS = re.compile(r"\n{3,}")
+
+
+def _trim_code_blocks(text: str) -> str:
+    out, block = [], None
+    for line in text.splitlines():
+        if line.lstrip().startswith(("```", "~~~")):
+            if block is None:
+                block = []
+                out.append(line)
+                continue
+            if len(block) > MAX_CODE_LINES:
+                block = block[:MAX_CODE_LINES] + ["..."]
+            out.extend(block)
+            out.append(line)
+            block = None
+        elif block is not None:
+            block.append(line)
+        else:
+            out.append(line)
+    if block is not None:
+        # Unterminated fence: keep what fits, like a closed one
+        out.extend(block[:MAX_CODE_LINES])
+    return "\n".join(out)
+
+
+def strip_markup(readme: str) -> str:
+    """README text without comments, badges, images, HTML, link targets or long code listings."""
+    text = _COMMENT.sub("", readme)
+    text = _BADGE.sub("", text)
+    text = _IMAGE.sub("", text)
+    text = _BLOCK_TAGS.sub("", text)
+    text = _TAG.sub("", text)
+    text = _LINK.sub(r"\1", text)
+    text = _LINK_DEFINITION.sub("", text)
+    text = _trim_code_blocks(text)
+    lines = [line.rstrip() for line in text.splitlines()]
+    return _BLANK_RUNS.sub("\n\n", "\n".join(lines)).strip()
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """(heading, body) pairs; text before the first heading has heading ''."""
+    sections, heading, body, in_code = [], "", [], False
+    for line in text.splitlines():
+        if line.lstrip().startswith(("```", "~~~")):
+            in_code = not in_code
+        match = None if in_code else _HEADING.match(line)
+        if match:
+            sections.append((heading, "\n".join(body).strip()))
+            heading, body = match.group(1), []
+        else:
+            body.append(line)
+    sections.append((heading, "\n".join(body).strip()))
+    return [(h, b) for h, b in sections if h or b]
+
+
+def section_score(heading: str) -> float:
+    if not heading:
+        return INTRO_SCORE
+    for pattern, score in SECTION_SCORES:
+        if pattern.search(heading):
+            return score
+    return DEFAULT_SCORE
+
+
+def compact_readme(readme: str, token_budget: int = DEFAULT_TOKEN_BUDGET) -> str:
+    """The most relevant README sections that fit in `token_budget`, in their original order."""
+    budget = token_budget * CHARS_PER_TOKEN
+    sections = split_sections(strip_markup(readme or ""))
+    # The opening section, usually the title and tagline, ranks as the intro whatever its heading
+    scores = [INTRO_SCORE if i == 0 else section_score(heading) for i, (heading, _) in enumerate(sections)]
+    ranked = sorted((i for i, score in enumerate(scores) if score > 0), key=lambda i: (-scores[i], i))
+    chosen = {}
+    for i in ranked:
+        heading, body = sections[i]
+        text = f"## {heading}\n{body}" if heading else body
+        if len(text) + 2 <= budget:
+            chosen[i] = text
+            budget -= len(text) + 2
+        elif budget >= MIN_PARTIAL_CHARS:
+            # Cut at a line boundary where there is one
+            cut = text[:budget - 2]
+            chosen[i] = cut.rsplit("\n", 1)[0] if "\n" in cut else cut
+            budget = 0
+        if budget < MIN_PARTIAL_CHARS:
+            break
+    return "\n\n".join(chosen[i] for i in sorted(chosen))
+
+
+class ReadmeCompactor:
+    """compact_readme() with an LRU cache keyed by README hash, shared by the sync workers."""
+
+    def __init__(self, token_budget: int = DEFAULT_TOKEN_BUDGET, max_entries: int = 5000):
+        self.token_budget = token_budget
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def compact(self, readme: str) -> str:
+        key = hashlib.sha256((readme or "").encode("utf-8")).hexdigest()
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        compacted = compact_readme(readme, self.token_budget)
+        with self._lock:
+            self._entries[key] = compacted
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return compacted
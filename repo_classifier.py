@@ -0,0 +1,182 @@
+import math
+import re
+from collections import Counter
+from typing import List, Dict, Any, Iterable, Tuple
+
+LIBRARY = "Library/Module"
+APPLICATION = "Application/Bot"
+LABELS = (LIBRARY, APPLICATION)
+
+# Weighted cues per label, matched in one pass over name, description and README.
+# Each pattern counts at most MAX_HITS times so a long README can't drown the rest.
+PATTERNS = {
+    LIBRARY: [
+        (r"\bwrappers?\b", 1.5), (r"\blibrary\b", 1.5), (r"\bapi[- ]client\b", 1.5), (r"\bsdk\b", 1.5),
+        (r"\bframework\b", 1.0), (r"\bfor developers\b", 1.0), (r"\bbindings?\b", 1.0),
+        (r"\bclient for\b", 1.0), (r"\btoolkit\b", 1.0), (r"\bsetup\.py\b|\bpyproject\.toml\b", 1.0),
+        (r"\bpip install (?!-r\b)[\w.-]+", 1.0), (r"\bnpm install (?:--save )?[\w@/.-]+", 0.5),
+        (r"\bgo get\b", 1.0), (r"\bcomposer require\b", 1.0), (r"\bcargo add\b", 1.0),
+        (r"^\s*(?:from [\w.]+ )?import \w+", 0.5), (r"\brequire\(['\"][\w@/.-]+['\"]\)", 0.5),
+    ],
+    APPLICATION: [
+        (r"\bbot for\b", 1.5), (r"\bready to use\b", 1.0), (r"\brun with\b", 1.0), (r"\bdeploy(?:ment|ing)?\b", 1.0),
+        (r"\bdocker-compose\b", 1.0), (r"\bself-hosted\b", 1.0), (r"\bpersonal bot\b", 1.5),
+        (r"\bheroku\b", 1.0), (r"\bbot_?token\b", 1.0), (r"(?<![\w.])\.env\b", 0.5),
+        (r"\bpip install -r requirements\.txt\b", 1.0), (r"\b(?:python3?|node|go run) [\w/.-]*(?:bot|main|app|index)\b", 1.0),
+        (r"@\w+bot\b", 1.0), (r"\bbotfather\b", 1.0),
+    ],
+}
+MAX_HITS = 3
+
+# Applications are the historic default, so no evidence at all leans that way
+PRIOR_LOG_ODDS = -0.5
+
+# Trained labels per class before the token model is trusted at all
+MIN_TRAINING_PER_LABEL = 20
+
+README_SCAN_CHARS = 20000
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_CAMEL = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+
+
+def _compile(patterns: Dict[str, List[Tuple[str, float]]]):
+    groups, meta = [], {}
+    for label, entries in patterns.items():
+        for pattern, weight in entries:
+            group = f"p{len(groups)}"
+            groups.append(f"(?P<{group}>{pattern})")
+            meta[group] = (label, weight)
+    return re.compile("|".join(groups), re.IGNORECASE | re.MULTILINE), meta
+
+
+_MATCHER, _PATTERN_META = _compile(PATTERNS)
+
+
+def pattern_log_odds(text: str) -> float:
+    """Library-vs-application evidence from the cue patterns, in log-odds units."""
+    hits = Counter(match.lastgroup for match in _MATCHER.finditer(text))
+    score = 0.0
+    for group, count in hits.items():
+        label, weight = _PATTERN_META[group]
+        score += weight * min(count, MAX_HITS) * (1 if label == LIBRARY else -1)
+    return score
+
+
+def _topics(doc: Dict[str, Any]) -> List[str]:
+    if doc.get("topics") is not None:
+        return list(doc["topics"])
+    # Stored bots keep topics joined into `category`
+    return [t.strip() for t in (doc.get("category") or "").split(",") if t.strip()]
+
+
+def metadata_tokens(doc: Dict[str, Any]) -> List[str]:
+    """Tokens from the fields a search item and a stored bot both carry."""
+    name = _CAMEL.sub(" ", doc.get("name") or "")
+    tokens = ["name:" + t for t in _TOKEN.findall(name.lower())]
+    tokens += _TOKEN.findall((doc.get("description") or "").lower())
+    tokens += ["topic:" + t.lower() for t in _topics(doc)]
+    if doc.get("language"):
+        tokens.append("lang:" + doc["language"].lower())
+    return tokens
+
+
+class RepoClassifier:
+    """Library-vs-application classifier that runs locally and reports its confidence.
+
+    Combines the cue patterns (over name, description and README) with a
+    multinomial naive Bayes over metadata tokens, trained from the repo_type
+    labels already stored. Until there are enough labels only the patterns
+    count, and their confidence is too coarse to act on: callers should
+    check `trained` before skipping Gemini on a prediction. `predict`
+    returns (label, confidence), confidence in [0.5, 1].
+    """
+
+    def __init__(self, smoothing: float = 1.0):
+        self.smoothing = smoothing
+        self.trained = False
+        self._log_prior = 0.0
+        self._log_likelihood: Dict[str, float] = {}
+
+    def fit(self, bots: Iterable[Dict[str, Any]]) -> int:
+        """Train on stored bots with a model-made repo_type; returns how many were used."""
+        counts = {label: Counter() for label in LABELS}
+        docs = Counter()
+        for bot in bots:
+            label = bot.get("repo_type")
+            # Only Gemini's labels: placeholders and our own guesses would feed back on themselves
+            if label not in LABELS or not bot.get("summary_hash") or bot.get("summary_source") == "local":
+                continue
+            counts[label].update(metadata_tokens(bot))
+            docs[label] += 1
+        if min(docs[label] for label in LABELS) < MIN_TRAINING_PER_LABEL:
+            self.trained = False
+            return 0
+        vocabulary = set(counts[LIBRARY]) | set(counts[APPLICATION])
+        totals = {label: sum(counts[label].values()) + self.smoothing * len(vocabulary) for label in LABELS}
+        self._log_likelihood = {
+            token: math.log((counts[LIBRARY][token] + self.smoothing) / totals[LIBRARY])
+            - math.log((counts[APPLICATION][token] + self.smoothing) / totals[APPLICATION])
+            for token in vocabulary
+        }
+        self._log_prior = math.log(docs[LIBRARY] / docs[APPLICATION])
+        self.trained = True
+        return docs[LIBRARY] + docs[APPLICATION]
+
+    def predict(self, repo: Dict[str, Any], readme: str = "") -> Tuple[str, float]:
+        text = f"{repo.get('name') or ''}\n{repo.get('description') or ''}\n{(readme or '')[:README_SCAN_CHARS]}"
+        log_odds = pattern_log_odds(text)
+        if self.trained:
+            log_odds += self._log_prior
+            log_odds += sum(self._log_likelihood.get(token, 0.0) for token in metadata_tokens(repo))
+        else:
+            log_odds += PRIOR_LOG_ODDS
+        log_odds = max(-30.0, min(30.0, log_odds))
+        p_library = 1.0 / (1.0 + math.exp(-log_odds))
+        if p_library >= 0.5:
+            return LIBRARY, p_library
+        return APPLICATION, 1.0 - p_library
+
+
+_HEADING = re.compile(r"^\s*#{1,6}\s*(.+?)\s*#*\s*$")
+_USAGE_HEADING = re.compile(r"install|usage|getting started|setup|quick ?start|run", re.IGNORECASE)
+_MARKUP = re.compile(r"!\[[^\]]*\]\([^)]*\)|<[^>]+>|\[([^\]]*)\]\([^)]*\)|[*`]|__")
+
+
+def _plain(line: str) -> str:
+    return _MARKUP.sub(lambda m: m.group(1) or "", line).strip()
+
+
+def extractive_summary(readme: str, description: str) -> Dict[str, str]:
+    """what_it_does/how_to_use lifted from the description and README, for repos Gemini is skipped on."""
+    lines = (readme or "").splitlines()
+    what = description
+    if not what:
+        paragraph = []
+        for line in lines:
+            text = _plain(line)
+            if _HEADING.match(line) or not text:
+                if paragraph:
+                    break
+                continue
+            paragraph.append(text)
+        what = " ".join(paragraph)[:300]
+    how = ""
+    for i, line in enumerate(lines):
+        heading = _HEADING.match(line)
+        if heading and _USAGE_HEADING.search(heading.group(1)):
+            steps = []
+            for step in lines[i + 1:]:
+                if _HEADING.match(step):
+                    break
+                text = _plain(step)
+                if text and not step.lstrip().startswith("```"):
+                    steps.append(text)
+                if len(steps) == 4:
+                    break
+            how = "; ".join(steps)
+            break
+    return {
+        "what_it_does": what or "No description available",
+        "how_to_use": how or "Refer to the GitHub repository for installation and usage instructions.",
+    }
@@ -0,0 +1,168 @@
+import hashlib
+import heapq
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Callable, List, Dict, Any, Iterable, Tuple
+
+# Searchable fields and how much a term occurrence in each counts
+SEARCH_FIELDS = {
+    "name": 5,
+    "description": 3,
+    "category": 3,
+    "what_it_does": 2,
+    "how_to_use": 1,
+}
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it",
+    "of", "on", "or", "that", "the", "this", "to", "with", "you", "your", "can", "use",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in _TOKEN_RE.findall((text or "").lower()):
+        if len(token) < 2 or token in STOPWORDS:
+            continue
+        # Cheap plural folding so "bots" matches "bot"
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def search_mongo(collection, query: str, offset: int, limit: int) -> List[Dict[str, Any]]:
+    projection = {"_id": 0, "score": {"$meta": "textScore"}}
+    cursor = (collection.find({"$text": {"$search": query}}, projection)
+              .sort([("score", {"$meta": "textScore"}), ("stars", -1)])
+              .skip(offset).limit(limit))
+    return list(cursor)
+
+
+class BM25Index:
+    """In-memory inverted index over bot summaries, ranked with BM25.
+
+    `sync()` takes the full current set of bots but only re-tokenizes the
+    ones whose searchable text changed, so refreshing after a sync costs
+    time proportional to what the sync touched.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self.doc_terms: Dict[str, List[str]] = {}
+        self.doc_lengths: Dict[str, float] = {}
+        self.doc_hashes: Dict[str, str] = {}
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        self.total_length = 0.0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    @staticmethod
+    def _content_hash(bot: Dict[str, Any]) -> str:
+        text = "\0".join(str(bot.get(field) or "") for field in SEARCH_FIELDS)
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def _remove(self, doc_id: str):
+        for term in self.doc_terms.pop(doc_id, []):
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(doc_id, 0.0)
+        self.doc_hashes.pop(doc_id, None)
+        self.docs.pop(doc_id, None)
+
+    def _add(self, doc_id: str, bot: Dict[str, Any], content_hash: str):
+        weighted = Counter()
+        for field, weight in SEARCH_FIELDS.items():
+            for token in tokenize(str(bot.get(field) or "")):
+                weighted[token] += weight
+        for term, tf in weighted.items():
+            self.postings[term][doc_id] = tf
+        length = float(sum(weighted.values()))
+        self.doc_terms[doc_id] = list(weighted)
+        self.doc_lengths[doc_id] = length
+        self.total_length += length
+        self.doc_hashes[doc_id] = content_hash
+        self.docs[doc_id] = bot
+
+    def sync(self, bots: Iterable[Dict[str, Any]]) -> int:
+        """Bring the index in line with `bots`; returns how many docs were (re)indexed."""
+        changed = 0
+        with self._lock:
+            seen = set()
+            for bot in bots:
+                doc_id = bot.get("full_name")
+                if not doc_id:
+                    continue
+                seen.add(doc_id)
+                content_hash = self._content_hash(bot)
+                if self.doc_hashes.get(doc_id) == content_hash:
+                    self.docs[doc_id] = bot
+                    continue
+                self._remove(doc_id)
+                self._add(doc_id, bot, content_hash)
+                changed += 1
+            for doc_id in [d for d in self.docs if d not in seen]:
+                self._remove(doc_id)
+                changed += 1
+        return changed
+
+    def search(self, query: str, offset: int = 0, limit: int = 20) -> List[Tuple[float, Dict[str, Any]]]:
+        terms = set(tokenize(query))
+        with self._lock:
+            n = len(self.docs)
+            if not terms or not n:
+                return []
+            avg_length = self.total_length / n or 1.0
+            scores: Dict[str, float] = defaultdict(float)
+            for term in terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+            top = heapq.nlargest(offset + limit, scores.items(),
+                                 key=lambda item: (item[1], self.docs[item[0]].get("stars") or 0))
+            return [(score, self.docs[doc_id]) for doc_id, score in top[offset:]]
+
+
+def search_page(collection, search_index: Callable[[], BM25Index], query: str,
+                page: int = 1, limit: int = 20) -> Dict[str, Any]:
+    """One page of ranked results from the Mongo text index, or the local BM25 index.
+
+    Like find_page, the local index answers when MongoDB is unavailable or
+    empty; a collection without its text index fails the query and lands
+    there too.
+    """
+    offset = (page - 1) * limit
+    items = None
+    if collection is not None:
+        try:
+            items = search_mongo(collection, query, offset, limit + 1)
+            if not items and collection.estimated_document_count() == 0:
+                items = None
+        except Exception as e:
+            print(f"MongoDB Error: {e}")
+    if items is None:
+        items = [dict(bot, score=round(score, 4)) for score, bot in search_index().search(query, offset, limit + 1)]
+    has_more = len(items) > limit
+    items = items[:limit]
+    return {
+        "query": query,
+        "bots": items,
+        "count": len(items),
+        "page": page,
+        "next_page": page + 1 if has_more else None,
+    }
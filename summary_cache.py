@@ -0,0 +1,82 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Iterable, Optional
+
+SUMMARY_FIELDS = ("what_it_does", "how_to_use", "repo_type", "summary_hash", "summarized_at", "summary_source")
+
+
+def summary_hash(readme: str, description: str, prompt_version: str) -> str:
+    """Hash of everything that goes into a summary prompt."""
+    digest = hashlib.sha256()
+    for part in (prompt_version, description or "", readme or ""):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class SummaryCache:
+    """Stored AI summaries keyed by repo, reused while their input hash matches.
+
+    Entries expire `ttl_days` after they were generated so summaries are
+    refreshed eventually, and the least recently used entries are evicted
+    once more than `max_entries` are held.
+    """
+
+    def __init__(self, ttl_days: float = 30, max_entries: int = 50000):
+        self.ttl = timedelta(days=ttl_days)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _expired(self, entry: Dict[str, Any]) -> bool:
+        try:
+            summarized_at = datetime.fromisoformat(entry["summarized_at"])
+        except (KeyError, TypeError, ValueError):
+            return True
+        return datetime.now(timezone.utc) - summarized_at > self.ttl
+
+    def load(self, bots: Iterable[Dict[str, Any]]):
+        """Seed the cache from previously stored bot documents."""
+        for bot in bots:
+            if bot.get("full_name") and bot.get("summary_hash"):
+                self.put(bot["full_name"], bot)
+
+    def get(self, full_name: str, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(full_name)
+            if entry is None or entry["summary_hash"] != key:
+                self.misses += 1
+                return None
+            if self._expired(entry):
+                del self._entries[full_name]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(full_name)
+            self.hits += 1
+            return dict(entry)
+
+    def stored(self, full_name: str) -> Optional[Dict[str, Any]]:
+        """The unexpired entry for a repo whatever its input hash, without counting a hit or miss."""
+        with self._lock:
+            entry = self._entries.get(full_name)
+            if entry is None or self._expired(entry):
+                return None
+            return dict(entry)
+
+    def put(self, full_name: str, summary: Dict[str, Any]):
+        entry = {field: summary.get(field) for field in SUMMARY_FIELDS}
+        if self._expired(entry):
+            return
+        with self._lock:
+            self._entries[full_name] = entry
+            self._entries.move_to_end(full_name)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,255 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Any, Optional
+
+
+from summary_cache import utc_now_iso
+
+LEASE_ID = "sync_lease"
+
+
+def instance_id() -> str:
+    """Identifies this process in leases: host, pid and a random suffix."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class SyncAlreadyRunning(RuntimeError):
+    pass
+
+
+class SyncProgress:
+    """Thread-safe counters for one sync run, read by /sync/status."""
+
+    def __init__(self):
+        self.discovered = 0
+        self.skipped = 0
+        self.done = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def discover(self, count: int = 1):
+        with self._lock:
+            self.discovered += count
+
+    def skip(self, count: int = 1):
+        with self._lock:
+            self.skipped += count
+
+    def record(self, ok: bool = True):
+        with self._lock:
+            if ok:
+                self.done += 1
+            else:
+                self.failed += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = time.monotonic() - self.started
+            queued = max(self.discovered - self.skipped - self.done - self.failed, 0)
+            throughput = self.done / elapsed if elapsed > 0 else 0.0
+            return {
+                "done": self.done,
+                "failed": self.failed,
+                "skipped": self.skipped,
+                "queued": queued,
+                "elapsed_seconds": round(elapsed, 1),
+                "throughput_per_second": round(throughput, 3),
+                # Time to drain what the search has surfaced so far
+                "eta_seconds": round(queued / throughput, 1) if throughput else None,
+            }
+
+
+class SyncLease:
+    """Cross-instance mutual exclusion for syncs, as one document in MongoDB.
+
+    The holder renews `expires_at` while it runs; a crashed instance's lease
+    simply expires. The document also carries the holder's progress and a
+    `cancel_requested` flag so any instance can report on or stop the run.
+    """
+
+    def __init__(self, collection, owner: str, ttl: float = 60.0):
+        self.collection = collection
+        self.owner = owner
+        self.ttl = ttl
+
+    def acquire(self) -> bool:
+        now = time.time()
+        try:
+            self.collection.find_one_and_update(
+                {"_id": LEASE_ID, "$or": [{"expires_at": {"$lt": now}}, {"owner": self.owner}]},
+                {"$set": {"owner": self.owner, "expires_at": now + self.ttl, "acquired_at": utc_now_iso(),
+                          "cancel_requested": False, "progress": None}},
+                upsert=True
+            )
+            return True
+        except Exception as e:
+            # DuplicateKeyError from the upsert: someone else holds an unexpired lease
+            print(f"[*] Sync lease not acquired: {e}")
+            return False
+
+    def renew(self, progress: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Extend the lease; returns the lease document, or None if it was lost."""
+        from pymongo import ReturnDocument
+        try:
+            return self.collection.find_one_and_update(
+                {"_id": LEASE_ID, "owner": self.owner},
+                {"$set": {"expires_at": time.time() + self.ttl, "progress": progress}},
+                return_document=ReturnDocument.AFTER
+            )
+        except Exception as e:
+            print(f"[!] Could not renew sync lease: {e}")
+            return {}
+
+    def release(self):
+        try:
+            self.collection.delete_one({"_id": LEASE_ID, "owner": self.owner})
+        except Exception as e:
+            print(f"[!] Could not release sync lease: {e}")
+
+    def current(self) -> Optional[Dict[str, Any]]:
+        try:
+            lease = self.collection.find_one({"_id": LEASE_ID})
+        except Exception as e:
+            print(f"[!] Could not read sync lease: {e}")
+            return None
+        if lease and lease.get("expires_at", 0) >= time.time():
+            return lease
+        return None
+
+    def request_cancel(self) -> bool:
+        try:
+            result = self.collection.update_one({"_id": LEASE_ID, "expires_at": {"$gte": time.time()}},
+                                                {"$set": {"cancel_requested": True}})
+            return result.modified_count > 0
+        except Exception as e:
+            print(f"[!] Could not request sync cancellation: {e}")
+            return False
+
+
+class SyncJobManager:
+    """Runs at most one sync per process, and per deployment when MongoDB is available.
+
+    `job(progress, cancel_event, **kwargs)` does the actual work; it should
+    report into `progress` and stop at the next safe point once
+    `cancel_event` is set. Triggers while a sync is running are no-ops.
+    """
+
+    def __init__(self, job: Callable[..., Any], lease_collection: Callable[[], Any] = None,
+                 lease_ttl: float = 60.0):
+        self.job = job
+        self.lease_collection = lease_collection
+        self.lease_ttl = lease_ttl
+        self.owner = instance_id()
+        self.progress: Optional[SyncProgress] = None
+        self.cancel_event = threading.Event()
+        self.state = "idle"
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self._lease: Optional[SyncLease] = None
+        self._lock = threading.Lock()
+
+    def _get_lease(self) -> Optional[SyncLease]:
+        if self._lease is None and self.lease_collection is not None:
+            collection = self.lease_collection()
+            if collection is not None:
+                self._lease = SyncLease(collection, self.owner, self.lease_ttl)
+        return self._lease
+
+    def running(self) -> bool:
+        return self.state in ("running", "cancelling")
+
+    def _claim(self) -> bool:
+        with self._lock:
+            if self.running():
+                return False
+            lease = self._get_lease()
+            if lease is not None and not lease.acquire():
+                return False
+            self.progress = SyncProgress()
+            self.cancel_event = threading.Event()
+            self.state = "running"
+            self.started_at = utc_now_iso()
+            self.finished_at = self.result = self.error = None
+            return True
+
+    def _heartbeat(self, stop: threading.Event):
+        lease = self._get_lease()
+        while not stop.wait(self.lease_ttl / 3):
+            doc = lease.renew(self.progress.snapshot())
+            if doc is None:
+                print("[!] Sync lease lost to another instance; cancelling")
+                self.cancel()
+            elif doc.get("cancel_requested"):
+                self.cancel()
+
+    def _execute(self, **kwargs) -> Any:
+        stop = threading.Event()
+        if self._get_lease() is not None:
+            threading.Thread(target=self._heartbeat, args=(stop,), daemon=True).start()
+        try:
+            self.result = self.job(self.progress, self.cancel_event, **kwargs)
+            self.state = "cancelled" if self.cancel_event.is_set() else "finished"
+            return self.result
+        except Exception as e:
+            self.error = str(e)
+            self.state = "failed"
+            print(f"[!] Sync failed: {e}")
+            raise
+        finally:
+            stop.set()
+            self.finished_at = utc_now_iso()
+            if self._lease is not None:
+                self._lease.release()
+
+    def start(self, **kwargs) -> bool:
+        """Start a background sync; False if one is already running here or elsewhere."""
+        if not self._claim():
+            return False
+
+        def target():
+            try:
+                self._execute(**kwargs)
+            except Exception:
+                pass
+
+        threading.Thread(target=target, name="sync-job", daemon=True).start()
+        return True
+
+    def run(self, **kwargs) -> Any:
+        """Run a sync in the calling thread (serverless); raises SyncAlreadyRunning if one is."""
+        if not self._claim():
+            raise SyncAlreadyRunning("A sync is already running")
+        return self._execute(**kwargs)
+
+    def cancel(self) -> bool:
+        if self.running():
+            self.cancel_event.set()
+            self.state = "cancelling"
+            return True
+        lease = self._get_lease()
+        return lease.request_cancel() if lease is not None else False
+
+    def status(self) -> Dict[str, Any]:
+        status = {
+            "state": self.state,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": self.progress.snapshot() if self.progress else None,
+            "result": self.result,
+            "error": self.error,
+        }
+        if not self.running():
+            lease = self._get_lease()
+            remote = lease.current() if lease is not None else None
+            if remote:
+                # Running on another instance: report what it last heartbeated
+                status.update({"state": "cancelling" if remote.get("cancel_requested") else "running",
+                               "instance": remote.get("owner"), "started_at": remote.get("acquired_at"),
+                               "finished_at": None, "progress": remote.get("progress")})
+        return status
@@ -0,0 +1,60 @@
+import json
+import os
+from typing import Dict, Any
+
+from summary_cache import utc_now_iso
+
+
+class CheckpointStore:
+    """Where an incremental sync stopped: search cursor plus repos done on that page.
+
+    Stored as one document in the `sync_state` collection when MongoDB is
+    available, otherwise as a small JSON file next to the local data.
+    """
+
+    def __init__(self, collection=None, path: str = "sync_state.json", key: str = "search"):
+        self.collection = collection
+        self.path = path
+        self.key = key
+
+    def load(self) -> Dict[str, Any]:
+        if self.collection is not None:
+            try:
+                return self.collection.find_one({"_id": self.key}, {"_id": 0}) or {}
+            except Exception as e:
+                print(f"[!] Could not load sync checkpoint: {e}")
+                return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self, state: Dict[str, Any]):
+        state = dict(state, updated_at=utc_now_iso())
+        if self.collection is not None:
+            try:
+                self.collection.replace_one({"_id": self.key}, state, upsert=True)
+            except Exception as e:
+                print(f"[!] Could not save sync checkpoint: {e}")
+            return
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[*] Sync checkpoint not saved (read-only filesystem): {e}")
+
+    def clear(self):
+        # Keep a record of the finished pass; no cursor means start from the top
+        self.save({"cursor": None, "done": [], "completed_at": utc_now_iso()})
+
+
+def is_unchanged(repo: Dict[str, Any], stored: Dict[str, Any]) -> bool:
+    """True if the stored bot was built from this exact version of the repo."""
+    if not stored or not stored.get("pushed_at") or not stored.get("summary_hash"):
+        # Never skip repos still carrying a fallback summary
+        return False
+    return (stored.get("pushed_at") == repo.get("pushed_at")
+            and stored.get("last_updated") == repo.get("updated_at"))
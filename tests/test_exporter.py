@@ -0,0 +1,66 @@
+import csv
+import json
+import os
+import stat
+
+from bench.corpus import make_bots
+from bench.fakes import FakeCollection
+from bot_queries import LocalBotIndex
+from exporter import EXPORT_FILE_MODE, encode_export, export_fields, iter_bots, write_export
+from persistence import BOT_FIELDS
+
+
+def export(fmt, bots, fields):
+    return "".join(encode_export(fmt, iter(bots), fields))
+
+
+def test_fields_keep_the_requested_order_and_drop_unknown_ones():
+    assert export_fields("stars,name,secret,stars") == ["stars", "name"]
+    assert export_fields(None) == list(BOT_FIELDS)
+    assert export_fields("secret") == list(BOT_FIELDS)
+
+
+def test_formats_hold_the_same_rows():
+    bots = make_bots(5)
+    fields = ["full_name", "stars"]
+    expected = [{"full_name": bot["full_name"], "stars": bot["stars"]} for bot in bots]
+    assert json.loads(export("json", bots, fields)) == expected
+    assert [json.loads(line) for line in export("ndjson", bots, fields).splitlines()] == expected
+    rows = list(csv.DictReader(export("csv", bots, fields).splitlines()))
+    assert [(row["full_name"], int(row["stars"])) for row in rows] == [(b["full_name"], b["stars"]) for b in bots]
+
+
+def test_empty_exports_are_still_valid():
+    assert export("json", [], ["name"]) == "[]"
+    assert export("ndjson", [], ["name"]) == ""
+    assert export("csv", [], ["name", "stars"]).strip() == "name,stars"
+
+
+def test_local_export_walks_every_page_in_listing_order(monkeypatch):
+    monkeypatch.setattr("exporter.EXPORT_BATCH_SIZE", 7)
+    bots = make_bots(30)
+    index = LocalBotIndex(bots)
+    exported = list(iter_bots(None, lambda: index, {}, ["full_name"]))
+    assert [bot["full_name"] for bot in exported] == [bot["full_name"] for bot in index.iter_bots()]
+
+    filtered = list(iter_bots(None, lambda: index, {"repo_type": "Library/Module"}, ["full_name"]))
+    assert len(filtered) == sum(bot["repo_type"] == "Library/Module" for bot in bots)
+
+
+def test_empty_mongo_collection_falls_back_to_the_local_store():
+    index = LocalBotIndex(make_bots(3))
+    assert len(list(iter_bots(FakeCollection(), lambda: index, {}, ["name"]))) == 3
+    assert list(iter_bots(FakeCollection(), lambda: index, {"language": "Go"}, ["name"])) == []
+
+
+def test_written_file_is_complete_and_readable_by_others(tmp_path):
+    path = str(tmp_path / "bots.json")
+    umask = os.umask(0o022)
+    try:
+        assert write_export(path, "json", make_bots(4), ["name"]) == 4
+    finally:
+        os.umask(umask)
+    with open(path, encoding="utf-8") as f:
+        assert len(json.load(f)) == 4
+    assert stat.S_IMODE(os.stat(path).st_mode) == EXPORT_FILE_MODE
+    assert os.listdir(tmp_path) == ["bots.json"]
@@ -0,0 +1,94 @@
+import json
+import random
+
+from bench.corpus import make_bots
+from bench.fakes import FakeCollection
+from bot_queries import LocalBotIndex, find_page, topics
+from facets import FacetStore, facet_summary, index_facets, star_bucket
+from local_store import LocalBotStore
+from persistence import BotWriter
+
+
+class FailingFacets(FakeCollection):
+    def bulk_write(self, requests, ordered: bool = True):
+        raise RuntimeError("facets unavailable")
+
+
+def test_star_buckets_and_topics():
+    assert star_bucket(None) == "0-9"
+    assert star_bucket(10) == "10-49"
+    assert star_bucket(9999) == "5000-9999"
+    assert star_bucket(250000) == "10000+"
+    assert topics(" bot, telegram,, bot ") == ["bot", "telegram"]
+
+
+def test_deltas_match_a_full_recount(tmp_path):
+    bots, collection = make_bots(300), FakeCollection()
+    store = FacetStore(FakeCollection())
+    store.rebuild(collection)
+    writer = BotWriter(collection, local_path=str(tmp_path / "bots.ndjson"), batch_size=37, flush_interval=60,
+                       facets=store)
+    rng = random.Random(3)
+    for bot in bots:
+        writer.add(bot)
+    writer.flush()
+    for bot in rng.sample(bots, 100):
+        changed = dict(bot, stars=rng.randint(0, 20000), language=rng.choice(["Go", "Rust", None]),
+                       category=rng.choice(["bot, telegram", "game", ""]))
+        # The same repo twice in one batch replaced its stored version once
+        writer.add(changed)
+        writer.add(dict(changed, stars=changed["stars"] + 1))
+    writer.close()
+
+    incremental = store.load().summary()
+    store.rebuild(collection)
+    assert incremental == store.load().summary()
+    assert store.built()
+    local = LocalBotStore(str(tmp_path / "bots.ndjson"))
+    assert index_facets(local).summary() == incremental
+
+
+def test_a_failed_delta_flags_the_counts_for_a_rebuild(tmp_path):
+    collection, store = FakeCollection(), FacetStore(FailingFacets())
+    store.collection.update_one({"_id": "_built"}, {"$set": {"stale": False}}, upsert=True)
+    assert store.built()
+    writer = BotWriter(collection, local_path=str(tmp_path / "bots.ndjson"), flush_interval=0, facets=store)
+    writer.add(make_bots(1)[0])
+    writer.close()
+    assert collection.count_documents({}) == 1
+    assert not store.built()
+    # Flagged counts are still served until the rebuild
+    assert store.load() is not None
+
+
+def test_summary_falls_back_to_the_local_index():
+    bots = make_bots(50)
+    summary = facet_summary(None, lambda: LocalBotIndex(bots))
+    assert summary["total"] == 50
+    assert sum(bucket["count"] for bucket in summary["stars"]) == 50
+    assert sum(f["count"] for f in summary["facets"]["repo_type"]) == 50
+    assert facet_summary(FakeCollection(), lambda: LocalBotIndex(bots)) == summary
+
+
+def test_topic_chips_filter_the_listing_from_either_store(tmp_path):
+    bots = make_bots(120)
+    path = tmp_path / "bots.ndjson"
+    path.write_text("".join(json.dumps(bot) + "\n" for bot in bots), encoding="utf-8")
+    collection = FakeCollection()
+    collection.insert_many(bots)
+    local = LocalBotStore(str(path))
+    for chip in facet_summary(None, lambda: local)["facets"]["topic"][:5]:
+        filters = {"topic": chip["value"], "repo_type": "Application/Bot"}
+        expected = [bot["full_name"] for bot in local.iter_bots()
+                    if chip["value"] in topics(bot["category"]) and bot["repo_type"] == "Application/Bot"]
+        for source in (collection, None):
+            cursor, seen = None, []
+            while True:
+                page = find_page(source, lambda: local, filters, cursor, 10)
+                seen += [bot["full_name"] for bot in page["bots"]]
+                if not page["next_cursor"]:
+                    break
+                cursor = (page["bots"][-1]["stars"], page["bots"][-1]["full_name"])
+            assert seen == expected
+        assert len(local.query({"topic": chip["value"]}, None, 1000)) == chip["count"]
+    assert local.query({"topic": "no-such-topic"}, None, 10) == []
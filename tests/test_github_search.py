@@ -0,0 +1,62 @@
+from datetime import date
+
+import pytest
+
+from github_search import PER_PAGE, SEARCH_RESULT_CAP, STAR_BANDS, SearchError, ShardedSearch
+
+
+class FakeSearch:
+    """Answers search requests from per-shard totals; `fail` lists (qualifiers, page) that error."""
+
+    def __init__(self, totals, fail=()):
+        self.totals = totals
+        self.fail = set(fail)
+        self.requests = []
+
+    def __call__(self, params):
+        shard = params["q"].split(" ", 2)[2]
+        self.requests.append((shard, params["page"]))
+        if (shard, params["page"]) in self.fail:
+            return {}
+        total = self.totals.get(shard, 0)
+        start = (params["page"] - 1) * PER_PAGE
+        count = max(0, min(PER_PAGE, min(total, SEARCH_RESULT_CAP) - start))
+        items = [{"full_name": f"{shard}#{start + i}"} for i in range(count)]
+        return {"total_count": total, "items": items}
+
+
+def make_search(fake):
+    return ShardedSearch(fake, start=date(2020, 1, 1), end=date(2020, 1, 4), retry_delay=0)
+
+
+def test_oversized_band_is_split_by_creation_date():
+    fake = FakeSearch({STAR_BANDS[0]: 1500, f"{STAR_BANDS[0]} created:2020-01-01..2020-01-02": 150,
+                       f"{STAR_BANDS[0]} created:2020-01-03..2020-01-04": 30, STAR_BANDS[1]: 5})
+    repos = list(make_search(fake))
+    assert len(repos) == 185
+    assert (f"{STAR_BANDS[0]} created:2020-01-01..2020-01-02", 2) in fake.requests
+
+
+def test_cursor_resumes_after_the_page_it_came_with():
+    totals = {STAR_BANDS[0]: 250, STAR_BANDS[2]: 10}
+    pages = list(make_search(FakeSearch(totals)).pages())
+    cursor, _ = pages[0]
+    assert cursor == {"shards": list(STAR_BANDS), "page": 2}
+    resumed = list(make_search(FakeSearch(totals)).pages(cursor))
+    assert [items for _, items in resumed] == [items for _, items in pages[1:]]
+
+
+def test_failed_page_is_retried_then_raised_without_skipping_the_shard():
+    fake = FakeSearch({STAR_BANDS[0]: 150, STAR_BANDS[1]: 10}, fail={(STAR_BANDS[0], 2)})
+    walk = make_search(fake).pages()
+    cursor, _ = next(walk)
+    with pytest.raises(SearchError):
+        next(walk)
+    assert fake.requests.count((STAR_BANDS[0], 2)) == 3
+    assert cursor == {"shards": list(STAR_BANDS), "page": 2}
+    assert (STAR_BANDS[1], 1) not in fake.requests
+
+
+def test_empty_shard_is_not_an_error():
+    fake = FakeSearch({STAR_BANDS[3]: 3})
+    assert len(list(make_search(fake))) == 3
@@ -0,0 +1,45 @@
+import os
+import time
+
+from http_cache import FileResponseCache, conditional_headers, make_cache_entry
+from rate_limit import TokenBucket
+
+
+def entry(stored_at=None):
+    cached = make_cache_entry({"etag": '"abc"'}, b"body")
+    if stored_at is not None:
+        cached["stored_at"] = stored_at
+    return cached
+
+
+def test_entry_round_trips_with_its_validators(tmp_path):
+    cache = FileResponseCache(str(tmp_path))
+    cache.set("https://api.github.com/x", entry())
+    assert conditional_headers(cache.get("https://api.github.com/x")) == {"If-None-Match": '"abc"'}
+
+
+def test_expired_entry_is_a_miss(tmp_path):
+    cache = FileResponseCache(str(tmp_path), ttl_days=1)
+    cache.set("u", entry(stored_at=time.time() - 2 * 86400))
+    assert cache.get("u") is None
+
+
+def test_prune_drops_old_files_and_keeps_the_newest(tmp_path):
+    cache = FileResponseCache(str(tmp_path), ttl_days=1, max_files=2)
+    now = time.time()
+    for i in range(4):
+        cache.set(f"u{i}", entry())
+        os.utime(cache._path(f"u{i}"), (now - i * 60, now - i * 60))
+    cache.set("old", entry())
+    os.utime(cache._path("old"), (now - 3 * 86400, now - 3 * 86400))
+    assert cache.prune() == 3
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(cache._path(u)) for u in ("u0", "u1"))
+
+
+def test_refund_returns_a_token_without_exceeding_capacity():
+    bucket = TokenBucket("test", capacity=2, period=3600)
+    bucket.acquire()
+    assert bucket.tokens < 2
+    bucket.refund()
+    bucket.refund()
+    assert bucket.tokens == 2
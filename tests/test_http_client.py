@@ -0,0 +1,58 @@
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from http_client import HttpSession
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.connections.append(self.connection)
+        # Hold concurrent requests long enough that each gets its own pooled connection
+        time.sleep(0.1)
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    server.connections = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_get_survives_server_closing_every_idle_connection():
+    server = start_server()
+    url = f"http://127.0.0.1:{server.server_address[1]}/repo"
+    session = HttpSession()
+    try:
+        threads = [threading.Thread(target=session.get, args=(url,)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert session._pool_for(("http", f"127.0.0.1:{server.server_address[1]}")).qsize() == 3
+
+        # The server drops its idle keep-alive sockets, as GitHub does after a while
+        for connection in server.connections:
+            connection.shutdown(socket.SHUT_RDWR)
+            connection.close()
+        time.sleep(0.05)
+
+        response = session.get(url)
+        assert response.status == 200
+        assert response.json() == {"ok": True}
+    finally:
+        session.close()
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,63 @@
+import pytest
+
+from bench.corpus import make_bots, make_repos
+from bench.fake_github import FakeGitHub
+from bench.fakes import FakeGenerativeModel
+from bench.run import fake_mongo_uri
+from facets import FACETS_COLLECTION, FacetStore
+from scraper import GitHubBotScraper
+
+
+@pytest.fixture
+def github():
+    fake = FakeGitHub(make_repos(12), latency=0, jitter=0).start()
+    yield fake
+    fake.stop()
+
+
+def make_scraper(github, tmp_path, monkeypatch, name):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("HTTP_CACHE_DIR", str(tmp_path / "http_cache"))
+    scraper = GitHubBotScraper(github_token="test", mongo_uri=fake_mongo_uri(name), gemini_rpm=1_000_000)
+    scraper.github_base_url = github.url
+    scraper.model = FakeGenerativeModel(base_latency=0, per_char=0, jitter=0)
+    return scraper
+
+
+def test_budgeted_sync_leaves_an_unbuilt_facet_count_to_the_full_sync(github, tmp_path, monkeypatch):
+    scraper = make_scraper(github, tmp_path, monkeypatch, "incremental-facets")
+    scraper.collection.insert_many(make_bots(30))
+    facets = FacetStore(scraper.db.get_collection(FACETS_COLLECTION))
+
+    result = scraper.run_incremental(time_budget=60)
+    assert result["processed"] == 12
+    assert not facets.built()
+
+    scraper.run(limit=1)
+    assert facets.built()
+    assert facets.load().summary()["total"] == scraper.collection.count_documents({})
+
+
+def test_budget_keeps_room_for_the_slowest_repo(github, tmp_path, monkeypatch):
+    scraper = make_scraper(github, tmp_path, monkeypatch, "incremental-budget")
+    scraper.slowest_repo = 120.0
+    result = scraper.run_incremental(time_budget=60)
+    assert result["processed"] == 0
+    assert not result["finished"]
+
+
+def test_full_sync_only_recounts_missing_or_flagged_facets(github, tmp_path, monkeypatch):
+    scraper = make_scraper(github, tmp_path, monkeypatch, "full-sync-facets")
+    rebuilds = []
+    rebuild = FacetStore.rebuild
+    monkeypatch.setattr(FacetStore, "rebuild", lambda self, bots: rebuilds.append(1) or rebuild(self, bots))
+
+    scraper.run(limit=2)
+    assert len(rebuilds) == 1
+    scraper.run(limit=2)
+    assert len(rebuilds) == 1
+
+    scraper.facets.mark_stale()
+    scraper.run(limit=2)
+    assert len(rebuilds) == 2
+    assert scraper.facets.built()
@@ -0,0 +1,111 @@
+import json
+import os
+
+import local_store
+from bench.corpus import make_bots
+from bot_queries import LocalBotIndex
+from local_store import LocalBotStore, index_path, open_local_index
+
+
+def write_bots(path, bots, mode="w"):
+    with open(path, mode, encoding="utf-8") as f:
+        for bot in bots:
+            f.write(json.dumps(bot) + "\n")
+
+
+def names(page):
+    return [bot["full_name"] for bot in page]
+
+
+def test_sidecar_is_written_and_reused(tmp_path, monkeypatch):
+    path = str(tmp_path / "bots.ndjson")
+    write_bots(path, make_bots(30))
+    assert len(LocalBotStore(path)) == 30
+    assert os.path.exists(index_path(path))
+
+    scans = []
+    original = LocalBotStore._scan
+
+    def counting_scan(self, start, rows):
+        scans.append((start, len(rows)))
+        return original(self, start, rows)
+
+    monkeypatch.setattr(LocalBotStore, "_scan", counting_scan)
+    assert len(LocalBotStore(path)) == 30
+    # The second load starts from the sidecar's rows and scans nothing before its end
+    assert scans == [(os.path.getsize(path), 30)]
+
+
+def test_appends_are_scanned_and_the_latest_record_wins(tmp_path):
+    path = str(tmp_path / "bots.ndjson")
+    bots = make_bots(10)
+    write_bots(path, bots)
+    LocalBotStore(path)
+    updated = dict(bots[0], stars=1_000_000, what_it_does="Updated")
+    write_bots(path, [updated] + make_bots(15)[10:], mode="a")
+    store = LocalBotStore(path)
+    assert len(store) == 15
+    assert store.query({}, None, 1)[0]["what_it_does"] == "Updated"
+    with open(index_path(path), encoding="utf-8") as f:
+        assert json.load(f)["data_size"] == os.path.getsize(path)
+
+
+def test_torn_final_line_is_skipped_until_completed(tmp_path):
+    path = str(tmp_path / "bots.ndjson")
+    bots = make_bots(6)
+    write_bots(path, bots[:5])
+    line = json.dumps(bots[5]) + "\n"
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line[:20])
+    assert len(LocalBotStore(path)) == 5
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line[20:])
+    assert len(LocalBotStore(path)) == 6
+
+
+def test_rewritten_file_invalidates_the_sidecar(tmp_path):
+    path = str(tmp_path / "bots.ndjson")
+    write_bots(path, make_bots(20))
+    LocalBotStore(path)
+    # Compaction writes a new file and renames it over the old one
+    replacement = str(tmp_path / "compacted.ndjson")
+    write_bots(replacement, make_bots(20)[:3])
+    os.replace(replacement, path)
+    store = LocalBotStore(path)
+    assert len(store) == 3
+    assert [store.record(i) for i in range(3)] == list(LocalBotIndex(make_bots(20)[:3]).iter_bots())
+
+
+def test_older_sidecar_format_is_rebuilt(tmp_path, monkeypatch):
+    path = str(tmp_path / "bots.ndjson")
+    write_bots(path, make_bots(8))
+    LocalBotStore(path)
+    monkeypatch.setattr(local_store, "INDEX_FORMAT", local_store.INDEX_FORMAT + 1)
+    assert len(LocalBotStore(path)) == 8
+    with open(index_path(path), encoding="utf-8") as f:
+        assert json.load(f)["format"] == local_store.INDEX_FORMAT
+
+
+def test_pages_match_the_in_memory_index(tmp_path):
+    path = str(tmp_path / "bots.ndjson")
+    bots = make_bots(200)
+    write_bots(path, bots)
+    store, memory = LocalBotStore(path), LocalBotIndex(bots)
+    for filters in ({}, {"repo_type": "Library/Module"}, {"language": bots[0]["language"], "license": "MIT"}):
+        cursor, seen = None, []
+        while True:
+            page = store.query(filters, cursor, 25)
+            assert page == memory.query(filters, cursor, 25)
+            if not page:
+                break
+            seen.extend(names(page))
+            cursor = (page[-1]["stars"], page[-1]["full_name"])
+        assert len(seen) == len(set(seen))
+    assert store.query({}, None, 3, ["full_name"]) == memory.query({}, None, 3, ["full_name"])
+
+
+def test_open_local_index_falls_back_to_legacy_json(tmp_path):
+    path = str(tmp_path / "bots.ndjson")
+    assert len(open_local_index(path)) == 0
+    write_bots(path, make_bots(4))
+    assert isinstance(open_local_index(path), LocalBotStore)
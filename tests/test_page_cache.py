@@ -0,0 +1,71 @@
+import gzip
+
+import brotli
+
+from page_cache import PageCache, RenderedPage, accepted_encodings, choose_encoding, etag_matches
+
+HTML = "<html><body>" + "bot " * 500 + "</body></html>"
+
+
+def test_accept_encoding_q_values():
+    assert accepted_encodings("gzip;q=0.5, br") == {"gzip": 0.5, "br": 1.0, "identity": 1.0}
+    assert accepted_encodings("*;q=0")["identity"] == 0.0
+    assert accepted_encodings("gzip;q=oops")["gzip"] == 0.0
+
+
+def test_choose_encoding_prefers_quality_then_brotli():
+    assert choose_encoding("gzip, br") == "br"
+    assert choose_encoding("gzip, br;q=0.5") == "gzip"
+    assert choose_encoding("gzip;q=0, br;q=0") == "identity"
+    assert choose_encoding(None) == "identity"
+    assert choose_encoding("*") == "br"
+
+
+def test_if_none_match_uses_weak_comparison():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc", "other"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abcd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_variants_decode_to_the_page_and_have_distinct_etags():
+    page = RenderedPage(HTML)
+    body = HTML.encode("utf-8")
+    assert gzip.decompress(page.variants["gzip"][0]) == body
+    assert brotli.decompress(page.variants["br"][0]) == body
+    assert len({etag for _, etag in page.variants.values()}) == 3
+    assert RenderedPage(HTML).variants["gzip"] == page.variants["gzip"]
+
+
+def test_response_sends_the_variant_then_304_on_its_etag():
+    page = RenderedPage(HTML)
+    full = page.response("gzip", None)
+    assert full.status_code == 200
+    assert full.headers["Content-Encoding"] == "gzip"
+    assert full.headers["Vary"] == "Accept-Encoding"
+    assert gzip.decompress(full.get_data()) == HTML.encode("utf-8")
+
+    again = page.response("gzip", full.headers["ETag"])
+    assert again.status_code == 304
+    assert again.get_data() == b""
+    assert again.headers["ETag"] == full.headers["ETag"]
+
+    # The gzip ETag does not validate the identity variant
+    plain = page.response(None, full.headers["ETag"])
+    assert plain.status_code == 200
+    assert "Content-Encoding" not in plain.headers
+
+
+def test_page_cache_renders_once_per_source_object():
+    renders = []
+
+    def render(listing):
+        renders.append(listing)
+        return HTML
+
+    cache = PageCache(render)
+    listing = {"bots": []}
+    assert cache.get(listing) is cache.get(listing)
+    cache.get({"bots": []})
+    assert len(renders) == 2
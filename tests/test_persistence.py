@@ -0,0 +1,64 @@
+import threading
+import time
+
+from bench.fakes import FakeCollection
+from persistence import BotWriter, load_local_bots
+
+
+class SlowCollection(FakeCollection):
+    """Bulk writes block until released, to see what add() does meanwhile."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.writing = threading.Event()
+
+    def bulk_write(self, requests, ordered=True):
+        self.writing.set()
+        self.release.wait(5)
+        return super().bulk_write(requests, ordered)
+
+
+def bot(i, stars=0):
+    return {"full_name": f"a/bot{i}", "name": f"bot{i}", "stars": stars}
+
+
+def test_partial_buffer_is_flushed_after_the_interval_without_more_adds(tmp_path):
+    path = str(tmp_path / "bots.ndjson")
+    writer = BotWriter(None, path, batch_size=100, flush_interval=0.1)
+    writer.add(bot(1))
+    time.sleep(0.4)
+    assert [b["full_name"] for b in load_local_bots(path)] == ["a/bot1"]
+    writer.close()
+
+
+def test_add_does_not_wait_on_a_flush_in_progress():
+    collection = SlowCollection()
+    writer = BotWriter(collection, None, batch_size=1, flush_interval=60)
+    flusher = threading.Thread(target=writer.add, args=(bot(1),))
+    flusher.start()
+    assert collection.writing.wait(2)
+    writer.batch_size = 100
+    started = time.monotonic()
+    writer.add(bot(2))
+    assert time.monotonic() - started < 0.5
+    collection.release.set()
+    flusher.join()
+    writer.close()
+    assert collection.count_documents({}) == 2
+
+
+def test_a_later_flush_waits_and_lands_after_the_one_in_progress():
+    collection = SlowCollection()
+    writer = BotWriter(collection, None, batch_size=1, flush_interval=60)
+    first = threading.Thread(target=writer.add, args=(bot(1, stars=1),))
+    first.start()
+    assert collection.writing.wait(2)
+    second = threading.Thread(target=writer.add, args=(bot(1, stars=2),))
+    second.start()
+    time.sleep(0.1)
+    collection.release.set()
+    first.join()
+    second.join()
+    writer.close()
+    assert collection.find_one({"full_name": "a/bot1"})["stars"] == 2
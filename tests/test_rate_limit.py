@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from rate_limit import RateLimiter, RateLimitExceeded, TokenBucket, is_quota_error, is_rate_limited
+
+
+def test_bucket_follows_github_headers_for_its_resource():
+    limiter = RateLimiter.for_github_and_gemini(authenticated=True)
+    reset = time.time() + 600
+    limiter.update_from_headers("core", {"x-ratelimit-resource": "search", "x-ratelimit-remaining": "7",
+                                         "x-ratelimit-limit": "30", "x-ratelimit-reset": str(reset)})
+    search = limiter.buckets["search"]
+    assert (search.tokens, search.capacity, search.window_reset) == (7, 30, reset)
+    assert limiter.buckets["core"].tokens == 5000
+
+
+def test_headers_without_remaining_or_malformed_are_ignored():
+    limiter = RateLimiter.for_github_and_gemini(authenticated=True)
+    limiter.update_from_headers("core", {"x-ratelimit-limit": "10"})
+    limiter.update_from_headers("core", {"x-ratelimit-remaining": "soon"})
+    assert limiter.buckets["core"].tokens == 5000
+
+
+def test_same_window_only_lowers_the_count():
+    bucket = TokenBucket("test", capacity=100, period=3600)
+    reset = time.time() + 600
+    bucket.observe(50, 100, reset)
+    bucket.observe(80, 100, reset)
+    assert bucket.tokens == 50
+    bucket.observe(20, 100, reset)
+    assert bucket.tokens == 20
+
+
+def test_empty_window_raises_instead_of_waiting_past_max_wait():
+    bucket = TokenBucket("test", capacity=10, period=3600, max_wait=0.1)
+    bucket.observe(0, 10, time.time() + 600)
+    with pytest.raises(RateLimitExceeded):
+        bucket.acquire()
+
+
+def test_low_budget_spaces_out_the_remaining_calls():
+    bucket = TokenBucket("test", capacity=100, period=3600, low_water=0.1)
+    bucket.observe(5, 100, time.time() + 40)
+    bucket.acquire()
+    assert bucket.next_allowed - time.monotonic() > 5
+
+
+def test_backoff_prefers_retry_after_then_reset():
+    limiter = RateLimiter.for_github_and_gemini(authenticated=True)
+    assert limiter.backoff("core", {"retry-after": "30"}) == 30
+    wait = limiter.backoff("search", {"x-ratelimit-remaining": "0", "x-ratelimit-reset": str(time.time() + 20)})
+    assert 19 <= wait <= 22
+    assert limiter.backoff("graphql", {}, attempt=2) == 20
+
+
+def test_rate_limit_and_quota_detection():
+    assert is_rate_limited(429, {})
+    assert is_rate_limited(403, {"x-ratelimit-remaining": "0"})
+    assert is_rate_limited(403, {}, b"You have exceeded a secondary rate limit")
+    assert not is_rate_limited(403, {"x-ratelimit-remaining": "12"}, b"Resource not accessible")
+    assert is_quota_error(Exception("429 Resource has been exhausted"))
+    assert not is_quota_error(ValueError("bad json"))
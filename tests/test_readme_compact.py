@@ -0,0 +1,69 @@
+from readme_compact import (CHARS_PER_TOKEN, MAX_CODE_LINES, ReadmeCompactor, compact_readme, section_score,
+                            split_sections, strip_markup)
+
+README = """# Weather bot
+[![build](https://ci/badge.svg)](https://ci)
+<!-- generated -->
+A telegram bot that sends [forecasts](https://example.com) to groups.
+<img src="logo.png">
+
+## License
+MIT, see LICENSE.
+
+## Usage
+Add the bot to a group and send /weather.
+
+## Installation
+```sh
+pip install -r requirements.txt
+python bot.py
+```
+"""
+
+
+def test_markup_is_stripped_but_link_text_kept():
+    text = strip_markup(README)
+    assert "badge" not in text and "generated" not in text and "logo.png" not in text
+    assert "sends forecasts to groups" in text
+
+
+def test_long_code_blocks_are_trimmed():
+    code = "\n".join(f"line {i}" for i in range(20))
+    text = strip_markup(f"```\n{code}\n```")
+    assert f"line {MAX_CODE_LINES - 1}" in text and f"line {MAX_CODE_LINES}" not in text
+    assert "..." in text
+
+
+def test_headings_inside_code_blocks_do_not_split():
+    sections = split_sections("intro\n## Usage\n```\n# not a heading\n```\n## Setup\nrun it")
+    assert [heading for heading, _ in sections] == ["", "Usage", "Setup"]
+
+
+def test_section_scores():
+    assert section_score("") > section_score("Usage") > section_score("Requirements")
+    assert section_score("License") == 0
+    assert section_score("Something else") > 0
+
+
+def test_dropped_sections_and_original_order():
+    compacted = compact_readme(README)
+    assert "MIT" not in compacted
+    assert compacted.index("## Usage") < compacted.index("## Installation")
+
+
+def test_budget_keeps_the_most_relevant_sections():
+    filler = "\n".join(f"Requirement number {i} is a long line of text." for i in range(60))
+    readme = f"# Bot\nSends forecasts.\n\n## Requirements\n{filler}\n\n## Usage\nSend /weather."
+    compacted = compact_readme(readme, token_budget=100)
+    assert "Send /weather." in compacted
+    assert len(compacted) <= 100 * CHARS_PER_TOKEN
+
+
+def test_compactor_caches_by_readme_and_evicts_oldest():
+    compactor = ReadmeCompactor(max_entries=2)
+    first = compactor.compact(README)
+    assert compactor.compact(README) is first
+    compactor.compact("# Two")
+    compactor.compact("# Three")
+    assert len(compactor._entries) == 2
+    assert first not in compactor._entries.values()
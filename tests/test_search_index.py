@@ -0,0 +1,30 @@
+from bench.corpus import make_bots
+from bench.fakes import FakeCollection
+from search_index import BM25Index, search_page
+
+
+def local_index(bots):
+    index = BM25Index()
+    index.sync(bots)
+    return lambda: index
+
+
+def test_empty_collection_falls_back_to_local_index():
+    bots = make_bots(50)
+    page = search_page(FakeCollection(), local_index(bots), "telegram bot")
+    assert page["count"] > 0
+    assert all("score" in bot for bot in page["bots"])
+
+
+def test_collection_without_text_index_falls_back_to_local_index():
+    bots = make_bots(50)
+    collection = FakeCollection()
+    collection.insert_many([dict(bot) for bot in bots])
+    page = search_page(collection, local_index(bots), "telegram bot")
+    assert page["count"] > 0
+
+
+def test_no_match_stays_empty():
+    bots = make_bots(50)
+    page = search_page(None, local_index(bots), "zzzzunmatched")
+    assert page == {"query": "zzzzunmatched", "bots": [], "count": 0, "page": 1, "next_page": None}
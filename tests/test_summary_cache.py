@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta, timezone
+
+from summary_cache import SummaryCache, summary_hash, utc_now_iso
+
+
+def summary(key, summarized_at=None):
+    return {"what_it_does": "Sends forecasts", "how_to_use": "Run it", "repo_type": "Application/Bot",
+            "summary_hash": key, "summarized_at": summarized_at or utc_now_iso(), "summary_source": "gemini"}
+
+
+def test_hash_covers_readme_description_and_prompt_version():
+    base = summary_hash("readme", "desc", "v1")
+    assert base == summary_hash("readme", "desc", "v1")
+    assert len({base, summary_hash("readme!", "desc", "v1"), summary_hash("readme", "desc!", "v1"),
+                summary_hash("readme", "desc", "v2")}) == 4
+
+
+def test_hit_only_while_the_hash_matches():
+    cache = SummaryCache()
+    cache.put("a/bot", summary("k1"))
+    assert cache.get("a/bot", "k1")["what_it_does"] == "Sends forecasts"
+    assert cache.get("a/bot", "k2") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_expired_entries_are_misses():
+    cache = SummaryCache(ttl_days=1)
+    old = (datetime.now(timezone.utc) - timedelta(days=2)).isoformat(timespec="seconds")
+    cache.put("a/bot", summary("k1", old))
+    assert cache.get("a/bot", "k1") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SummaryCache(max_entries=2)
+    cache.put("a", summary("ka"))
+    cache.put("b", summary("kb"))
+    cache.get("a", "ka")
+    cache.put("c", summary("kc"))
+    assert cache.get("b", "kb") is None
+    assert cache.get("a", "ka") and cache.get("c", "kc")
+
+
+def test_load_skips_bots_without_a_summary_hash():
+    cache = SummaryCache()
+    cache.load([dict(summary("k1"), full_name="a/new"), {"full_name": "a/legacy", "what_it_does": "x"}])
+    assert cache.get("a/new", "k1") is not None
+    assert cache.stored("a/legacy") is None
@@ -0,0 +1,72 @@
+import scraper as scraper_module
+from bench.fakes import FakeGenerativeModel
+from bench.run import fake_mongo_uri
+from repo_classifier import APPLICATION, LIBRARY
+from scraper import GitHubBotScraper
+from summary_cache import utc_now_iso
+
+README = "# Weather bot\n\nA telegram bot for forecasts.\n\n## Usage\n\nSet BOT_TOKEN in .env and run with docker-compose.\n"
+CONFIDENT = (APPLICATION, 0.98)
+
+
+def make_scraper(tmp_path, monkeypatch, mongo_uri=None) -> GitHubBotScraper:
+    monkeypatch.setenv("HTTP_CACHE_DIR", str(tmp_path / "http_cache"))
+    scraper = GitHubBotScraper(mongo_uri=mongo_uri, gemini_rpm=1_000_000)
+    scraper.model = FakeGenerativeModel(base_latency=0, per_char=0, jitter=0)
+    return scraper
+
+
+def labelled_bots(count: int = 20):
+    bots = []
+    for i in range(count):
+        bots.append({"full_name": f"a/lib{i}", "name": f"lib{i}", "description": "python wrapper library",
+                     "repo_type": LIBRARY, "summary_hash": "h", "summary_source": "gemini"})
+        bots.append({"full_name": f"a/bot{i}", "name": f"bot{i}", "description": "weather bot for groups",
+                     "repo_type": APPLICATION, "summary_hash": "h", "summary_source": "gemini"})
+    return bots
+
+
+def test_untrained_classifier_still_routes_to_gemini(tmp_path, monkeypatch):
+    scraper = make_scraper(tmp_path, monkeypatch)
+    assert not scraper.classifier.trained
+    summary = scraper.get_cached_summary("a/weather", README, "Weather forecasts", CONFIDENT)
+    assert scraper.model.calls == 1
+    assert summary["summary_source"] == "gemini"
+
+
+def test_trained_classifier_summarizes_confident_repos_locally(tmp_path, monkeypatch):
+    scraper = make_scraper(tmp_path, monkeypatch)
+    assert scraper.classifier.fit(labelled_bots())
+    summary = scraper.get_cached_summary("a/weather", README, "Weather forecasts", CONFIDENT)
+    assert scraper.model.calls == 0
+    assert summary["summary_source"] == "local"
+    assert summary["repo_type"] == APPLICATION
+
+
+def test_changed_readme_of_a_gemini_summarized_repo_goes_back_to_gemini(tmp_path, monkeypatch):
+    scraper = make_scraper(tmp_path, monkeypatch)
+    scraper.classifier.fit(labelled_bots())
+    stored = {"what_it_does": "Sends forecasts", "how_to_use": "Add it to a group", "repo_type": LIBRARY,
+              "summary_hash": "from-an-older-readme", "summarized_at": utc_now_iso(),
+              "summary_source": "gemini"}
+    scraper.summary_cache.put("a/weather", stored)
+    summary = scraper.get_cached_summary("a/weather", README, "Weather forecasts", CONFIDENT)
+    assert scraper.model.calls == 1
+    assert summary["summary_source"] == "gemini"
+    assert summary["summary_hash"] != stored["summary_hash"]
+
+
+def test_sample_training_reads_a_bounded_set_of_gemini_labels(tmp_path, monkeypatch):
+    monkeypatch.setattr(scraper_module, "CLASSIFIER_SAMPLE_PER_LABEL", 25)
+    scraper = make_scraper(tmp_path, monkeypatch, mongo_uri=fake_mongo_uri("routing-sample"))
+    local = [dict(bot, full_name=f"{bot['full_name']}-local", summary_source="local") for bot in labelled_bots()]
+    scraper.collection.insert_many(labelled_bots(40) + local)
+    scraper.train_classifier_sample()
+    assert scraper.classifier.trained
+
+
+def test_sample_training_without_enough_labels_stays_untrained(tmp_path, monkeypatch):
+    scraper = make_scraper(tmp_path, monkeypatch, mongo_uri=fake_mongo_uri("routing-few"))
+    scraper.collection.insert_many(labelled_bots(5))
+    scraper.train_classifier_sample()
+    assert not scraper.classifier.trained
@@ -0,0 +1,87 @@
+from bench.corpus import make_repos
+from bench.fakes import FakeCollection
+from work_queue import WorkQueue
+
+
+def queue_with(repos, owner="w1", **kwargs):
+    collection = FakeCollection()
+    queue = WorkQueue(collection, owner, **kwargs)
+    queue.enqueue(repos)
+    return queue
+
+
+def names(docs):
+    return sorted(doc["_id"] for doc in docs)
+
+
+def test_a_repo_is_leased_to_one_worker_at_a_time():
+    repos = make_repos(5)
+    first = queue_with(repos)
+    second = WorkQueue(first.collection, "w2")
+    mine = first.claim(limit=3)
+    theirs = second.claim(limit=10)
+    assert len(mine) == 3 and len(theirs) == 2
+    assert not set(names(mine)) & set(names(theirs))
+    assert second.claim() == []
+    assert first.counts() == {"pending": 0, "leased": 5, "done": 0, "failed": 0}
+
+
+def test_expired_leases_are_reclaimed_before_pending_work():
+    repos = make_repos(3)
+    crashed = queue_with(repos[:1], visibility_timeout=-1)
+    crashed.claim()
+    crashed.enqueue(repos[1:])
+    survivor = WorkQueue(crashed.collection, "w2")
+    claimed = survivor.claim(limit=1)
+    assert names(claimed) == [repos[0]["full_name"]]
+    assert claimed[0]["attempts"] == 2
+    assert claimed[0]["lease_owner"] == "w2"
+
+
+def test_an_expired_lease_on_its_last_attempt_is_parked():
+    queue = queue_with(make_repos(1), visibility_timeout=-1, max_attempts=1)
+    queue.claim()
+    assert queue.claim() == []
+    assert queue.counts()["failed"] == 1
+    assert queue.collection.find_one({})["error"] == "lease expired"
+
+
+def test_release_without_an_error_undoes_the_claim():
+    queue = queue_with(make_repos(1))
+    doc = queue.claim()[0]
+    queue.release(doc)
+    stored = queue.collection.find_one({})
+    assert (stored["state"], stored["attempts"], stored["lease_owner"]) == ("pending", 0, None)
+
+
+def test_release_with_an_error_parks_the_repo_after_max_attempts():
+    queue = queue_with(make_repos(1), max_attempts=2)
+    queue.release(queue.claim()[0], error="boom")
+    assert queue.counts()["pending"] == 1
+    queue.release(queue.claim()[0], error="boom again")
+    stored = queue.collection.find_one({})
+    assert (stored["state"], stored["error"]) == ("failed", "boom again")
+    assert queue.claim() == []
+
+
+def test_extend_and_complete_only_touch_this_workers_leases():
+    repos = make_repos(2)
+    queue = queue_with(repos)
+    other = WorkQueue(queue.collection, "w2")
+    mine, theirs = queue.claim(limit=1)[0], other.claim(limit=1)[0]
+    expires = mine["lease_expires"]
+    assert queue.extend([mine["_id"], theirs["_id"]]) == 1
+    assert queue.collection.find_one({"_id": mine["_id"]})["lease_expires"] >= expires
+    queue.complete([mine["_id"], theirs["_id"]])
+    assert queue.counts() == {"pending": 0, "leased": 1, "done": 1, "failed": 0}
+    assert queue.extend([]) == 0
+
+
+def test_enqueue_refreshes_waiting_repos_but_leaves_leased_ones():
+    repos = make_repos(2)
+    queue = queue_with(repos, max_attempts=1)
+    leased = queue.claim(limit=1)[0]
+    queue.release(queue.claim(limit=1)[0], error="boom")
+    assert queue.enqueue(repos) == 2
+    assert queue.collection.find_one({"_id": leased["_id"]})["state"] == "leased"
+    assert queue.counts() == {"pending": 1, "leased": 1, "done": 0, "failed": 0}
@@ -0,0 +1,118 @@
+import time
+from typing import List, Dict, Any, Iterable
+
+from summary_cache import utc_now_iso
+
+QUEUE_COLLECTION = "sync_queue"
+
+# How long a claimed repo stays invisible to other workers without a heartbeat
+DEFAULT_VISIBILITY_TIMEOUT = 300.0
+
+# Repos a worker claims at a time
+DEFAULT_CLAIM_BATCH = 16
+
+# Claims after which a repo that keeps failing (or crashing its worker) is parked
+MAX_ATTEMPTS = 3
+
+
+class WorkQueue:
+    """Repos waiting to be processed, one document per full_name in MongoDB.
+
+    A document is `pending`, `leased` to one worker until `lease_expires`,
+    `done` or `failed`. Claims are single find_one_and_update calls, so two
+    workers never lease the same repo at once; a worker that dies simply
+    lets its leases expire and the repos become claimable again. Enqueueing
+    a repo that is already waiting refreshes it; one that is leased is left
+    to its worker.
+    """
+
+    def __init__(self, collection, owner: str, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT,
+                 max_attempts: int = MAX_ATTEMPTS):
+        self.collection = collection
+        self.owner = owner
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+
+    def ensure_indexes(self):
+        try:
+            # One per claim query, each serving its own sort: pending by age, leased by expiry
+            self.collection.create_index([("state", 1), ("enqueued_at", 1)])
+            self.collection.create_index([("state", 1), ("lease_expires", 1)])
+        except Exception as e:
+            print(f"[!] Could not create work queue indexes: {e}")
+
+    def enqueue(self, repos: Iterable[Dict[str, Any]]) -> int:
+        """Queue search results for processing; returns how many were sent."""
+        from pymongo import UpdateOne
+        now = utc_now_iso()
+        ops = []
+        for repo in repos:
+            fields = {"repo": repo, "state": "pending", "attempts": 0, "enqueued_at": now, "error": None}
+            # Insert if new; otherwise re-queue unless a worker holds it right now
+            ops.append(UpdateOne({"_id": repo["full_name"]}, {"$setOnInsert": fields}, upsert=True))
+            ops.append(UpdateOne({"_id": repo["full_name"], "state": {"$ne": "leased"}}, {"$set": fields}))
+        if ops:
+            self.collection.bulk_write(ops, ordered=False)
+        return len(ops) // 2
+
+    def claim(self, limit: int = DEFAULT_CLAIM_BATCH) -> List[Dict[str, Any]]:
+        """Lease up to `limit` pending repos, or ones whose lease expired, to this worker."""
+        from pymongo import ReturnDocument
+        # Leases that ran out on their last attempt: the repo keeps killing or stalling its worker
+        self.collection.update_many(
+            {"state": "leased", "lease_expires": {"$lt": time.time()}, "attempts": {"$gte": self.max_attempts}},
+            {"$set": {"state": "failed", "lease_owner": None, "error": "lease expired"}}
+        )
+        claimed = []
+        # Abandoned leases first, so a steady stream of new work cannot starve them; then by age.
+        # No $or: each query is a range scan on its own index that already yields the sort order.
+        for state, sort_key in (("leased", "lease_expires"), ("pending", "enqueued_at")):
+            while len(claimed) < limit:
+                now = time.time()
+                query: Dict[str, Any] = {"state": state, "attempts": {"$lt": self.max_attempts}}
+                if state == "leased":
+                    query["lease_expires"] = {"$lt": now}
+                doc = self.collection.find_one_and_update(
+                    query,
+                    {"$set": {"state": "leased", "lease_owner": self.owner, "lease_expires": now + self.visibility_timeout},
+                     "$inc": {"attempts": 1}},
+                    sort=[(sort_key, 1)],
+                    return_document=ReturnDocument.AFTER
+                )
+                if doc is None:
+                    break
+                claimed.append(doc)
+        return claimed
+
+    def extend(self, full_names: List[str]) -> int:
+        """Push back the expiry of this worker's leases; returns how many it still holds."""
+        if not full_names:
+            return 0
+        result = self.collection.update_many(
+            {"_id": {"$in": full_names}, "state": "leased", "lease_owner": self.owner},
+            {"$set": {"lease_expires": time.time() + self.visibility_timeout}}
+        )
+        return result.matched_count
+
+    def complete(self, full_names: List[str]):
+        if full_names:
+            self.collection.update_many(
+                {"_id": {"$in": full_names}, "state": "leased", "lease_owner": self.owner},
+                {"$set": {"state": "done", "lease_owner": None, "finished_at": utc_now_iso()}}
+            )
+
+    def release(self, doc: Dict[str, Any], error: str = None):
+        """Give back a claimed repo: with an `error` it counts as a failed attempt and is
+        parked once out of attempts; without one (cancelled, rate limited) the claim is undone."""
+        update: Dict[str, Any] = {"$set": {"state": "pending", "lease_owner": None}}
+        if error is None:
+            update["$inc"] = {"attempts": -1}
+        else:
+            update["$set"]["error"] = error
+            if doc.get("attempts", 0) >= self.max_attempts:
+                update["$set"]["state"] = "failed"
+        self.collection.update_one({"_id": doc["_id"], "state": "leased", "lease_owner": self.owner}, update)
+
+    def counts(self) -> Dict[str, int]:
+        return {state: self.collection.count_documents({"state": state})
+                for state in ("pending", "leased", "done", "failed")}